@@ -0,0 +1,34 @@
+from typing import AsyncIterator
+
+from fastapi import Depends, Request
+
+from app.infra.mongo_db_sdk import MongoDBSDK
+from app.infra.mongo_session import causal_session, set_read_preference
+from app.utils.config import get_settings
+
+
+async def mongo_session(request: Request) -> AsyncIterator[None]:
+    """
+    应用级依赖：启用读写分离时为每个请求创建因果一致会话
+
+    以当前用户ID为范围跨请求保持因果一致：用户发送消息后，随后读取消息列表
+    即使路由到从节点也能读到自己发送的消息。
+    """
+    if get_settings().mongodb.read_preference == "primary":
+        yield
+        return
+
+    MongoDBSDK.get_db()
+    person = getattr(request.state, "person", None)
+    async with causal_session(MongoDBSDK.client, person.id if person else None):
+        yield
+
+
+async def use_secondary_reads() -> None:
+    """路由依赖：本请求的读操作使用配置的读偏好（mongodb.read_preference）"""
+    mode = get_settings().mongodb.read_preference
+    set_read_preference(None if mode == "primary" else mode)
+
+
+# 读多写少的路由使用：@router.get(..., dependencies=[SecondaryReads])
+SecondaryReads = Depends(use_secondary_reads)
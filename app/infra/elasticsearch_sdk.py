@@ -1,6 +1,7 @@
 from elasticsearch import AsyncElasticsearch
 
 from app.utils.logger import get_logger
+from app.utils.tracing import span
 
 logger = get_logger(__name__)
 
@@ -39,7 +40,8 @@ class ElasticsearchSDK:
             body: 索引配置
         """
         try:
-            await self.client.indices.create(index=index, body=body)
+            with span("elasticsearch.create_index", index=index):
+                await self.client.indices.create(index=index, body=body)
             logger.info(f"Index {index} created successfully")
         except Exception as e:
             logger.error(f"Failed to create index {index}: {e}")
@@ -55,7 +57,8 @@ class ElasticsearchSDK:
             id: 文档ID（可选）
         """
         try:
-            result = await self.client.index(index=index, body=document, id=id)
+            with span("elasticsearch.index", index=index):
+                result = await self.client.index(index=index, body=document, id=id)
             logger.debug(f"Document indexed successfully: {result}")
             return result
         except Exception as e:
@@ -71,7 +74,8 @@ class ElasticsearchSDK:
             query: 查询条件
         """
         try:
-            result = await self.client.search(index=index, body=query)
+            with span("elasticsearch.search", index=index):
+                result = await self.client.search(index=index, body=query)
             return result
         except Exception as e:
             logger.error(f"Search failed: {e}")
@@ -1,20 +1,214 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+import asyncio
+import importlib.util
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from app.utils.config import get_settings
+from pymongo import monitoring
+
+from app.infra.registry import registry
+from app.utils.config import MongoDBSettings, get_settings
 from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 logger = get_logger(__name__)
 
+POOL_WAIT_SECONDS = REGISTRY.histogram(
+    "mongo_pool_wait_seconds",
+    "Time spent waiting to check out a MongoDB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+POOL_CHECKOUT_FAILED = REGISTRY.counter(
+    "mongo_pool_checkout_failed_total",
+    "MongoDB connection checkouts that failed",
+    ["reason"],
+)
+POOL_CONNECTIONS = REGISTRY.gauge(
+    "mongo_pool_connections", "Open MongoDB connections in the pool"
+)
+
+# 压缩算法依赖的模块，未安装时不启用（否则 PyMongo 每次创建客户端都会告警）
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def available_compressors(names: str) -> List[str]:
+    """按配置顺序返回已安装依赖的压缩算法"""
+    result = []
+    for name in (n.strip() for n in names.split(",")):
+        if not name:
+            continue
+        module = COMPRESSOR_MODULES.get(name)
+        if module and importlib.util.find_spec(module) is None:
+            logger.info(f"MongoDB compressor {name} skipped: {module} not installed")
+            continue
+        result.append(name)
+    return result
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """记录连接池等待时间与连接数
+
+    事件在驱动的线程中触发，更新指标时加锁。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            POOL_WAIT_SECONDS.observe(event.duration)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            POOL_WAIT_SECONDS.observe(event.duration)
+            POOL_CHECKOUT_FAILED.labels(str(event.reason)).inc()
+
+    def connection_created(self, event):
+        with self._lock:
+            POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        with self._lock:
+            POOL_CONNECTIONS.dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def client_options(cfg: MongoDBSettings) -> Dict[str, Any]:
+    """由配置生成 AsyncIOMotorClient 的连接池与压缩参数"""
+    options: Dict[str, Any] = {
+        "maxPoolSize": cfg.max_pool_size,
+        "minPoolSize": cfg.min_pool_size,
+        "maxIdleTimeMS": cfg.max_idle_time_ms,
+        "connectTimeoutMS": cfg.connect_timeout_ms,
+        "serverSelectionTimeoutMS": cfg.server_selection_timeout_ms,
+        "event_listeners": [PoolMetricsListener()],
+    }
+    if cfg.replica_set:
+        options["replicaSet"] = cfg.replica_set
+    if cfg.wait_queue_timeout_ms is not None:
+        options["waitQueueTimeoutMS"] = cfg.wait_queue_timeout_ms
+    compressors = available_compressors(cfg.compressors)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """当前线程正在运行的事件循环，不在协程中调用时为 None"""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
 
 class MongoDBSDK:
-    cfg = mongo_config = get_settings().mongodb
+    """MongoDB 客户端
+
+    由基础设施注册表（app.infra.registry）在启动时调用 connect、关闭时调用
+    close 管理生命周期；脚本、测试或 STARTUP_FAST 等未调用 connect 时，首次
+    get_db 会创建客户端（连接在第一次查询时建立）并登记到注册表。
+    """
+
+    cfg = get_settings().mongodb
+    # 当前事件循环使用的客户端
+    client: Optional["AsyncIOMotorClient"] = None
+    db: Optional["AsyncIOMotorDatabase"] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    # 各事件循环的客户端，close 时全部关闭
+    _clients: Dict[asyncio.AbstractEventLoop, "AsyncIOMotorClient"] = {}
+
+    @classmethod
+    def uri(cls) -> str:
+        cfg = cls.cfg
+        if cfg.username and cfg.password:
+            return f"mongodb://{cfg.username}:{cfg.password}@{cfg.host}:{cfg.port}"
+        return f"mongodb://{cfg.host}:{cfg.port}"
+
+    @classmethod
+    def get_db(cls) -> "AsyncIOMotorDatabase":
+        """
+        获取数据库，客户端尚未创建时创建
+
+        Motor 客户端绑定在首次使用它的事件循环上。在另一个事件循环中调用时（如
+        测试中 TestClient 在独立线程的循环里运行应用，测试夹具在 pytest 的循环
+        里读写）为该循环使用单独的客户端，避免 "attached to a different loop"。
+        """
+        loop = _running_loop()
+        if cls.db is not None and (loop is None or cls._loop in (None, loop)):
+            if cls._loop is None and loop is not None:
+                cls._loop = loop
+                cls._clients[loop] = cls.client
+            return cls.db
+
+        client = cls._clients.get(loop) if loop is not None else None
+        if client is None:
+            # motor 在首次使用时才导入，加快进程启动
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            client = AsyncIOMotorClient(cls.uri(), **client_options(cls.cfg))
+            if loop is not None:
+                cls._clients[loop] = client
+        cls.client, cls.db, cls._loop = client, client[cls.cfg.database], loop
+        # 未经 connect 创建的客户端（如 STARTUP_FAST）也在应用关闭时关闭
+        registry.adopt("mongo", cls)
+        return cls.db
+
+    @classmethod
+    async def connect(cls) -> None:
+        """
+        创建客户端并预热连接池
 
-    uri = (
-        f"mongodb://{cfg.username}:{cfg.password}@{cfg.host}:{cfg.port}"
-        if cfg.username and cfg.password
-        else f"mongodb://{cfg.host}:{cfg.port}"
-    )
-    client: AsyncIOMotorClient = AsyncIOMotorClient(uri)
-    db: AsyncIOMotorDatabase = client[mongo_config.database]
+        并发执行 min_pool_size 次 ping，使进程在处理请求前就建立好连接。
+        MongoDB 不可用时只记录错误，不阻止应用启动。
+        """
+        db = cls.get_db()
+        warmup = max(1, cls.cfg.min_pool_size)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(db.command("ping") for _ in range(warmup))),
+                timeout=cls.cfg.warmup_timeout,
+            )
+        except Exception as e:
+            logger.error(f"MongoDB warm-up failed: {e!r}")
+            return
+        logger.info(
+            f"Connected to MongoDB: {cls.cfg.host}:{cls.cfg.port}, "
+            f"pool warmed up with {warmup} connections"
+        )
 
-    logger.info(f"Connected to MongoDB: {uri}")
+    @classmethod
+    async def close(cls) -> None:
+        """关闭所有事件循环上的客户端"""
+        clients = {id(client): client for client in cls._clients.values()}
+        if cls.client is not None:
+            clients[id(cls.client)] = cls.client
+        for client in clients.values():
+            client.close()
+        if clients:
+            logger.info("MongoDB connection closed")
+        cls._clients.clear()
+        cls.client = None
+        cls.db = None
+        cls._loop = None
@@ -0,0 +1,220 @@
+import time
+from typing import Any
+
+from app.infra.mongo_session import current_session, mark_write
+from app.infra.query_plan import query_plan_guard
+from app.utils.db_stats import record_operation
+from app.utils.tracing import span
+
+# 需要计时的协程方法，值为查询条件参数的位置（None 表示没有查询条件）
+TIMED_METHODS = {
+    "find_one": 0,
+    "find_one_and_update": 0,
+    "find_one_and_delete": 0,
+    "find_one_and_replace": 0,
+    "count_documents": 0,
+    "distinct": 1,
+    "update_one": 0,
+    "update_many": 0,
+    "replace_one": 0,
+    "delete_one": 0,
+    "delete_many": 0,
+    "insert_one": None,
+    "insert_many": None,
+    "bulk_write": None,
+    "estimated_document_count": None,
+    "create_index": None,
+    "create_indexes": None,
+    "drop_index": None,
+    "index_information": None,
+}
+
+# 返回游标的方法
+CURSOR_METHODS = {"find": 0, "aggregate": 0, "list_indexes": None}
+
+# 写操作，用于记录请求内是否发生过写入（因果一致会话跨请求保持）
+WRITE_METHODS = {
+    "find_one_and_update",
+    "find_one_and_delete",
+    "find_one_and_replace",
+    "update_one",
+    "update_many",
+    "replace_one",
+    "delete_one",
+    "delete_many",
+    "insert_one",
+    "insert_many",
+    "bulk_write",
+}
+
+
+def _with_session(collection, kwargs) -> None:
+    """当前请求有因果一致会话时，操作使用该会话"""
+    if "session" in kwargs:
+        return
+    session = current_session()
+    if session is None:
+        return
+    # 会话只能用于创建它的客户端（分片集合可能属于其他集群）
+    database = getattr(collection, "database", None)
+    if database is not None and getattr(session, "client", None) is not database.client:
+        return
+    kwargs["session"] = session
+
+
+def _filter_arg(position, args, kwargs) -> Any:
+    if position is None:
+        return None
+    if len(args) > position:
+        return args[position]
+    return kwargs.get("filter") or kwargs.get("pipeline")
+
+
+class InstrumentedCursor:
+    """带计时的游标包装，链式调用（sort/skip/limit 等）返回的游标会被继续包装"""
+
+    def __init__(self, cursor, collection, operation: str, filter: Any):
+        self._cursor = cursor
+        self._raw_collection = collection
+        self._collection = collection.name
+        self._operation = operation
+        self._filter = filter
+        self._iterator = cursor
+        self._counted = False
+        self._elapsed = 0.0
+        self._sort = None
+        self._checked = False
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            if name == "sort":
+                self._sort = args if len(args) > 1 else (args[0] if args else None)
+            result = attr(*args, **kwargs)
+            if result is self._cursor:
+                return self
+            return result
+
+        return chained
+
+    def _flush(self) -> None:
+        # 同一个游标只计一次操作，后续批次只累加耗时
+        record_operation(
+            self._collection,
+            self._operation,
+            self._elapsed,
+            filter=self._filter,
+            count=0 if self._counted else 1,
+        )
+        self._counted = True
+        self._elapsed = 0.0
+
+    async def _check_plan(self) -> None:
+        if query_plan_guard.enabled and not self._checked and self._filter is not None:
+            self._checked = True
+            await query_plan_guard.check(
+                self._raw_collection, self._operation, self._filter, self._sort
+            )
+
+    async def to_list(self, *args, **kwargs):
+        await self._check_plan()
+        start = time.perf_counter()
+        try:
+            with span(f"mongo.{self._operation}", collection=self._collection):
+                return await self._cursor.to_list(*args, **kwargs)
+        finally:
+            self._elapsed += time.perf_counter() - start
+            self._flush()
+
+    def __aiter__(self):
+        self._iterator = self._cursor.__aiter__()
+        return self
+
+    async def __anext__(self):
+        # 首个文档返回时和迭代结束时各汇总一次，避免逐条记录
+        await self._check_plan()
+        start = time.perf_counter()
+        try:
+            doc = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._elapsed += time.perf_counter() - start
+            self._flush()
+            raise
+        self._elapsed += time.perf_counter() - start
+        if not self._counted:
+            self._flush()
+        return doc
+
+
+class InstrumentedCollection:
+    """带计时的 Motor 集合代理
+
+    所有通过 MongoBaseModel.collection() 发出的操作（包括路由中直接调用的
+    count_documents/update_many 等）都会计入当前请求的数据库统计，并在超过
+    阈值时输出慢查询日志；当前请求有因果一致会话时自动使用该会话。未列出的
+    属性原样透传给 Motor 集合。
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._name = collection.name
+
+    @property
+    def raw(self):
+        """底层的 Motor 集合"""
+        return self._collection
+
+    def with_options(self, **kwargs) -> "InstrumentedCollection":
+        """以不同的读偏好等选项获取同一集合，保留耗时统计"""
+        return InstrumentedCollection(self._collection.with_options(**kwargs))
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._collection, name)
+        if name in TIMED_METHODS:
+            return self._timed(name, attr, TIMED_METHODS[name])
+        if name in CURSOR_METHODS:
+            return self._cursor(name, attr, CURSOR_METHODS[name])
+        return attr
+
+    def _timed(self, operation: str, method, filter_position):
+        async def wrapper(*args, **kwargs):
+            _with_session(self._collection, kwargs)
+            if operation in WRITE_METHODS:
+                mark_write()
+            if query_plan_guard.enabled and filter_position is not None:
+                await query_plan_guard.check(
+                    self._collection,
+                    operation,
+                    _filter_arg(filter_position, args, kwargs),
+                    kwargs.get("sort"),
+                )
+            start = time.perf_counter()
+            try:
+                with span(f"mongo.{operation}", collection=self._name):
+                    return await method(*args, **kwargs)
+            finally:
+                record_operation(
+                    self._name,
+                    operation,
+                    time.perf_counter() - start,
+                    filter=_filter_arg(filter_position, args, kwargs),
+                )
+
+        return wrapper
+
+    def _cursor(self, operation: str, method, filter_position):
+        def wrapper(*args, **kwargs):
+            _with_session(self._collection, kwargs)
+            cursor = InstrumentedCursor(
+                method(*args, **kwargs),
+                self._collection,
+                operation,
+                _filter_arg(filter_position, args, kwargs),
+            )
+            cursor._sort = kwargs.get("sort")
+            return cursor
+
+        return wrapper
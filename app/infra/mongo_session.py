@@ -0,0 +1,149 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, Optional
+
+from pymongo.read_preferences import (
+    Nearest,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.ttl_cache import MISSING, TTLCache
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+
+logger = get_logger(__name__)
+
+# 可路由到从节点的读偏好；primary 不需要设置
+READ_MODES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+@dataclass
+class SessionState:
+    """请求内的会话及是否发生过写入"""
+
+    session: "AsyncIOMotorClientSession"
+    wrote: bool = False
+
+
+_read_mode: ContextVar[Optional[str]] = ContextVar("mongo_read_mode", default=None)
+_session_state: ContextVar[Optional[SessionState]] = ContextVar(
+    "mongo_session", default=None
+)
+
+_cfg = get_settings().mongodb
+
+# 用户最近一次写入后的 (cluster_time, operation_time)，仅在当前进程内有效
+_causal_times = TTLCache(maxsize=10000, ttl=_cfg.causal_window)
+
+
+@lru_cache(maxsize=None)
+def read_preference_for(mode: str):
+    """
+    由读偏好名称生成 PyMongo 读偏好
+
+    Args:
+        mode: primary / primaryPreferred / secondary / secondaryPreferred / nearest
+
+    Returns:
+        读偏好对象，primary 返回 None（使用集合默认的主节点读取）
+    """
+    if mode == "primary":
+        return None
+    try:
+        cls = READ_MODES[mode]
+    except KeyError:
+        raise ValueError(f"Unknown read preference: {mode}")
+    return cls(max_staleness=_cfg.max_staleness_seconds)
+
+
+def set_read_preference(mode: Optional[str]) -> None:
+    """设置当前请求（上下文）中读操作的读偏好，为空表示读主节点"""
+    _read_mode.set(mode)
+
+
+@contextmanager
+def read_from(mode: str) -> Iterator[None]:
+    """
+    在代码块内使用指定的读偏好
+
+    示例：
+        with read_from("secondaryPreferred"):
+            persons = await Person.list()
+    """
+    token = _read_mode.set(mode)
+    try:
+        yield
+    finally:
+        _read_mode.reset(token)
+
+
+def current_read_preference():
+    """当前上下文的读偏好，读主节点时返回 None"""
+    mode = _read_mode.get()
+    return read_preference_for(mode) if mode else None
+
+
+def current_session() -> Optional["AsyncIOMotorClientSession"]:
+    """当前请求的因果一致会话"""
+    state = _session_state.get()
+    return state.session if state else None
+
+
+def mark_write() -> None:
+    """记录当前请求发生了写入"""
+    state = _session_state.get()
+    if state is not None:
+        state.wrote = True
+
+
+@asynccontextmanager
+async def causal_session(
+    client: "AsyncIOMotorClient", key: Optional[str] = None
+) -> AsyncIterator["AsyncIOMotorClientSession"]:
+    """
+    在请求范围内使用因果一致会话
+
+    代码块内通过 MongoBaseModel.collection() 发出的操作都使用该会话，从节点
+    读取会等待复制追上本会话之前的写入。key（如用户ID）不为空时，本次请求
+    写入后的时间点会被保留 causal_window 秒，同一 key 的后续请求从该时间点
+    开始，从而在跨请求时也能读到自己的写入。
+
+    会话不能被并发使用：代码块内不要用 asyncio.gather 等并发执行数据库操作。
+
+    Args:
+        client: Motor 客户端
+        key: 跨请求保持因果一致的范围，为空时只在本请求内保证
+    """
+    async with await client.start_session(causal_consistency=True) as session:
+        times: Any = _causal_times.get(key) if key else MISSING
+        if times is not MISSING:
+            cluster_time, operation_time = times
+            session.advance_cluster_time(cluster_time)
+            session.advance_operation_time(operation_time)
+
+        state = SessionState(session)
+        _session_state.set(state)
+        try:
+            yield session
+        finally:
+            # 依赖的清理阶段可能不在同一个上下文中执行，不使用 reset
+            _session_state.set(None)
+            if (
+                key
+                and state.wrote
+                and session.cluster_time is not None
+                and session.operation_time is not None
+            ):
+                _causal_times.set(key, (session.cluster_time, session.operation_time))
@@ -4,6 +4,7 @@ import asyncpg
 from asyncpg import Connection, Pool
 
 from app.utils.logger import get_logger
+from app.utils.tracing import span
 
 logger = get_logger(__name__)
 
@@ -68,8 +69,9 @@ class PostgreSQLSDK:
             执行结果
         """
         try:
-            async with self.pool.acquire() as conn:
-                return await conn.execute(query, *args, timeout=timeout)
+            with span("postgresql.execute"):
+                async with self.pool.acquire() as conn:
+                    return await conn.execute(query, *args, timeout=timeout)
         except Exception as e:
             logger.error(f"Failed to execute query: {e}\nQuery: {query}\nArgs: {args}")
             raise
@@ -89,8 +91,9 @@ class PostgreSQLSDK:
             查询结果列表
         """
         try:
-            async with self.pool.acquire() as conn:
-                return await conn.fetch(query, *args, timeout=timeout)
+            with span("postgresql.fetch"):
+                async with self.pool.acquire() as conn:
+                    return await conn.fetch(query, *args, timeout=timeout)
         except Exception as e:
             logger.error(f"Failed to fetch: {e}\nQuery: {query}\nArgs: {args}")
             raise
@@ -110,8 +113,9 @@ class PostgreSQLSDK:
             查询结果的第一行，如果没有结果则返回None
         """
         try:
-            async with self.pool.acquire() as conn:
-                return await conn.fetchrow(query, *args, timeout=timeout)
+            with span("postgresql.fetchrow"):
+                async with self.pool.acquire() as conn:
+                    return await conn.fetchrow(query, *args, timeout=timeout)
         except Exception as e:
             logger.error(f"Failed to fetchrow: {e}\nQuery: {query}\nArgs: {args}")
             raise
@@ -132,8 +136,11 @@ class PostgreSQLSDK:
             查询结果的第一个值
         """
         try:
-            async with self.pool.acquire() as conn:
-                return await conn.fetchval(query, *args, column=column, timeout=timeout)
+            with span("postgresql.fetchval"):
+                async with self.pool.acquire() as conn:
+                    return await conn.fetchval(
+                        query, *args, column=column, timeout=timeout
+                    )
         except Exception as e:
             logger.error(f"Failed to fetchval: {e}\nQuery: {query}\nArgs: {args}")
             raise
@@ -159,8 +166,9 @@ class PostgreSQLSDK:
             timeout: 超时时间（秒）
         """
         try:
-            async with self.pool.acquire() as conn:
-                await conn.executemany(query, args, timeout=timeout)
+            with span("postgresql.execute_many", rows=len(args)):
+                async with self.pool.acquire() as conn:
+                    await conn.executemany(query, args, timeout=timeout)
         except Exception as e:
             logger.error(f"Failed to execute many: {e}\nQuery: {query}\nArgs: {args}")
             raise
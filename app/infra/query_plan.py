@@ -0,0 +1,188 @@
+import atexit
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.config import get_settings
+from app.utils.db_stats import filter_shape
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 需要告警的执行计划阶段：全表扫描、内存排序
+FLAGGED_STAGES = ("COLLSCAN", "SORT")
+
+
+class QueryPlanError(RuntimeError):
+    """查询未命中索引（raise 模式下抛出）"""
+
+
+def sort_shape(sort: Any) -> Optional[List[Tuple[str, int]]]:
+    """将 sort("a", -1) / sort([("a", -1)]) 等写法统一为 [(字段, 方向)]"""
+    if not sort:
+        return None
+    if isinstance(sort, str):
+        return [(sort, 1)]
+    if isinstance(sort, tuple) and len(sort) == 2 and isinstance(sort[0], str):
+        return [(sort[0], sort[1])]
+    if isinstance(sort, dict):
+        return list(sort.items())
+    return [tuple(item) for item in sort]
+
+
+def plan_stages(plan: Any) -> List[str]:
+    """按从外到内的顺序列出执行计划中的所有阶段"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for key in ("queryPlan", "inputStage"):
+            if key in plan:
+                stages.extend(plan_stages(plan[key]))
+        for child in plan.get("inputStages", []):
+            stages.extend(plan_stages(child))
+    return stages
+
+
+def winning_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """从 explain 结果中取出胜出的执行计划（兼容 find 与 aggregate）"""
+    if "queryPlanner" in explain:
+        return explain["queryPlanner"].get("winningPlan", {})
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor")
+        if cursor and "queryPlanner" in cursor:
+            return cursor["queryPlanner"].get("winningPlan", {})
+    return {}
+
+
+class QueryPlanGuard:
+    """查询计划检查（开发/测试环境使用）
+
+    对每个集合上每种不同的查询结构（查询条件去掉取值 + 排序）执行一次 explain，
+    记录胜出的执行计划；出现 COLLSCAN 或内存 SORT 时按模式告警或抛出
+    QueryPlanError。结果可写入 JSON 文件，由 scripts/query_plan_report.py 汇总。
+    """
+
+    def __init__(self, mode: str = "off", report_path: Optional[str] = None):
+        """
+        Args:
+            mode: off 不检查；warn 输出警告日志；raise 抛出 QueryPlanError
+            report_path: 进程退出时写入查询计划报告的路径
+        """
+        if mode not in ("off", "warn", "raise"):
+            raise ValueError("mode must be 'off', 'warn' or 'raise'")
+        self.mode = mode
+        self.report_path = report_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    async def check(
+        self,
+        collection,
+        operation: str,
+        filter: Any = None,
+        sort: Any = None,
+    ) -> None:
+        """
+        检查一次查询的执行计划，同一查询结构只 explain 一次
+
+        Args:
+            collection: 底层 Motor 集合
+            operation: 操作名，如 find/update_one
+            filter: 查询条件（aggregate 为 pipeline）
+            sort: 排序条件
+        """
+        shape = filter_shape(filter or {})
+        sort = sort_shape(sort)
+        key = json.dumps(
+            [collection.name, operation, shape, sort],
+            sort_keys=True,
+            default=str,
+        )
+        entry = self.entries.get(key)
+        if entry is None:
+            # 先占位再 await，避免并发请求重复 explain
+            entry = self.entries[key] = {
+                "collection": collection.name,
+                "operation": operation,
+                "filter": shape,
+                "sort": sort,
+                "stages": None,
+                "plan": None,
+                "flagged": [],
+                "error": None,
+                "count": 0,
+            }
+            await self._analyze(collection, operation, filter, sort, entry)
+        entry["count"] += 1
+
+        if entry["flagged"] and self.mode == "raise":
+            raise QueryPlanError(self._describe(entry))
+
+    async def _analyze(self, collection, operation, filter, sort, entry) -> None:
+        start = time.perf_counter()
+        try:
+            explain = await self._explain(collection, operation, filter, sort)
+        except Exception as e:
+            entry["error"] = repr(e)
+            logger.warning(
+                f"Failed to explain {collection.name}.{operation} "
+                f"filter={entry['filter']}: {e}"
+            )
+            return
+        plan = winning_plan(explain)
+        stages = plan_stages(plan)
+        entry["plan"] = plan
+        entry["stages"] = stages
+        entry["flagged"] = [stage for stage in stages if stage in FLAGGED_STAGES]
+        logger.debug(
+            f"Query plan {collection.name}.{operation} filter={entry['filter']} "
+            f"sort={sort}: {' <- '.join(stages)} "
+            f"({(time.perf_counter() - start) * 1000:.2f}ms)"
+        )
+        if entry["flagged"]:
+            logger.warning(self._describe(entry))
+
+    async def _explain(self, collection, operation, filter, sort) -> Dict[str, Any]:
+        if operation == "aggregate":
+            return await collection.database.command(
+                "aggregate", collection.name, pipeline=filter or [], explain=True
+            )
+        # update/delete/count 等操作选择索引的方式与同条件的 find 一致
+        cursor = collection.find(filter or {})
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.explain()
+
+    @staticmethod
+    def _describe(entry: Dict[str, Any]) -> str:
+        return (
+            f"Unindexed query on {entry['collection']}.{entry['operation']}: "
+            f"{'/'.join(entry['flagged'])} filter={entry['filter']} "
+            f"sort={entry['sort']}"
+        )
+
+    def report(self) -> List[Dict[str, Any]]:
+        """所有已记录的查询结构，有问题的排在前面"""
+        return sorted(
+            self.entries.values(),
+            key=lambda e: (not e["flagged"], e["collection"], e["operation"]),
+        )
+
+    def write_report(self, path: Optional[str] = None) -> None:
+        path = path or self.report_path
+        if not path or not self.entries:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2, default=str)
+        logger.info(f"Query plan report written to {path}: {len(self.entries)} shapes")
+
+
+_mongo_cfg = get_settings().mongodb
+
+query_plan_guard = QueryPlanGuard(_mongo_cfg.explain_mode, _mongo_cfg.explain_report)
+if query_plan_guard.enabled and query_plan_guard.report_path:
+    atexit.register(query_plan_guard.write_report)
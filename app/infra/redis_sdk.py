@@ -1,11 +1,19 @@
-from typing import Any, Optional, Union
-
-import aioredis
+import hashlib
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
+from app.infra.registry import registry
 from app.utils.logger import get_logger
+from app.utils.tracing import span
+
+if TYPE_CHECKING:
+    import aioredis
 
 logger = get_logger(__name__)
 
+# 共享客户端连接失败后的重试间隔（秒）
+SHARED_RETRY_INTERVAL = 30.0
+
 
 class RedisSDK:
     def __init__(self, url: str):
@@ -16,11 +24,15 @@ class RedisSDK:
             url: Redis 连接 URL，格式如: "redis://localhost:6379/0"
         """
         self.url = url
-        self.client: Optional[aioredis.Redis] = None
+        self.client: Optional["aioredis.Redis"] = None
+        self._scripts: Dict[str, str] = {}  # 已加载的 Lua 脚本 SHA1
 
     async def connect(self):
         """建立连接"""
         try:
+            # 延迟导入，Redis 不可用时不影响应用启动
+            import aioredis
+
             self.client = await aioredis.from_url(
                 self.url, encoding="utf-8", decode_responses=True
             )
@@ -55,7 +67,8 @@ class RedisSDK:
             xx: 如果设置为True，则只有键已经存在时才进行设置
         """
         try:
-            await self.client.set(key, value, ex=ex, nx=nx, xx=xx)
+            with span("redis.set", key=key):
+                await self.client.set(key, value, ex=ex, nx=nx, xx=xx)
             logger.debug(f"Successfully set key: {key}")
         except Exception as e:
             logger.error(f"Failed to set key {key}: {e}")
@@ -72,12 +85,51 @@ class RedisSDK:
             键对应的值，如果键不存在则返回None
         """
         try:
-            value = await self.client.get(key)
+            with span("redis.get", key=key):
+                value = await self.client.get(key)
             return value
         except Exception as e:
             logger.error(f"Failed to get key {key}: {e}")
             raise
 
+    async def mget(self, keys: List[str]) -> List[Any]:
+        """
+        批量获取键值（一次往返）
+
+        Args:
+            keys: 键列表
+
+        Returns:
+            与 keys 一一对应的值列表，不存在的键为 None
+        """
+        try:
+            with span("redis.mget", keys=len(keys)):
+                return await self.client.mget(keys)
+        except Exception as e:
+            logger.error(f"Failed to mget keys {keys}: {e}")
+            raise
+
+    async def incr(self, key: str, ex: Optional[int] = None) -> int:
+        """
+        将键的整数值加 1，键不存在时从 0 开始
+
+        Args:
+            key: 键
+            ex: 过期时间（秒），每次递增后重置
+
+        Returns:
+            加 1 后的值
+        """
+        try:
+            with span("redis.incr", key=key):
+                value = await self.client.incr(key)
+                if ex:
+                    await self.client.expire(key, ex)
+                return value
+        except Exception as e:
+            logger.error(f"Failed to incr key {key}: {e}")
+            raise
+
     async def delete(self, key: Union[str, list[str]]):
         """
         删除键
@@ -85,8 +137,10 @@ class RedisSDK:
         Args:
             key: 单个键或键列表
         """
+        keys = [key] if isinstance(key, str) else key
         try:
-            await self.client.delete(key)
+            with span("redis.delete", keys=len(keys)):
+                await self.client.delete(*keys)
             logger.debug(f"Successfully deleted key(s): {key}")
         except Exception as e:
             logger.error(f"Failed to delete key(s) {key}: {e}")
@@ -103,7 +157,71 @@ class RedisSDK:
             布尔值，表示键是否存在
         """
         try:
-            return await self.client.exists(key) > 0
+            with span("redis.exists", key=key):
+                return await self.client.exists(key) > 0
         except Exception as e:
             logger.error(f"Failed to check existence of key {key}: {e}")
             raise
+
+    async def eval(
+        self, script: str, keys: List[str], args: Optional[List[Any]] = None
+    ) -> Any:
+        """
+        执行 Lua 脚本
+
+        优先使用 EVALSHA 只发送脚本摘要，服务端未缓存该脚本时回退到 EVAL。
+
+        Args:
+            script: Lua 脚本
+            keys: 脚本使用的键（KEYS）
+            args: 脚本参数（ARGV）
+
+        Returns:
+            脚本返回值
+        """
+        args = args or []
+        sha = self._scripts.get(script)
+        if sha is None:
+            sha = self._scripts[script] = hashlib.sha1(script.encode()).hexdigest()
+        try:
+            with span("redis.eval", keys=len(keys)):
+                try:
+                    return await self.client.evalsha(sha, len(keys), *keys, *args)
+                except Exception as e:
+                    if "NOSCRIPT" not in str(e):
+                        raise
+                    return await self.client.eval(script, len(keys), *keys, *args)
+        except Exception as e:
+            logger.error(f"Failed to eval script on keys {keys}: {e}")
+            raise
+
+
+_shared_retry_at: float = 0.0
+
+
+async def get_shared_redis() -> Optional[RedisSDK]:
+    """
+    获取进程内共享的 Redis 客户端（由基础设施注册表创建和关闭）
+
+    Returns:
+        已连接的 RedisSDK，Redis 不可用时返回 None，调用方应回退到数据库
+    """
+    global _shared_retry_at
+
+    sdk = registry.peek("redis")
+    if sdk is not None:
+        return sdk
+
+    now = time.monotonic()
+    if now < _shared_retry_at:
+        return None
+    # 先推迟下一次重试，避免并发请求同时发起连接
+    _shared_retry_at = now + SHARED_RETRY_INTERVAL
+
+    try:
+        return await registry.get("redis")
+    except Exception:
+        logger.warning(
+            f"Shared Redis unavailable, retry in {SHARED_RETRY_INTERVAL:.0f}s"
+        )
+        return None
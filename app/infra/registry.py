@@ -0,0 +1,175 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class InfraEntry:
+    """一个基础设施客户端的创建与关闭方式"""
+
+    factory: Callable[[], Awaitable[Any]]  # 创建并连接客户端
+    close: Optional[Callable[[Any], Awaitable[None]]] = None
+    eager: bool = False  # 是否在应用启动时创建
+    instance: Any = None
+    lock: Optional[asyncio.Lock] = field(default=None, repr=False)
+
+
+class InfraRegistry:
+    """基础设施客户端注册表
+
+    客户端（及其依赖的重量级第三方库）在首次 get 时才创建和导入；标记为 eager
+    的由 FastAPI lifespan 在启动时创建。关闭时按创建的逆序关闭。
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, InfraEntry] = {}
+        self._started: List[str] = []
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Awaitable[Any]],
+        close: Optional[Callable[[Any], Awaitable[None]]] = None,
+        eager: bool = False,
+    ) -> None:
+        """
+        注册客户端
+
+        Args:
+            name: 客户端名称
+            factory: 创建并连接客户端的协程函数，重量级依赖应在函数内导入
+            close: 关闭客户端的协程函数
+            eager: 是否在应用启动时创建
+        """
+        self._entries[name] = InfraEntry(factory=factory, close=close, eager=eager)
+
+    def adopt(self, name: str, instance: Any) -> None:
+        """
+        登记在注册表之外创建的客户端（如脚本或快速启动时由 SDK 按需创建），
+        关闭时一并关闭；已创建时忽略
+
+        Raises:
+            KeyError: 未注册的客户端
+        """
+        entry = self._entries[name]
+        if entry.instance is None:
+            entry.instance = instance
+            self._started.append(name)
+
+    def peek(self, name: str) -> Any:
+        """返回已创建的客户端，尚未创建时返回 None"""
+        return self._entries[name].instance
+
+    async def get(self, name: str) -> Any:
+        """
+        获取客户端，首次调用时创建
+
+        并发的首次调用只会创建一次；创建失败时抛出异常，下次调用重试。
+
+        Raises:
+            KeyError: 未注册的客户端
+        """
+        entry = self._entries[name]
+        if entry.instance is not None:
+            return entry.instance
+        if entry.lock is None:
+            entry.lock = asyncio.Lock()
+        async with entry.lock:
+            if entry.instance is None:
+                entry.instance = await entry.factory()
+                # 工厂函数内部可能已经 adopt 过
+                if name not in self._started:
+                    self._started.append(name)
+        return entry.instance
+
+    async def startup(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        创建启动时需要的客户端
+
+        Args:
+            names: 要创建的客户端，为空时创建所有 eager 客户端
+        """
+        if names is None:
+            names = [name for name, entry in self._entries.items() if entry.eager]
+        for name in names:
+            await self.get(name)
+
+    async def shutdown(self) -> None:
+        """按创建的逆序关闭所有已创建的客户端"""
+        while self._started:
+            name = self._started.pop()
+            entry = self._entries[name]
+            instance, entry.instance = entry.instance, None
+            if entry.close is None:
+                continue
+            try:
+                await entry.close(instance)
+            except Exception as e:
+                logger.error(f"Failed to close {name}: {e}")
+
+    def status(self) -> Dict[str, bool]:
+        """各客户端是否已创建"""
+        return {
+            name: entry.instance is not None for name, entry in self._entries.items()
+        }
+
+
+async def _connect_mongo():
+    from app.infra.mongo_db_sdk import MongoDBSDK
+
+    await MongoDBSDK.connect()
+    return MongoDBSDK
+
+
+async def _close_mongo(sdk) -> None:
+    await sdk.close()
+
+
+async def _connect_redis():
+    from app.infra.redis_sdk import RedisSDK
+
+    sdk = RedisSDK(get_settings().redis.url)
+    await sdk.connect()
+    return sdk
+
+
+async def _connect_elasticsearch():
+    from app.infra.elasticsearch_sdk import ElasticsearchSDK
+
+    cfg = get_settings().elasticsearch
+    auth = (cfg.username, cfg.password) if cfg.username and cfg.password else None
+    sdk = ElasticsearchSDK(hosts=[f"http://{cfg.host}:{cfg.port}"], basic_auth=auth)
+    await sdk.connect()
+    return sdk
+
+
+async def _create_openai():
+    # openai 导入耗时较长，仅在同步模型列表等用到时导入
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI()
+
+
+async def _create_shard_router():
+    from app.infra.sharding import shard_router
+
+    return shard_router
+
+
+async def _close_client(client) -> None:
+    await client.close()
+
+
+# 进程内共享的基础设施客户端
+registry = InfraRegistry()
+registry.register("mongo", _connect_mongo, _close_mongo, eager=True)
+# 分片客户端在首次使用时创建，启动时登记以便关闭时统一关闭
+registry.register("shards", _create_shard_router, _close_client, eager=True)
+registry.register("redis", _connect_redis, _close_client)
+registry.register("elasticsearch", _connect_elasticsearch, _close_client)
+registry.register("openai", _create_openai, _close_client)
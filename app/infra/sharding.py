@@ -0,0 +1,691 @@
+import asyncio
+import bisect
+import hashlib
+import heapq
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from pymongo import uri_parser
+from pymongo.errors import BulkWriteError
+from pymongo.results import DeleteResult, InsertManyResult, UpdateResult
+
+from app.infra.mongo_db_sdk import MongoDBSDK, client_options
+from app.infra.mongo_instrument import InstrumentedCollection
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+logger = get_logger(__name__)
+
+# 重新平衡时单个文档在移动期间被反复修改的最大重试次数
+MOVE_RETRIES = 5
+
+_MISSING = object()
+
+
+class HashRing:
+    """一致性哈希环
+
+    每个节点在环上放置 vnodes 个虚拟节点，键归属顺时针方向的第一个虚拟节点。
+    增加或移除一个节点时，只有约 1/N 的键改变归属。
+    """
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = 160):
+        """
+        Args:
+            nodes: 节点名称
+            vnodes: 每个节点的虚拟节点数，越多分布越均匀
+        """
+        self.nodes = list(nodes)
+        if not self.nodes:
+            raise ValueError("Hash ring needs at least one node")
+        points = sorted(
+            (self._hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+        )
+
+    def node_for(self, key: Any) -> str:
+        """键所属的节点"""
+        index = bisect.bisect(self._hashes, self._hash(str(key)))
+        return self._owners[index % len(self._owners)]
+
+
+@dataclass(frozen=True)
+class Shard:
+    name: str
+    uri: str
+    database: str
+
+
+def parse_shards(spec: str, default_database: str) -> List[Shard]:
+    """
+    解析分片配置
+
+    Args:
+        spec: "名称=MongoDB URI" 以分号分隔（URI 中可能有逗号分隔的多个主机），
+            如 "s0=mongodb://a:27017/lingverse;s1=mongodb://b1:27017,b2:27017/lingverse"
+        default_database: URI 中未指定数据库时使用的数据库
+
+    Returns:
+        List[Shard]: 分片列表，为空表示不分片
+
+    Raises:
+        ValueError: 格式错误或分片名称重复
+    """
+    shards: Dict[str, Shard] = {}
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        name, sep, uri = (part.strip() for part in item.partition("="))
+        if not sep or not name or not uri:
+            raise ValueError(f"Invalid shard spec: {item}")
+        if name in shards:
+            raise ValueError(f"Duplicate shard name: {name}")
+        database = uri_parser.parse_uri(uri)["database"] or default_database
+        shards[name] = Shard(name, uri, database)
+    return list(shards.values())
+
+
+class _SortValue:
+    """归并排序用的排序值：None 最小，降序时反转比较结果"""
+
+    __slots__ = ("value", "descending")
+
+    def __init__(self, value: Any, descending: bool):
+        self.value = value
+        self.descending = descending
+
+    def __eq__(self, other: "_SortValue") -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other: "_SortValue") -> bool:
+        a, b = self.value, other.value
+        if a == b:
+            return False
+        if a is None or b is None:
+            less = a is None
+        else:
+            try:
+                less = a < b
+            except TypeError:
+                # 不同类型的值按类型名排序，保证顺序稳定
+                less = type(a).__name__ < type(b).__name__
+        return less != self.descending
+
+
+class ScatterCursor:
+    """跨分片查询的游标
+
+    各分片以相同的条件和排序查询（limit 为 skip + limit），结果按排序字段归并后
+    再执行 skip/limit。支持 sort/skip/limit 链式调用、to_list 与 async for。
+
+    dedupe 为 True 时（重新平衡期间），移动中的文档可能同时存在于源分片和目标分片，
+    按 _id 去重后再执行 skip/limit。
+    """
+
+    def __init__(
+        self,
+        collections: List[InstrumentedCollection],
+        filter: Any,
+        projection: Optional[Dict[str, Any]],
+        sort: Optional[List[Tuple[str, int]]],
+        kwargs: Dict[str, Any],
+        dedupe: bool = False,
+    ):
+        self._collections = collections
+        self._filter = filter
+        self._projection = projection
+        self._sort = sort
+        self._kwargs = kwargs
+        self._dedupe = dedupe
+        self._skip = 0
+        self._limit = 0
+        self._cursors: List[Any] = []
+        self._iterator: Optional[AsyncIterator] = None
+
+    def sort(self, key, direction=None) -> "ScatterCursor":
+        self._sort = [(key, direction or 1)] if isinstance(key, str) else list(key)
+        return self
+
+    def skip(self, n: int) -> "ScatterCursor":
+        self._skip = n
+        return self
+
+    def limit(self, n: int) -> "ScatterCursor":
+        self._limit = n
+        return self
+
+    def _fetch_projection(self) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """确保排序字段及去重用的 _id 被返回，返回 (查询用投影, 需从结果中去掉的字段)"""
+        needed = [field for field, _ in self._sort or ()]
+        if self._dedupe:
+            needed.append("_id")
+        if not self._projection or not needed:
+            return self._projection, []
+        projection = dict(self._projection)
+        inclusive = any(v for k, v in projection.items() if k != "_id")
+        added = []
+        for field in needed:
+            # 包含式投影默认返回 _id，除非显式指定 _id: 0
+            if inclusive and not projection.get(field, field == "_id"):
+                projection[field] = 1
+                added.append(field)
+            elif not inclusive and field in projection:
+                del projection[field]
+                added.append(field)
+        return projection, added
+
+    def _open(self) -> List[str]:
+        projection, added = self._fetch_projection()
+        self._cursors = []
+        for collection in self._collections:
+            cursor = collection.find(self._filter, projection, **self._kwargs)
+            if self._sort:
+                cursor = cursor.sort(self._sort)
+            if self._limit:
+                cursor = cursor.limit(self._skip + self._limit)
+            self._cursors.append(cursor)
+        return added
+
+    def _key(self, doc: Dict[str, Any]) -> Tuple:
+        return tuple(
+            _SortValue(doc.get(field), direction < 0)
+            for field, direction in self._sort or ()
+        )
+
+    @staticmethod
+    def _strip(doc: Dict[str, Any], added: List[str]) -> Dict[str, Any]:
+        for field in added:
+            doc.pop(field, None)
+        return doc
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        added = self._open()
+        results = await asyncio.gather(
+            *(cursor.to_list(length=None) for cursor in self._cursors)
+        )
+        if self._sort:
+            docs = list(heapq.merge(*results, key=self._key))
+        else:
+            docs = [doc for result in results for doc in result]
+        if self._dedupe:
+            seen, unique = set(), []
+            for doc in docs:
+                if doc["_id"] not in seen:
+                    seen.add(doc["_id"])
+                    unique.append(doc)
+            docs = unique
+        docs = docs[self._skip :]
+        if self._limit:
+            docs = docs[: self._limit]
+        if length:
+            docs = docs[:length]
+        return [self._strip(doc, added) for doc in docs]
+
+    async def _merge(self) -> AsyncIterator[Dict[str, Any]]:
+        added = self._open()
+        iterators = [cursor.__aiter__() for cursor in self._cursors]
+
+        async def pull(index: int) -> Optional[Dict[str, Any]]:
+            try:
+                return await iterators[index].__anext__()
+            except StopAsyncIteration:
+                return None
+
+        try:
+            heads = await asyncio.gather(*(pull(i) for i in range(len(iterators))))
+            heap = [
+                (self._key(doc), i, doc)
+                for i, doc in enumerate(heads)
+                if doc is not None
+            ]
+            heapq.heapify(heap)
+            skipped = returned = 0
+            seen = set()
+            while heap:
+                _, index, doc = heapq.heappop(heap)
+                following = await pull(index)
+                if following is not None:
+                    heapq.heappush(heap, (self._key(following), index, following))
+                if self._dedupe:
+                    if doc["_id"] in seen:
+                        continue
+                    seen.add(doc["_id"])
+                if skipped < self._skip:
+                    skipped += 1
+                    continue
+                yield self._strip(doc, added)
+                returned += 1
+                if self._limit and returned >= self._limit:
+                    break
+        finally:
+            # 正常结束、提前退出（close）或出错时都释放各分片的游标
+            await self._close_cursors()
+
+    def __aiter__(self):
+        self._iterator = self._merge()
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self._iterator.__anext__()
+
+    async def _close_cursors(self) -> None:
+        cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            await cursor.close()
+
+    async def close(self) -> None:
+        """关闭各分片的游标，迭代未结束时同时结束归并生成器"""
+        iterator, self._iterator = self._iterator, None
+        if iterator is not None:
+            await iterator.aclose()
+        await self._close_cursors()
+
+
+def _hit(result: Any) -> bool:
+    """单文档写操作是否命中了文档"""
+    if result is None:
+        return False
+    for attr in ("matched_count", "deleted_count"):
+        if hasattr(result, attr):
+            return getattr(result, attr) > 0
+    return True
+
+
+class ShardedCollection:
+    """分片集合
+
+    实现模型层用到的集合操作：查询条件带分片键（等值或 $in）时只访问对应分片，
+    否则访问所有分片（scatter-gather）并合并结果；插入按文档的分片键选择分片。
+    各分片的集合仍是 InstrumentedCollection，耗时统计与慢查询日志照常记录。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        shard_key: str,
+        collections: Dict[str, InstrumentedCollection],
+        router: "ShardRouter",
+    ):
+        self.name = name
+        self.shard_key = shard_key
+        self.collections = collections
+        self.router = router
+
+    def with_options(self, **kwargs) -> "ShardedCollection":
+        return ShardedCollection(
+            self.name,
+            self.shard_key,
+            {
+                name: collection.with_options(**kwargs)
+                for name, collection in self.collections.items()
+            },
+            self.router,
+        )
+
+    def __getattr__(self, name: str):
+        raise AttributeError(f"{name} is not supported on sharded collection")
+
+    def _targets(self, filter: Optional[Dict[str, Any]]) -> List[str]:
+        """查询条件涉及的分片"""
+        value = (filter or {}).get(self.shard_key, _MISSING)
+        if value is _MISSING or self.router.migrating:
+            return list(self.collections)
+        if isinstance(value, dict):
+            if set(value) == {"$eq"}:
+                value = value["$eq"]
+            elif set(value) == {"$in"}:
+                targets = {self.router.shard_for(v) for v in value["$in"]}
+                return [name for name in self.collections if name in targets]
+            else:
+                return list(self.collections)
+        return [self.router.shard_for(value)]
+
+    def _shard_for_doc(self, document: Dict[str, Any]) -> str:
+        if self.shard_key not in document:
+            raise ValueError(
+                f"Document for sharded collection {self.name} "
+                f"is missing shard key {self.shard_key}"
+            )
+        return self.router.shard_for(document[self.shard_key])
+
+    async def _gather(self, targets: List[str], operation: str, *args, **kwargs):
+        return await asyncio.gather(
+            *(
+                getattr(self.collections[name], operation)(*args, **kwargs)
+                for name in targets
+            )
+        )
+
+    def find(self, filter=None, projection=None, *args, sort=None, **kwargs):
+        targets = self._targets(filter)
+        if len(targets) == 1:
+            collection = self.collections[targets[0]]
+            if sort is not None:
+                kwargs["sort"] = sort
+            return collection.find(filter, projection, *args, **kwargs)
+        return ScatterCursor(
+            [self.collections[name] for name in targets],
+            filter,
+            projection,
+            sort,
+            kwargs,
+            dedupe=self.router.migrating,
+        )
+
+    async def find_one(self, filter=None, *args, sort=None, **kwargs):
+        targets = self._targets(filter)
+        if sort is not None:
+            if len(targets) > 1:
+                # 各分片的第一条不一定是全局第一条，按排序归并后取第一条
+                cursor = self.find(filter, *args, sort=sort, **kwargs)
+                docs = await cursor.limit(1).to_list(1)
+                return docs[0] if docs else None
+            kwargs["sort"] = sort
+        results = await self._gather(targets, "find_one", filter, *args, **kwargs)
+        return next((doc for doc in results if doc is not None), None)
+
+    async def count_documents(self, filter, **kwargs) -> int:
+        return sum(
+            await self._gather(
+                self._targets(filter), "count_documents", filter, **kwargs
+            )
+        )
+
+    async def insert_one(self, document, **kwargs):
+        collection = self.collections[self._shard_for_doc(document)]
+        return await collection.insert_one(document, **kwargs)
+
+    async def insert_many(self, documents, ordered: bool = True, **kwargs):
+        """
+        按分片分组后并发插入
+
+        ordered 只在单个分片内生效；任一分片有写入错误时抛出 BulkWriteError，
+        writeErrors 中的 index 为文档在 documents 中的位置。
+        """
+        documents = list(documents)
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for position, document in enumerate(documents):
+            groups[self._shard_for_doc(document)].append(position)
+
+        names = list(groups)
+        results = await asyncio.gather(
+            *(
+                self.collections[name].insert_many(
+                    [documents[p] for p in groups[name]], ordered=ordered, **kwargs
+                )
+                for name in names
+            ),
+            return_exceptions=True,
+        )
+        write_errors = []
+        for name, result in zip(names, results):
+            if isinstance(result, BulkWriteError):
+                for error in result.details.get("writeErrors", []):
+                    write_errors.append(
+                        {**error, "index": groups[name][error["index"]]}
+                    )
+            elif isinstance(result, BaseException):
+                raise result
+        if write_errors:
+            write_errors.sort(key=lambda error: error["index"])
+            raise BulkWriteError(
+                {"writeErrors": write_errors, "writeConcernErrors": []}
+            )
+        return InsertManyResult([document["_id"] for document in documents], True)
+
+    async def _write_one(self, operation: str, filter, *args, **kwargs):
+        """
+        单文档写操作
+
+        不带分片键时：按 _id 查询的（_id 全局唯一）并发发往所有分片，其他条件按
+        分片顺序逐个尝试，直到命中一个文档为止。
+        """
+        targets = self._targets(filter)
+        if len(targets) == 1:
+            method = getattr(self.collections[targets[0]], operation)
+            return await method(filter, *args, **kwargs)
+        if kwargs.get("upsert"):
+            raise ValueError(
+                f"Upsert on sharded collection {self.name} requires {self.shard_key}"
+            )
+        if "_id" in filter:
+            results = await self._gather(targets, operation, filter, *args, **kwargs)
+            return next((result for result in results if _hit(result)), results[0])
+        result = None
+        for name in targets:
+            result = await getattr(self.collections[name], operation)(
+                filter, *args, **kwargs
+            )
+            if _hit(result):
+                break
+        return result
+
+    async def update_one(self, filter, update, **kwargs):
+        return await self._write_one("update_one", filter, update, **kwargs)
+
+    async def replace_one(self, filter, replacement, **kwargs):
+        return await self._write_one("replace_one", filter, replacement, **kwargs)
+
+    async def delete_one(self, filter, **kwargs):
+        return await self._write_one("delete_one", filter, **kwargs)
+
+    async def find_one_and_update(self, filter, update, **kwargs):
+        return await self._write_one("find_one_and_update", filter, update, **kwargs)
+
+    async def update_many(self, filter, update, **kwargs) -> UpdateResult:
+        results = await self._gather(
+            self._targets(filter), "update_many", filter, update, **kwargs
+        )
+        return UpdateResult(
+            {
+                "n": sum(result.matched_count for result in results),
+                "nModified": sum(result.modified_count for result in results),
+                "ok": 1.0,
+            },
+            True,
+        )
+
+    async def delete_many(self, filter, **kwargs) -> DeleteResult:
+        results = await self._gather(
+            self._targets(filter), "delete_many", filter, **kwargs
+        )
+        return DeleteResult(
+            {"n": sum(result.deleted_count for result in results), "ok": 1.0}, True
+        )
+
+    async def index_information(self) -> Dict[str, Any]:
+        """
+        各分片上定义一致的索引
+
+        只在部分分片存在的索引不返回（sync_indexes 视为缺失并在所有分片创建，
+        已存在的分片上创建同样的索引不会有影响）；定义不一致时返回其中一个分片的
+        定义，由 sync_indexes 报告为 changed。
+        """
+        infos = await self._gather(list(self.collections), "index_information")
+        result = {}
+        for name, info in infos[0].items():
+            others = [other.get(name) for other in infos[1:]]
+            if all(other is not None for other in others):
+                changed = next((other for other in others if other != info), None)
+                result[name] = changed or info
+        return result
+
+    async def create_indexes(self, indexes, **kwargs) -> List[str]:
+        results = await self._gather(
+            list(self.collections), "create_indexes", indexes, **kwargs
+        )
+        return results[0]
+
+
+class ShardRouter:
+    """分片路由
+
+    按模型声明的分片键（MongoBaseModel.shard_key）用一致性哈希把文档分布到配置的
+    多个 MongoDB 数据库/集群；各分片的客户端在首次使用时创建，同一 URI 共用客户端。
+    请求范围的因果一致会话只作用于默认 MongoDB 客户端，不用于分片。
+    """
+
+    def __init__(self, shards: List[Shard], vnodes: int = 160, migrating: bool = False):
+        """
+        Args:
+            shards: 分片列表，为空表示不分片
+            vnodes: 每个分片在哈希环上的虚拟节点数
+            migrating: 重新平衡中，带分片键的操作也访问所有分片
+        """
+        self.shards = {shard.name: shard for shard in shards}
+        self.ring = HashRing(self.shards, vnodes) if shards else None
+        self.migrating = migrating
+        self._clients: Dict[str, "AsyncIOMotorClient"] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ShardRouter":
+        settings = get_settings()
+        cfg = settings.sharding
+        return cls(
+            parse_shards(cfg.shards, settings.mongodb.database),
+            vnodes=cfg.vnodes,
+            migrating=cfg.migrating,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.shards)
+
+    def shard_for(self, value: Any) -> str:
+        """分片键值所属的分片"""
+        return self.ring.node_for(value)
+
+    def get_db(self, name: str) -> "AsyncIOMotorDatabase":
+        """获取分片的数据库，客户端尚未创建时创建"""
+        shard = self.shards[name]
+        client = self._clients.get(shard.uri)
+        if client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+
+            client = AsyncIOMotorClient(shard.uri, **client_options(MongoDBSDK.cfg))
+            self._clients[shard.uri] = client
+        return client[shard.database]
+
+    def collection(self, name: str, shard_key: str) -> ShardedCollection:
+        """获取分片集合"""
+        return ShardedCollection(
+            name,
+            shard_key,
+            {
+                shard: InstrumentedCollection(self.get_db(shard)[name])
+                for shard in self.shards
+            },
+            self,
+        )
+
+    async def rebalance(
+        self,
+        name: str,
+        shard_key: str,
+        dry_run: bool = False,
+        batch_size: int = 500,
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        把各分片中不属于该分片的文档移动到所属分片
+
+        逐个文档先写入目标分片（覆盖中断后残留的旧副本），再以 updated_at 未变为
+        条件从源分片删除；读取后源文档被修改时删除失败，重新读取源文档再次复制，
+        因此移动期间的修改不会丢失。中断后可重复执行。
+
+        迁移期间应开启 SHARDING_MIGRATING，使带分片键的读写也访问所有分片，跨分片
+        查询按 _id 去重；修改文档时需更新 updated_at（模型的写操作均会更新），否则
+        无法发现并发修改。移动中的文档短暂同时存在于两个分片，count_documents 可能
+        多计。
+
+        Args:
+            name: 集合名
+            shard_key: 分片键
+            dry_run: 只统计，不移动
+            batch_size: 每批移动的文档数
+
+        Returns:
+            Dict[Tuple[str, str], int]: (源分片, 目标分片) -> 文档数
+        """
+        moved: Counter = Counter()
+        for source in self.shards:
+            collection = InstrumentedCollection(self.get_db(source)[name])
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            async for doc in collection.find({}, batch_size=batch_size):
+                if shard_key not in doc:
+                    logger.warning(
+                        f"Document {doc['_id']} in {source}.{name} has no {shard_key}"
+                    )
+                    continue
+                target = self.shard_for(doc[shard_key])
+                if target == source:
+                    continue
+                moved[(source, target)] += 1
+                if dry_run:
+                    continue
+                batch.append((target, doc))
+                if len(batch) >= batch_size:
+                    await self._move(name, source, batch)
+                    batch = []
+            if batch:
+                await self._move(name, source, batch)
+        return dict(moved)
+
+    async def _move(
+        self, name: str, source: str, batch: List[Tuple[str, Dict[str, Any]]]
+    ) -> None:
+        """
+        把一批文档从源分片移到各自的目标分片
+
+        Raises:
+            RuntimeError: 文档在 MOVE_RETRIES 次重试后仍在被修改，稍后重跑即可
+        """
+        source_collection = InstrumentedCollection(self.get_db(source)[name])
+        for target, doc in batch:
+            target_collection = InstrumentedCollection(self.get_db(target)[name])
+            id = doc["_id"]
+            for _ in range(MOVE_RETRIES):
+                await target_collection.replace_one({"_id": id}, doc, upsert=True)
+                result = await source_collection.delete_one(
+                    {"_id": id, "updated_at": doc.get("updated_at")}
+                )
+                if result.deleted_count:
+                    break
+                doc = await source_collection.find_one({"_id": id})
+                if doc is None:
+                    # 源文档在移动期间被删除，删除刚写入的副本
+                    await target_collection.delete_one({"_id": id})
+                    break
+            else:
+                raise RuntimeError(
+                    f"Document {id} in {source}.{name} kept changing during rebalance"
+                )
+
+    async def close(self) -> None:
+        """关闭所有分片客户端"""
+        for client in self._clients.values():
+            client.close()
+        self._clients.clear()
+
+
+# 进程内共享的分片路由，未配置 SHARDING_SHARDS 时不分片
+shard_router = ShardRouter.from_settings()
@@ -1,24 +1,62 @@
-from fastapi import FastAPI, HTTPException, Security
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException, Security
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.security import APIKeyHeader
 from starlette.middleware.exceptions import ExceptionMiddleware
 
+from app.dependencies.database import mongo_session
+from app.infra.registry import registry
 from app.middlewares.auth import AuthMiddleware
+from app.middlewares.rate_limit import RateLimitMiddleware
 from app.middlewares.request_id import RequestIDMiddleware
 from app.middlewares.request_timer import RequestTimerMiddleware
+from app.models.indexes import sync_indexes_on_startup
 from app.routers import conversation_router
+from app.routers.admin_router import router as admin_router
 from app.routers.llm_router import router as llm_router
 from app.routers.memory_router import router as memory_router
 from app.routers.person_router import router as person_router
 from app.routers.tool_router import router as tool_router
+from app.utils.config import get_settings
+from app.utils.loop_monitor import loop_monitor
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
 
 # 定义安全方案
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动与关闭"""
+    settings = get_settings()
+    if settings.monitor.enabled:
+        loop_monitor.start()
+    if not settings.startup.fast:
+        await registry.startup()
+    else:
+        # 分片路由创建时不连接，仍需登记以便关闭时关闭按需创建的分片客户端
+        await registry.startup(["shards"])
+    # 索引在后台创建，不阻塞启动
+    index_task = (
+        asyncio.create_task(sync_indexes_on_startup())
+        if settings.mongodb.sync_indexes
+        else None
+    )
+    try:
+        yield
+    finally:
+        if index_task is not None and not index_task.done():
+            index_task.cancel()
+        await registry.shutdown()
+        loop_monitor.stop()
+
+
 app = FastAPI(
     title="LingVerse API",
     description="LingVerse API documentation",
@@ -30,11 +68,16 @@ app = FastAPI(
         {"name": "Persons", "description": "Person operations"},
         {"name": "Tools", "description": "Tool operations"},
         {"name": "conversations", "description": "Conversation operations"},
+        {"name": "Admin", "description": "Admin and diagnostics operations"},
     ],
     swagger_ui_parameters={"defaultModelsExpandDepth": -1},
+    # 启用读写分离时每个请求使用因果一致会话
+    dependencies=[Depends(mongo_session)],
+    lifespan=lifespan,
 )
 
 # 配置 OpenAPI 的安全方案
+app.add_middleware(RateLimitMiddleware)  # 位于认证之后，按用户限流
 app.add_middleware(AuthMiddleware)  # 确保在其他中间件之前添加
 
 app.swagger_ui_init_oauth = {
@@ -101,6 +144,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
 app.add_middleware(RequestIDMiddleware)  # 添加请求ID
 app.add_middleware(RequestTimerMiddleware)  # 记录所有请求
@@ -115,8 +159,15 @@ app.include_router(tool_router, prefix="/api/tools", tags=["Tools"])
 app.include_router(
     conversation_router.router, prefix="/api/conversations", tags=["conversations"]
 )
+app.include_router(admin_router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to LingVerse!"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus 文本格式的指标（无需认证）"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,36 +1,59 @@
-from fastapi import HTTPException, Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.models.person import Person
 from app.utils.logger import get_logger
+from app.utils.tracing import span
 
 logger = get_logger(__name__)
 
+# 跳过认证的路径
+PUBLIC_PATHS = (
+    "/",
+    "/docs",
+    "/openapi.json",
+    "/metrics",
+)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # 跳过根路径的认证
-        if request.url.path in (
-            "/",
-            "/docs",
-            "/openapi.json",
-        ):
-            return await call_next(request)
+
+class AuthMiddleware:
+    """基于 access_token 的认证中间件（纯 ASGI 实现）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # 跳过非 HTTP 请求和根路径的认证
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # 获取 access_token
-        access_token = request.headers.get("Authorization")
+        access_token = Headers(scope=scope).get("Authorization")
         if not access_token:
             logger.warning("Missing access token")
-            raise HTTPException(status_code=401, detail="Missing access token")
+            await self.unauthorized(scope, receive, send, "Missing access token")
+            return
         # 验证 access_token
-        person = await Person.get_by_single_field("access_token", access_token)
+        with span("middleware.auth"):
+            person = await Person.get_by_access_token(access_token)
         if not person or person.is_deleted or person.role not in ("admin", "human"):
             logger.warning(f"Invalid access token or unauthorized user: {access_token}")
-            raise HTTPException(
-                status_code=401, detail="Invalid access token or unauthorized user"
+            await self.unauthorized(
+                scope, receive, send, "Invalid access token or unauthorized user"
             )
+            return
+
+        # 将验证通过的用户信息添加到请求状态中（即 request.state.person）
+        scope.setdefault("state", {})["person"] = person
 
-        # 将验证通过的用户信息添加到请求状态中
-        request.state.person = person
+        await self.app(scope, receive, send)
 
-        return await call_next(request)
+    @staticmethod
+    async def unauthorized(scope: Scope, receive: Receive, send: Send, detail: str):
+        response = JSONResponse(
+            status_code=401,
+            content={"success": False, "message": detail, "data": None},
+        )
+        await response(scope, receive, send)
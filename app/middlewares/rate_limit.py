@@ -0,0 +1,118 @@
+import math
+from typing import Dict, List, Optional
+
+from starlette.responses import JSONResponse
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
+from app.utils.rate_limiter import RateLimiter
+from app.utils.tracing import span
+
+logger = get_logger(__name__)
+
+RATE_LIMIT_DECISIONS = REGISTRY.counter(
+    "rate_limit_decisions_total",
+    "Rate limiter decisions",
+    ["rule", "result", "source"],
+)
+
+# 各路由的默认额度（每秒请求数/突发请求数），可通过 RATELIMIT_ROUTES 覆盖
+ROUTE_LIMITS: Dict[str, str] = {
+    "GET /api/conversations/{conversation_id}/messages": "2/10",
+    "PUT /api/conversations/{conversation_id}/messages": "2/10",
+    "POST /api/llms/sync": "0.1/2",
+}
+
+
+class RateLimitRule:
+    """一条路由限流规则"""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.method: Optional[str] = None
+        self.regex = None
+        if name != "default":
+            self.method, path = name.split(" ", 1)
+            self.regex = compile_path(path)[0]
+
+    @classmethod
+    def parse(cls, name: str, budget: str) -> "RateLimitRule":
+        rate, burst = budget.split("/")
+        return cls(name, float(rate), int(burst))
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.regex.match(path) is not None
+
+
+class RateLimitMiddleware:
+    """按用户和路由限流的中间件（纯 ASGI 实现）
+
+    需放在 AuthMiddleware 内层，以认证得到的 Person ID 为限流键；
+    未认证的请求（公开路径）不限流。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[RateLimiter] = None,
+        routes: Optional[Dict[str, str]] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+    ):
+        cfg = get_settings().ratelimit
+        self.app = app
+        self.enabled = cfg.enabled
+        self.limiter = limiter or RateLimiter(lease_size=cfg.lease_size)
+        routes = {**ROUTE_LIMITS, **cfg.routes} if routes is None else routes
+        self.rules: List[RateLimitRule] = [
+            RateLimitRule.parse(name, budget) for name, budget in routes.items()
+        ]
+        self.default = RateLimitRule(
+            "default",
+            cfg.rate if rate is None else rate,
+            cfg.burst if burst is None else burst,
+        )
+
+    def match(self, method: str, path: str) -> RateLimitRule:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return self.default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        person = (
+            scope.get("state", {}).get("person") if scope["type"] == "http" else None
+        )
+        if not self.enabled or person is None:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.match(scope["method"], scope["path"])
+        with span("middleware.rate_limit", rule=rule.name):
+            allowed, retry_after, source = await self.limiter.acquire(
+                f"{person.id}:{rule.name}", rule.rate, rule.burst
+            )
+        RATE_LIMIT_DECISIONS.labels(
+            rule.name, "allowed" if allowed else "rejected", source
+        ).inc()
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+
+        if source != "local":
+            # 本地拒绝不重复记录，避免被刷日志
+            logger.warning(
+                f"Rate limited person {person.id} on {rule.name}, "
+                f"retry after {retry_after:.2f}s"
+            )
+        response = JSONResponse(
+            status_code=429,
+            content={"success": False, "message": "Too many requests", "data": None},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
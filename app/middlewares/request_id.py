@@ -1,23 +1,43 @@
 import uuid
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.request_id import reset_request_id, set_request_id
+from app.utils.tracing import start_trace
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class RequestIDMiddleware:
+    """请求 ID 中间件（纯 ASGI 实现）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # 从请求头中获取请求 ID，如果没有则生成新的
-        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        request_id = Headers(scope=scope).get("X-Request-ID") or uuid.uuid4().hex
         set_request_id(request_id)
 
+        root_span = None
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                # 将请求 ID 添加到响应头
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+                if root_span is not None:
+                    root_span.set_attribute("status", message["status"])
+            await send(message)
+
         try:
-            response = await call_next(request)
-            # 将请求 ID 添加到响应头
-            if request_id:  # 只在有 request_id 时设置响应头
-                response.headers["X-Request-ID"] = request_id
-            return response
+            # 以请求 ID 作为 trace ID
+            with start_trace(
+                "http.request", request_id, method=scope["method"], path=scope["path"]
+            ) as root_span:
+                await self.app(scope, receive, send_wrapper)
         finally:
             # 请求结束后重置请求 ID
             reset_request_id()
@@ -1,43 +1,109 @@
 import time
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.utils.db_stats import reset_db_stats, start_db_stats
 from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
 
 logger = get_logger(__name__)
 
+REQUESTS_TOTAL = REGISTRY.counter(
+    "http_requests_total", "Total HTTP requests", ["method", "route", "status"]
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "HTTP response body size",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000),
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
 
-class RequestTimerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # 记录请求开始时间
-        start_time = time.time()
 
-        # 记录请求信息
-        logger.info(f"Request started: {request.method} {request.url.path}")
+def route_template(scope: Scope) -> str:
+    """获取路由模板（如 /api/conversations/{conversation_id}），避免原始路径导致标签爆炸"""
+    route = scope.get("route")
+    if route is None:
+        return "<unmatched>"
+    return getattr(route, "path_format", None) or getattr(route, "path", "<unknown>")
 
-        try:
-            # 处理请求
-            response = await call_next(request)
 
-            # 计算耗时
-            process_time = (time.time() - start_time) * 1000  # 转换为毫秒
+class RequestTimerMiddleware:
+    """请求耗时中间件（纯 ASGI 实现）"""
 
-            # 记录请求完成信息
-            logger.info(
-                f"Request completed: {request.method} {request.url.path} {response.status_code} {process_time:.2f}ms"
-            )
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 记录请求开始时间
+        start_time = time.perf_counter()
+        method, path = scope["method"], scope["path"]
+        status_code = 500
+        response_size = 0
+        db_stats = start_db_stats()
+
+        # 记录请求信息
+        logger.info(f"Request started: {method} {path}")
 
-            # 在响应头中添加处理时间
-            response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
-            return response
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status_code = message["status"]
+                # 在响应头中添加处理时间
+                process_time = (time.perf_counter() - start_time) * 1000
+                headers = MutableHeaders(scope=message)
+                headers["X-Process-Time"] = f"{process_time:.2f}ms"
+                # 数据库操作次数与累计耗时
+                headers["X-DB-Count"] = str(db_stats.count)
+                headers["X-DB-Time"] = f"{db_stats.time * 1000:.2f}ms"
+            await send(message)
 
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            # 处理请求
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
             # 记录请求失败信息
-            process_time = (time.time() - start_time) * 1000
+            process_time = (time.perf_counter() - start_time) * 1000
             logger.error(
-                f"Request failed: {request.method} {request.url.path} "
+                f"Request failed: {method} {path} "
                 f"- Error: {str(e)} "
                 f"- Duration: {process_time:.2f}ms"
             )
             raise
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            reset_db_stats()
+            self.observe(scope, status_code, start_time, response_size)
+
+        # 记录请求完成信息（包含响应体发送耗时）
+        process_time = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"Request completed: {method} {path} {status_code} {process_time:.2f}ms "
+            f"db={db_stats.count}/{db_stats.time * 1000:.2f}ms"
+        )
+
+    @staticmethod
+    def observe(scope: Scope, status_code: int, start_time: float, size: int):
+        """记录请求指标"""
+        method, route = scope["method"], route_template(scope)
+        status = str(status_code)
+        REQUESTS_TOTAL.labels(method, route, status).inc()
+        REQUEST_DURATION.labels(method, route, status).observe(
+            time.perf_counter() - start_time
+        )
+        RESPONSE_SIZE.labels(method, route).observe(size)
@@ -1,23 +1,110 @@
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorCollection
 from pydantic import BaseModel as PydanticBaseModel
-from pydantic import Field
+from pydantic import Field, ValidationError
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, OperationFailure
 
 from app.infra.mongo_db_sdk import MongoDBSDK
+from app.infra.mongo_instrument import InstrumentedCollection
+from app.infra.mongo_session import current_read_preference
+from app.infra.sharding import ShardedCollection, shard_router
+from app.utils.config import get_settings
 from app.utils.datetime_utils import get_china_now
-from app.utils.logger import get_logger
+from app.utils.logger import get_logger, sampled
+from app.utils.model_cache import model_cache
+from app.utils.pagination import Page, decode_cursor, encode_cursor
 
 logger = get_logger(__name__)
 
 T = TypeVar("T", bound="MongoBaseModel")
 
+# 部分索引的过滤条件：只索引未删除的文档，查询条件需包含 is_deleted: False
+ACTIVE_ONLY = {"is_deleted": False}
+
+# 对比索引定义时检查的选项
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+# create_many 默认每批插入的文档数
+BULK_CHUNK_SIZE = get_settings().mongodb.bulk_chunk_size
+
+# 可直接共享、无需复制的默认值类型
+IMMUTABLE_DEFAULTS = (type(None), str, int, float, bool)
+
+
+@dataclass
+class _PartialPlan:
+    """按 (模型类, 投影) 缓存的部分模型构造方式，见 MongoBaseModel._from_doc"""
+
+    loaded: List[Tuple[str, str]]  # 读取的字段：[(字段名, 文档中的键)]
+    defaults: Dict[str, Any]  # 未读取且默认值可共享的字段
+    factories: List[Tuple[str, Callable[[], Any]]]  # 未读取且需每次生成默认值的字段
+    fields_set: frozenset
+
+
+# _from_doc 的部分模型构造缓存；投影由代码给出，种类有限
+_PARTIAL_PLANS: Dict[Tuple[type, frozenset], _PartialPlan] = {}
+
+
+@dataclass
+class BulkCreateError:
+    """批量创建中单个文档的错误"""
+
+    index: int  # 在传入数据中的位置
+    error: str
+
+
+@dataclass
+class BulkCreateResult(Generic[T]):
+    """批量创建结果"""
+
+    created: List[T] = dataclass_field(default_factory=list)
+    errors: List[BulkCreateError] = dataclass_field(default_factory=list)
+
 
 class MongoBaseModel(PydanticBaseModel):
     """MongoDB基础数据模型，提供通用的CRUD操作"""
 
+    # 声明式索引，由 sync_indexes 与数据库对齐；子类在此基础上追加，如
+    # indexes = MongoBaseModel.indexes + [IndexModel("owner_id")]
+    indexes: ClassVar[List[IndexModel]] = [
+        IndexModel("created_at"),
+        IndexModel("updated_at"),
+        IndexModel("is_deleted"),
+    ]
+
+    # 是否为 get_by_id 启用 Redis 读穿透缓存（适合读多写少的模型），修改/删除时按
+    # 版本号失效；直接操作 collection() 修改文档时需自行调用 _invalidate_cache
+    cached: ClassVar[bool] = False
+    cache_ttl: ClassVar[Optional[int]] = (
+        None  # 缓存过期时间（秒），为空时使用 CACHE_TTL
+    )
+    # 不写入缓存的敏感字段（如密钥）；需要读取这些字段时 get_by_id 直接查询数据库
+    cache_exclude: ClassVar[FrozenSet[str]] = frozenset()
+
+    # 分片键：配置了分片时按该字段的值把文档分布到各分片，为空不分片
+    shard_key: ClassVar[Optional[str]] = None
+
     id: Optional[str] = Field(None, alias="_id")
     created_at: datetime = Field(default_factory=get_china_now)
     updated_at: datetime = Field(default_factory=get_china_now)
@@ -33,16 +120,204 @@ class MongoBaseModel(PydanticBaseModel):
         return cls.__name__.lower()
 
     @classmethod
-    def collection(cls) -> AsyncIOMotorCollection:
-        return MongoDBSDK.db[cls.collection_name()]
+    def collection(cls) -> Union[InstrumentedCollection, ShardedCollection]:
+        """
+        获取集合（带耗时统计的 Motor 集合代理）
+
+        声明了 shard_key 且配置了分片（SHARDING_SHARDS）时返回分片集合，按分片键
+        路由到各分片。
+        """
+        if cls.shard_key and shard_router.enabled:
+            return shard_router.collection(cls.collection_name(), cls.shard_key)
+        return InstrumentedCollection(MongoDBSDK.get_db()[cls.collection_name()])
+
+    @classmethod
+    def _read_collection(cls) -> InstrumentedCollection:
+        """
+        获取读操作使用的集合
+
+        按当前上下文的读偏好（路由依赖 SecondaryReads 或 read_from）路由到从节点，
+        未设置时读主节点；写操作始终使用 collection()。
+
+        分片集合始终读主节点：分片属于其他集群，请求的因果一致会话不能用于
+        分片客户端，从节点读取无法保证读到用户自己刚写入的数据（如刚发送的消息）。
+        """
+        collection = cls.collection()
+        preference = current_read_preference()
+        if preference is None or isinstance(collection, ShardedCollection):
+            return collection
+        return collection.with_options(read_preference=preference)
+
+    @classmethod
+    def _projection(
+        cls,
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
+    ) -> Optional[Dict[str, int]]:
+        """
+        将字段名转换为 Mongo 投影
+
+        Args:
+            fields: 只读取这些字段（_id 总会读取）
+            exclude_fields: 不读取这些字段，不能与 fields 同时使用
+
+        Returns:
+            Optional[Dict[str, int]]: 投影，未指定字段时为 None
+        """
+        if fields is None and exclude_fields is None:
+            return None
+        if fields is not None and exclude_fields is not None:
+            raise ValueError("fields and exclude_fields cannot be used together")
+        names = set(fields if fields is not None else exclude_fields)
+        unknown = names - set(cls.model_fields)
+        if unknown:
+            raise ValueError(f"Unknown fields for {cls.__name__}: {sorted(unknown)}")
+        keys = {"_id" if name == "id" else name for name in names}
+        if fields is not None:
+            return {"_id": 1, **{key: 1 for key in keys}}
+        keys.discard("_id")
+        return {key: 0 for key in keys} or None
+
+    @classmethod
+    def _partial_plan(cls, projection: Dict[str, int]) -> _PartialPlan:
+        """投影对应的部分模型构造方式，按类和投影缓存"""
+        cache_key = (cls, frozenset(projection.items()))
+        plan = _PARTIAL_PLANS.get(cache_key)
+        if plan is not None:
+            return plan
+        if next(iter(projection.values())):
+            loaded = {"id"} | {key for key in projection if key in cls.model_fields}
+        else:
+            loaded = set(cls.model_fields) - set(projection)
+        plan = _PartialPlan(
+            loaded=[], defaults={}, factories=[], fields_set=frozenset(loaded)
+        )
+        for name, field in cls.model_fields.items():
+            if name in loaded:
+                plan.loaded.append((name, field.alias or name))
+            elif field.default_factory is not None:
+                plan.factories.append((name, field.default_factory))
+            elif isinstance(field.default, IMMUTABLE_DEFAULTS):
+                plan.defaults[name] = field.default
+            elif not field.is_required():
+                # 可变默认值按 pydantic 的规则每次复制
+                plan.factories.append(
+                    (name, partial(field.get_default, call_default_factory=True))
+                )
+        _PARTIAL_PLANS[cache_key] = plan
+        return plan
+
+    @classmethod
+    def _from_doc(cls: Type[T], doc: Dict[str, Any], projection=None) -> T:
+        """
+        将 Mongo 文档转换为模型
+
+        指定了投影时构造部分模型：跳过校验，未读取的字段不计入 model_fields_set，
+        序列化时使用 exclude_unset=True 即只输出已读取的字段。未读取的字段与
+        model_construct 一样取默认值（必填字段不设置），但字段表按投影缓存，
+        逐条构造只做字典赋值（model_construct 每次遍历字段定义，比校验还慢）。
+        """
+        doc["_id"] = str(doc["_id"])
+        if projection is None:
+            return cls(**doc)
+        plan = cls._partial_plan(projection)
+        if cls.__private_attributes__:
+            return cls.model_construct(_fields_set=set(plan.fields_set), **doc)
+
+        values = dict(plan.defaults)
+        for name, factory in plan.factories:
+            values[name] = factory()
+        for name, key in plan.loaded:
+            if key in doc:
+                values[name] = doc[key]
+            else:
+                field = cls.model_fields[name]
+                if not field.is_required():
+                    values[name] = field.get_default(call_default_factory=True)
+        model = cls.__new__(cls)
+        object.__setattr__(model, "__dict__", values)
+        object.__setattr__(model, "__pydantic_fields_set__", set(plan.fields_set))
+        object.__setattr__(model, "__pydantic_extra__", None)
+        object.__setattr__(model, "__pydantic_private__", None)
+        return model
+
+    @staticmethod
+    def _index_diff(declared: Dict[str, Any], current: Dict[str, Any]) -> Dict:
+        """对比声明的索引与数据库中同名索引，返回不一致的项"""
+        diff = {}
+        declared_key = [
+            (field, direction) for field, direction in declared["key"].items()
+        ]
+        current_key = [
+            (field, int(direction) if isinstance(direction, float) else direction)
+            for field, direction in current["key"]
+        ]
+        if declared_key != current_key:
+            diff["key"] = {"declared": declared_key, "current": current_key}
+        for option in INDEX_OPTIONS:
+            if declared.get(option) != current.get(option):
+                diff[option] = {
+                    "declared": declared.get(option),
+                    "current": current.get(option),
+                }
+        return diff
 
-    # 自动创建表
     @classmethod
-    async def create_indexes(cls):
-        """创建索引"""
-        await cls.collection().create_index("created_at")
-        await cls.collection().create_index("updated_at")
-        await cls.collection().create_index("is_deleted")
+    async def sync_indexes(cls, dry_run: bool = False) -> List[Dict[str, Any]]:
+        """
+        将 indexes 中声明的索引与数据库对齐
+
+        只创建缺失的索引（可重复执行），不会删除或修改已有索引；同名但定义不一致、
+        数据库中存在但未声明、以及创建失败的索引在结果中报告。
+
+        Args:
+            dry_run: 只检查，不创建缺失的索引
+
+        Returns:
+            List[Dict[str, Any]]: 每个索引一条记录，status 为
+                ok/created/missing/changed/extra/failed
+        """
+        collection = cls.collection()
+        existing = await collection.index_information()
+        report = []
+        declared_names = set()
+        for index in cls.indexes:
+            spec = index.document
+            name = spec["name"]
+            declared_names.add(name)
+            entry = {
+                "collection": cls.collection_name(),
+                "name": name,
+                "status": "ok",
+                "detail": None,
+            }
+            report.append(entry)
+
+            if name in existing:
+                diff = cls._index_diff(spec, existing[name])
+                if diff:
+                    entry.update(status="changed", detail=diff)
+                continue
+            if dry_run:
+                entry["status"] = "missing"
+                continue
+            try:
+                await collection.create_indexes([index])
+                entry["status"] = "created"
+            except OperationFailure as e:
+                entry.update(status="failed", detail=str(e))
+
+        for name, info in existing.items():
+            if name != "_id_" and name not in declared_names:
+                report.append(
+                    {
+                        "collection": cls.collection_name(),
+                        "name": name,
+                        "status": "extra",
+                        "detail": {"key": info["key"]},
+                    }
+                )
+        return report
 
     @classmethod
     async def create(cls, **kwargs) -> "MongoBaseModel":
@@ -63,54 +338,251 @@ class MongoBaseModel(PydanticBaseModel):
             )
             new_record.id = str(result.inserted_id)
 
-            logger.debug(
-                f"Created document in {cls.collection_name()}: {new_record.id}"
-            )
+            if sampled("mongo.create"):
+                logger.debug(
+                    f"Created document in {cls.collection_name()}: {new_record.id}"
+                )
             return new_record
         except Exception as e:
             logger.error(f"Failed to create document in {cls.collection_name()}: {e}")
             raise
 
     @classmethod
-    async def get_by_id(cls, id: str) -> Optional["MongoBaseModel"]:
+    async def create_many(
+        cls: Type[T],
+        items: Iterable[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+    ) -> BulkCreateResult[T]:
+        """
+        批量创建文档
+
+        逐条校验后按 chunk_size 分批执行 insert_many(ordered=False)。_id 在客户端
+        生成，校验失败或写入失败（如唯一索引冲突）的文档记入 errors，不影响同批
+        其他文档；网络等整体性错误直接抛出。
+
+        Args:
+            items: 文档数据字典，可以是生成器，内存占用只与 chunk_size 有关
+            chunk_size: 每批插入的文档数，默认 MONGODB_BULK_CHUNK_SIZE
+
+        Returns:
+            BulkCreateResult[T]: 创建成功的文档（含 ID）与失败文档的位置和原因
+        """
+        if chunk_size is None:
+            chunk_size = BULK_CHUNK_SIZE
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+
+        result: BulkCreateResult[T] = BulkCreateResult()
+        chunk: List[Tuple[int, T, Dict[str, Any]]] = []
+        for index, data in enumerate(items):
+            try:
+                record = cls(**data)
+            except ValidationError as e:
+                result.errors.append(BulkCreateError(index, str(e)))
+                continue
+            object_id = ObjectId()
+            record.id = str(object_id)
+            chunk.append(
+                (index, record, {**record.model_dump(exclude={"id"}), "_id": object_id})
+            )
+            if len(chunk) >= chunk_size:
+                await cls._insert_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            await cls._insert_chunk(chunk, result)
+
+        result.errors.sort(key=lambda error: error.index)
+        if sampled("mongo.create_many"):
+            logger.debug(
+                f"Created {len(result.created)} documents in {cls.collection_name()}, "
+                f"{len(result.errors)} failed"
+            )
+        return result
+
+    @classmethod
+    async def _insert_chunk(
+        cls, chunk: List[Tuple[int, T, Dict[str, Any]]], result: BulkCreateResult[T]
+    ) -> None:
+        failed: Dict[int, str] = {}
+        try:
+            await cls.collection().insert_many(
+                [doc for _, _, doc in chunk], ordered=False
+            )
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = error.get("errmsg", "write error")
+        except Exception as e:
+            logger.error(
+                f"Failed to insert documents into {cls.collection_name()}: {e}"
+            )
+            raise
+
+        for position, (index, record, _) in enumerate(chunk):
+            if position in failed:
+                result.errors.append(BulkCreateError(index, failed[position]))
+            else:
+                result.created.append(record)
+
+    @classmethod
+    async def get_by_id(
+        cls,
+        id: str,
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
+    ) -> Optional["MongoBaseModel"]:
         """
         获取单个文档
 
         Args:
             id: 文档ID
+            fields: 只读取这些字段，返回部分模型
+            exclude_fields: 不读取这些字段，返回部分模型
 
         Returns:
             Optional[MongoBaseModel]: 文档对象,不存在则返回None
         """
+        projection = cls._projection(fields, exclude_fields)
         try:
-            doc = await cls.collection().find_one(
-                {"_id": ObjectId(id), "is_deleted": False}
-            )
+            if cls.cached and model_cache.enabled and cls._cache_covers(projection):
+                doc = await cls._get_doc_cached(id)
+                projection_applied = False
+            else:
+                doc = await cls._read_collection().find_one(
+                    {"_id": ObjectId(id), "is_deleted": False}, projection
+                )
+                projection_applied = True
             if doc:
-                doc["_id"] = str(doc["_id"])
-                return cls(**doc)
+                if not projection_applied:
+                    doc = cls._project_doc(doc, projection)
+                return cls._from_doc(doc, projection)
             return None
         except Exception as e:
             logger.error(f"Failed to get document from {cls.collection_name()}: {e}")
             raise
 
     @classmethod
-    async def get_by_single_field(cls: Type[T], field: str, value: Any) -> Optional[T]:
+    async def _get_doc_cached(cls, id: str) -> Optional[Dict[str, Any]]:
+        """经读穿透缓存读取完整文档，未命中时查询数据库并写回缓存"""
+        object_id = ObjectId(id)
+        name = cls.collection_name()
+        doc, versions = await model_cache.get(name, id)
+        if doc is not None:
+            return doc
+        # 写回缓存的数据必须读主节点：从节点的旧数据会带着新版本号被缓存
+        doc = await cls.collection().find_one({"_id": object_id, "is_deleted": False})
+        if doc is not None:
+            doc = {
+                key: value for key, value in doc.items() if key not in cls.cache_exclude
+            }
+            await model_cache.set(name, id, doc, versions, ttl=cls.cache_ttl)
+        return doc
+
+    @classmethod
+    def _cache_covers(cls, projection: Optional[Dict[str, int]]) -> bool:
+        """缓存的文档（不含 cache_exclude 字段）是否包含投影需要的全部字段"""
+        if not cls.cache_exclude:
+            return True
+        if projection is None:
+            return False
+        if next(iter(projection.values())):
+            return cls.cache_exclude.isdisjoint(projection)
+        return cls.cache_exclude.issubset(projection)
+
+    @staticmethod
+    def _project_doc(
+        doc: Dict[str, Any], projection: Optional[Dict[str, int]]
+    ) -> Dict[str, Any]:
+        """在内存中对完整文档应用投影（用于缓存的文档）"""
+        if projection is None:
+            return doc
+        if next(iter(projection.values())):
+            return {key: value for key, value in doc.items() if key in projection}
+        return {key: value for key, value in doc.items() if key not in projection}
+
+    @classmethod
+    async def _invalidate_cache(cls, id: Optional[str] = None) -> None:
+        """
+        使读穿透缓存失效
+
+        Args:
+            id: 文档ID，为空时使该模型所有文档的缓存失效
+        """
+        if not cls.cached:
+            return
+        if id is None:
+            await model_cache.invalidate_model(cls.collection_name())
+        else:
+            await model_cache.invalidate(cls.collection_name(), id, cls.cache_ttl)
+
+    @classmethod
+    async def get_many_by_ids(
+        cls: Type[T],
+        ids: Iterable[str],
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Optional[T]]:
+        """
+        通过一次 $in 查询批量获取文档
+
+        Args:
+            ids: 文档ID列表
+            fields: 只读取这些字段，返回部分模型
+            exclude_fields: 不读取这些字段，返回部分模型
+
+        Returns:
+            Dict[str, Optional[T]]: 以ID为键的文档，不存在（或ID格式无效）的ID值为None，
+                顺序与传入的ID一致
+        """
+        result: Dict[str, Optional[T]] = dict.fromkeys(ids)
+        object_ids = [ObjectId(id) for id in result if ObjectId.is_valid(id)]
+        if not object_ids:
+            return result
+
+        projection = cls._projection(fields, exclude_fields)
+        try:
+            documents = (
+                await cls._read_collection()
+                .find({"_id": {"$in": object_ids}, "is_deleted": False}, projection)
+                .to_list(length=None)
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to get documents by ids from {cls.collection_name()}: {e}"
+            )
+            raise
+
+        for doc in documents:
+            model = cls._from_doc(doc, projection)
+            result[model.id] = model
+        return result
+
+    @classmethod
+    async def get_by_single_field(
+        cls: Type[T],
+        field: str,
+        value: Any,
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
+    ) -> Optional[T]:
         """
         通过指定字段获取文档
 
         Args:
             field: 字段名
             value: 字段值
+            fields: 只读取这些字段，返回部分模型
+            exclude_fields: 不读取这些字段，返回部分模型
 
         Returns:
             Optional[T]: 文档对象,不存在则返回None
         """
+        projection = cls._projection(fields, exclude_fields)
         try:
-            doc = await cls.collection().find_one({field: value, "is_deleted": False})
+            doc = await cls._read_collection().find_one(
+                {field: value, "is_deleted": False}, projection
+            )
             if doc:
-                doc["_id"] = str(doc["_id"])
-                return cls(**doc)
+                return cls._from_doc(doc, projection)
             return None
         except Exception as e:
             logger.error(
@@ -120,22 +592,27 @@ class MongoBaseModel(PydanticBaseModel):
 
     @classmethod
     async def get_by_multi_field(
-        cls: Type[T], filter_dict: Dict[str, Any]
+        cls: Type[T],
+        filter_dict: Dict[str, Any],
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
     ) -> Optional[T]:
         """
         通过多个字段获取文档
 
         Args:
             filter_dict: 字段名和字段值的字典
+            fields: 只读取这些字段，返回部分模型
+            exclude_fields: 不读取这些字段，返回部分模型
 
         Returns:
             Optional[T]: 文档对象,不存在则返回None
         """
+        projection = cls._projection(fields, exclude_fields)
         try:
-            doc = await cls.collection().find_one(filter_dict)
+            doc = await cls._read_collection().find_one(filter_dict, projection)
             if doc:
-                doc["_id"] = str(doc["_id"])
-                return cls(**doc)
+                return cls._from_doc(doc, projection)
             return None
         except Exception as e:
             logger.error(
@@ -164,7 +641,10 @@ class MongoBaseModel(PydanticBaseModel):
                 {"_id": ObjectId(id), "is_deleted": False}, {"$set": data}
             )
             success = result.modified_count > 0
-            logger.debug(f"Updated document in {cls.collection_name()}: {id}")
+            if success:
+                await cls._invalidate_cache(id)
+            if sampled("mongo.update_by_id"):
+                logger.debug(f"Updated document in {cls.collection_name()}: {id}")
             return success
         except Exception as e:
             logger.error(f"Failed to update document in {cls.collection_name()}: {e}")
@@ -188,10 +668,15 @@ class MongoBaseModel(PydanticBaseModel):
             filter_dict["is_deleted"] = False
             data["updated_at"] = get_china_now()
             result = await cls.collection().update_one(filter_dict, {"$set": data})
-            logger.debug(
-                f"Updated document by field in {cls.collection_name()}: {result}"
-            )
-            return result.modified_count > 0
+            success = result.modified_count > 0
+            if success:
+                # 不知道修改的是哪个文档，使整个模型的缓存失效
+                await cls._invalidate_cache()
+            if sampled("mongo.update_by_field"):
+                logger.debug(
+                    f"Updated document by field in {cls.collection_name()}: {result}"
+                )
+            return success
         except Exception as e:
             logger.error(
                 f"Failed to update document by field in {cls.collection_name()}: {e}"
@@ -215,11 +700,13 @@ class MongoBaseModel(PydanticBaseModel):
             )
             success = result.modified_count > 0
             if success:
+                await self._invalidate_cache(self.id)
                 self.is_deleted = True
                 self.updated_at = get_china_now()
-                logger.debug(
-                    f"Soft deleted document from {self.collection_name()}: {self.id}"
-                )
+                if sampled("mongo.delete"):
+                    logger.debug(
+                        f"Soft deleted document from {self.collection_name()}: {self.id}"
+                    )
             return success
         except Exception as e:
             logger.error(
@@ -233,8 +720,10 @@ class MongoBaseModel(PydanticBaseModel):
         filter_dict: Dict[str, Any] = None,
         skip: int = 0,
         limit: int = 100,
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
     ) -> List[T]:
-        """列出符合条件的文档"""
+        """列出符合条件的文档，可通过 fields/exclude_fields 只读取部分字段"""
         if skip < 0:
             raise ValueError("Skip must be non-negative")
         if limit <= 0:
@@ -247,24 +736,170 @@ class MongoBaseModel(PydanticBaseModel):
             filter_dict = filter_dict or {}
             filter_dict["is_deleted"] = False
 
+            projection = cls._projection(fields, exclude_fields)
             cursor = (
-                cls.collection()
-                .find(filter_dict)
+                cls._read_collection()
+                .find(filter_dict, projection)
                 .sort("_id", -1)
                 .skip(skip)
                 .limit(limit)
             )
             documents = await cursor.to_list(length=None)
 
-            # 转换ID为字符串
-            for doc in documents:
-                doc["_id"] = str(doc["_id"])
-
-            return [cls(**doc) for doc in documents]
+            return [cls._from_doc(doc, projection) for doc in documents]
         except Exception as e:
             logger.error(f"Failed to list documents from {cls.__name__}: {e}")
             raise
 
+    @classmethod
+    async def iter(
+        cls: Type[T],
+        filter_dict: Dict[str, Any] = None,
+        batch_size: int = 500,
+        raw: bool = False,
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[Union[T, Dict[str, Any]]]:
+        """
+        按 _id 升序流式遍历符合条件的文档
+
+        直接迭代 Motor 游标，每次只从服务端取回 batch_size 条，内存占用与结果总数
+        无关，适用于回填、导出、重建索引等需要遍历全部数据的任务：
+
+            async for message in Message.iter({"conversation_id": cid}):
+                ...
+
+        Args:
+            filter_dict: 过滤条件
+            batch_size: 每批从服务端取回的文档数
+            raw: 为 True 时返回原始文档字典（_id 保持 ObjectId），不构造模型
+            fields: 只读取这些字段，返回部分模型
+            exclude_fields: 不读取这些字段，返回部分模型
+
+        Yields:
+            T 或 Dict[str, Any]: 逐条返回的文档
+        """
+        if batch_size <= 0:
+            raise ValueError("Batch size must be positive")
+
+        filter_dict = dict(filter_dict or {})
+        filter_dict["is_deleted"] = False
+        projection = cls._projection(fields, exclude_fields)
+        cursor = cls._read_collection().find(
+            filter_dict, projection, sort=[("_id", 1)], batch_size=batch_size
+        )
+        try:
+            async for doc in cursor:
+                yield doc if raw else cls._from_doc(doc, projection)
+        finally:
+            # 提前退出遍历时及时释放服务端游标
+            await cursor.close()
+
+    @classmethod
+    async def list_page(
+        cls: Type[T],
+        filter_dict: Dict[str, Any] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        sort_field: str = "_id",
+        descending: bool = True,
+        fields: Optional[Iterable[str]] = None,
+        exclude_fields: Optional[Iterable[str]] = None,
+    ) -> Page[T]:
+        """
+        基于游标（keyset）分页列出文档
+
+        按 (sort_field, _id) 排序，游标记录上一页边界文档的位置，查询时从该位置
+        直接继续而不是 skip，因此任意一页的开销都与第一页相同。
+
+        Args:
+            filter_dict: 过滤条件
+            limit: 每页数量
+            cursor: 上一次返回的 next_cursor（下一页）或 prev_cursor（上一页）
+            sort_field: 排序字段，游标只能用于相同排序字段的查询
+            descending: 是否降序
+            fields: 只读取这些字段，返回部分模型
+            exclude_fields: 不读取这些字段，返回部分模型
+
+        Returns:
+            Page[T]: 当前页的文档及前后页游标
+
+        Raises:
+            ValueError: 参数或游标无效
+        """
+        if limit <= 0:
+            raise ValueError("Limit must be positive")
+        if limit > 1000:
+            raise ValueError("Limit cannot exceed 1000")
+
+        projection = cls._projection(fields, exclude_fields)
+        if projection and sort_field != "_id":
+            # 生成游标需要排序字段
+            if next(iter(projection.values())):
+                projection[sort_field] = 1
+            else:
+                projection.pop(sort_field, None)
+        filter_dict = dict(filter_dict or {})
+        filter_dict["is_deleted"] = False
+        direction = "after"
+        if cursor:
+            direction, value, last_id = decode_cursor(cursor, sort_field)
+            # 向后翻页沿排序方向比较，向前翻页反向比较
+            op = "$lt" if descending == (direction == "after") else "$gt"
+            if sort_field == "_id":
+                condition = {"_id": {op: last_id}}
+            else:
+                condition = {
+                    "$or": [
+                        {sort_field: {op: value}},
+                        {sort_field: value, "_id": {op: last_id}},
+                    ]
+                }
+            if condition.keys() & filter_dict.keys():
+                filter_dict = {"$and": [filter_dict, condition]}
+            else:
+                filter_dict.update(condition)
+
+        order = -1 if descending else 1
+        if direction == "before":
+            order = -order
+        sort = [(sort_field, order)]
+        if sort_field != "_id":
+            sort.append(("_id", order))
+
+        try:
+            documents = (
+                await cls._read_collection()
+                .find(filter_dict, projection)
+                .sort(sort)
+                .limit(limit + 1)
+                .to_list(length=None)
+            )
+        except Exception as e:
+            logger.error(f"Failed to list page from {cls.__name__}: {e}")
+            raise
+
+        # 多取一条用于判断是否还有更多数据
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        if direction == "before":
+            documents.reverse()
+
+        page = Page()
+        if documents:
+            first, last = documents[0], documents[-1]
+            if has_more if direction == "after" else cursor:
+                page.next_cursor = encode_cursor(
+                    "after", sort_field, last.get(sort_field), last["_id"]
+                )
+            if cursor if direction == "after" else has_more:
+                page.prev_cursor = encode_cursor(
+                    "before", sort_field, first.get(sort_field), first["_id"]
+                )
+
+        page.items = [cls._from_doc(doc, projection) for doc in documents]
+        return page
+
     @classmethod
     async def delete_by_id(cls, id: str) -> bool:
         """
@@ -283,6 +918,8 @@ class MongoBaseModel(PydanticBaseModel):
             )
             success = result.modified_count > 0
             if success:
+                await cls._invalidate_cache(id)
+            if success and sampled("mongo.delete_by_id"):
                 logger.debug(f"Deleted document from {cls.collection_name()}: {id}")
             return success
         except Exception as e:
@@ -1,8 +1,11 @@
-from typing import Optional
+from typing import Awaitable, Callable, ClassVar, Iterable, List, Optional
 
+from bson import ObjectId
 from pydantic import Field
+from pymongo import IndexModel
 
-from app.models.base import MongoBaseModel
+from app.models.base import ACTIVE_ONLY, MongoBaseModel
+from app.utils.datetime_utils import get_china_now
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -13,6 +16,156 @@ class Conversation(MongoBaseModel):
 
     name: str = Field("新会话", description="对话名称")
     members: Optional[list[str]] = Field(None, description="对话成员的ID列表")
+    # 随消息创建/软删除维护；为空表示计数器上线前创建的会话，尚未回填
+    message_count: Optional[int] = Field(None, description="未删除的消息数")
+
+    cached: ClassVar[bool] = True
+
+    indexes: ClassVar[List[IndexModel]] = MongoBaseModel.indexes + [
+        # members 为数组，会建立多键索引；用于按成员列出会话
+        IndexModel([("members", 1), ("_id", -1)], partialFilterExpression=ACTIVE_ONLY),
+    ]
+
+    @classmethod
+    async def create(cls, **kwargs) -> "Conversation":
+        kwargs.setdefault("message_count", 0)
+        return await super().create(**kwargs)
+
+    @classmethod
+    async def incr_message_count(cls, id: str, delta: int) -> None:
+        """
+        调整会话的消息计数
+
+        未回填计数器（message_count 为空）的会话把变化记在 message_count_pending
+        上，由 backfill_message_count 判断回填期间是否有并发写入。
+        """
+        if not ObjectId.is_valid(id):
+            return
+        # message_count 只会由空变为非空：第二步未匹配说明回填刚刚完成，重试第一步
+        for _ in range(2):
+            result = await cls.collection().update_one(
+                {"_id": ObjectId(id), "message_count": {"$ne": None}},
+                {"$inc": {"message_count": delta}},
+            )
+            if result.matched_count:
+                await cls._invalidate_cache(id)
+                return
+            result = await cls.collection().update_one(
+                {"_id": ObjectId(id), "message_count": None},
+                {"$inc": {"message_count_pending": delta}},
+            )
+            if result.matched_count:
+                return
+
+    @classmethod
+    async def backfill_message_count(
+        cls, id: str, count: Callable[[], Awaitable[int]]
+    ) -> int:
+        """
+        为尚无计数器的会话精确计数并回填
+
+        计数前读取 message_count_pending，写入时以它未变为条件：计数期间有消息
+        创建或删除时放弃回填，由下一次精确计数重试，避免计数器永久偏少。
+
+        Args:
+            id: 会话ID
+            count: 执行精确计数的协程函数
+
+        Returns:
+            int: 精确计数
+        """
+        if not ObjectId.is_valid(id):
+            return await count()
+        doc = await cls.collection().find_one(
+            {"_id": ObjectId(id), "message_count": None},
+            {"message_count_pending": 1},
+        )
+        total = await count()
+        if doc is None:
+            return total
+        result = await cls.collection().update_one(
+            {
+                "_id": ObjectId(id),
+                "message_count": None,
+                "message_count_pending": doc.get("message_count_pending"),
+            },
+            {
+                "$set": {"message_count": total},
+                "$unset": {"message_count_pending": ""},
+            },
+        )
+        if result.modified_count:
+            await cls._invalidate_cache(id)
+        else:
+            logger.info(f"Message count of conversation {id} changed, backfill later")
+        return total
+
+    @classmethod
+    async def add_members(cls, id: str, member_ids: Iterable[str]) -> bool:
+        """
+        原子地添加成员
+
+        一次 $addToSet 写入，不先读取会话；并发添加不会互相覆盖。
+
+        Args:
+            id: 会话ID
+            member_ids: 要添加的成员ID
+
+        Returns:
+            bool: 是否有成员被添加；会话不存在、已删除或成员均已在会话中时为 False
+        """
+        member_ids = list(dict.fromkeys(member_ids))
+        if not member_ids or not ObjectId.is_valid(id):
+            return False
+        result = await cls.collection().update_one(
+            {
+                "_id": ObjectId(id),
+                "is_deleted": False,
+                # 成员均已存在时不匹配，避免无意义地修改 updated_at
+                "members": {"$not": {"$all": member_ids}},
+            },
+            {
+                "$addToSet": {"members": {"$each": member_ids}},
+                "$set": {"updated_at": get_china_now()},
+            },
+        )
+        if result.modified_count:
+            await cls._invalidate_cache(id)
+        return result.modified_count > 0
+
+    @classmethod
+    async def remove_member(cls, id: str, member_id: str) -> bool:
+        """
+        原子地移除成员
+
+        一次 $pull 写入，由查询条件保证成员在会话中且不是最后一个成员。
+
+        Args:
+            id: 会话ID
+            member_id: 要移除的成员ID
+
+        Returns:
+            bool: 是否移除成功；会话不存在、已删除、成员不在会话中或是最后一个
+                成员时为 False
+        """
+        if not ObjectId.is_valid(id):
+            return False
+        result = await cls.collection().update_one(
+            {
+                "_id": ObjectId(id),
+                "is_deleted": False,
+                "members": member_id,
+                # 至少还有两个成员
+                "members.1": {"$exists": True},
+            },
+            {
+                "$pull": {"members": member_id},
+                "$set": {"updated_at": get_china_now()},
+            },
+        )
+        if result.modified_count:
+            await cls._invalidate_cache(id)
+        return result.modified_count > 0
 
     class Config:
         json_schema_extra = {
@@ -20,6 +173,7 @@ class Conversation(MongoBaseModel):
                 "id": "1234567890",
                 "name": "吃瓜群",
                 "members": ["123", "456"],
+                "message_count": 0,
                 "created_at": "2022-01-01T00:00:00",
                 "updated_at": "2022-01-01T00:00:00",
                 "is_deleted": False,
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Type
+
+from app.models.base import MongoBaseModel
+from app.models.conversation import Conversation
+from app.models.llm_model import LLM
+from app.models.memory import Memory
+from app.models.message import Message
+from app.models.person import Person
+from app.models.tool import Tool
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 参与索引同步的模型
+MODELS: List[Type[MongoBaseModel]] = [Person, Conversation, Message, Memory, LLM, Tool]
+
+# 需要人工处理的索引状态
+DRIFT_STATUSES = {"missing", "changed", "extra", "failed"}
+
+
+async def sync_all_indexes(dry_run: bool = False) -> List[Dict[str, Any]]:
+    """
+    对所有模型执行 sync_indexes
+
+    Args:
+        dry_run: 只检查，不创建缺失的索引
+
+    Returns:
+        List[Dict[str, Any]]: 所有集合的索引同步记录
+    """
+    report = []
+    for model in MODELS:
+        report.extend(await model.sync_indexes(dry_run=dry_run))
+    return report
+
+
+async def sync_indexes_on_startup() -> None:
+    """应用启动时在后台同步索引，失败只记录日志，不影响服务启动"""
+    try:
+        report = await sync_all_indexes()
+    except Exception as e:
+        logger.error(f"Index sync failed: {e}")
+        return
+    created = [
+        f"{e['collection']}.{e['name']}" for e in report if e["status"] == "created"
+    ]
+    if created:
+        logger.info(f"Created indexes: {', '.join(created)}")
+    for entry in report:
+        if entry["status"] in DRIFT_STATUSES:
+            logger.warning(
+                f"Index drift {entry['collection']}.{entry['name']}: "
+                f"{entry['status']} {entry['detail']}"
+            )
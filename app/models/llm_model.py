@@ -1,6 +1,7 @@
-from typing import Any, Dict
+from typing import Any, ClassVar, Dict, FrozenSet, List
 
 from pydantic import Field
+from pymongo import IndexModel
 
 from app.models.base import MongoBaseModel
 from app.utils.logger import get_logger
@@ -16,6 +17,15 @@ class LLM(MongoBaseModel):
     api_key: str = Field(..., description="API Key")
     base_url: str = Field(..., description="API Base URL")
 
+    cached: ClassVar[bool] = True
+    # API Key 不写入模型缓存，读取完整模型时直接查询数据库
+    cache_exclude: ClassVar[FrozenSet[str]] = frozenset({"api_key"})
+
+    # create 的去重查询不带 is_deleted 条件，因此不使用部分索引
+    indexes: ClassVar[List[IndexModel]] = MongoBaseModel.indexes + [
+        IndexModel("model_name"),
+    ]
+
     class Config:
         json_schema_extra = {
             "example": {
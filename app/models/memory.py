@@ -1,6 +1,9 @@
+from typing import ClassVar, List
+
 from pydantic import Field
+from pymongo import IndexModel
 
-from app.models.base import MongoBaseModel
+from app.models.base import ACTIVE_ONLY, MongoBaseModel
 from app.models.person import Person
 from app.utils.logger import get_logger
 
@@ -16,6 +19,11 @@ class Memory(MongoBaseModel):
     creator_id: str = Field(..., description="创建者ID")
     tags: list[str] = Field(None, description="标签列表")
 
+    indexes: ClassVar[List[IndexModel]] = MongoBaseModel.indexes + [
+        IndexModel([("owner_id", 1), ("_id", -1)], partialFilterExpression=ACTIVE_ONLY),
+        IndexModel("creator_id", partialFilterExpression=ACTIVE_ONLY),
+    ]
+
     class Config:
         json_schema_extra = {
             "example": {
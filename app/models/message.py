@@ -1,12 +1,22 @@
-from typing import Optional
+from collections import Counter
+from functools import partial
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Tuple
 
+from bson import json_util
 from pydantic import Field
+from pymongo import IndexModel
 
-from app.models.base import MongoBaseModel
+from app.models.base import ACTIVE_ONLY, BulkCreateResult, MongoBaseModel
+from app.models.conversation import Conversation
+from app.utils.config import get_settings
 from app.utils.logger import get_logger
+from app.utils.ttl_cache import MISSING, TTLCache
 
 logger = get_logger(__name__)
 
+# 无法使用计数器时（带时间范围、旧会话）消息总数的短时缓存：查询条件 -> 总数
+_total_cache = TTLCache(maxsize=10000, ttl=get_settings().mongodb.count_cache_ttl)
+
 
 class Message(MongoBaseModel):
     """Message data model"""
@@ -20,16 +30,90 @@ class Message(MongoBaseModel):
     metadata: Optional[dict] = Field(None, description="元数据")
     is_read: bool = Field(False, description="消息是否已读")
 
-    @classmethod
-    async def create_indexes(cls):
-        """创建索引"""
-        await super().create_indexes()
+    indexes: ClassVar[List[IndexModel]] = MongoBaseModel.indexes + [
         # 为标记已读接口优化的复合索引
-        await cls.collection().create_index(
+        IndexModel(
             [
                 ("conversation_id", 1),
                 ("receiver_id", 1),
                 ("is_read", 1),
                 ("created_at", -1),
             ]
-        )
+        ),
+        # 会话消息列表（按 _id 游标分页）
+        IndexModel(
+            [("conversation_id", 1), ("_id", -1)],
+            partialFilterExpression=ACTIVE_ONLY,
+        ),
+    ]
+
+    # 同一会话的消息在同一分片，会话内的列表、计数、标记已读只访问一个分片
+    shard_key: ClassVar[Optional[str]] = "conversation_id"
+
+    @classmethod
+    async def create(cls, **kwargs) -> "Message":
+        message = await super().create(**kwargs)
+        await Conversation.incr_message_count(message.conversation_id, 1)
+        return message
+
+    @classmethod
+    async def create_many(
+        cls, items: Iterable[Dict[str, Any]], chunk_size: Optional[int] = None
+    ) -> BulkCreateResult["Message"]:
+        result = await super().create_many(items, chunk_size)
+        counts = Counter(message.conversation_id for message in result.created)
+        for conversation_id, count in counts.items():
+            await Conversation.incr_message_count(conversation_id, count)
+        return result
+
+    @classmethod
+    async def delete_by_id(cls, id: str) -> bool:
+        message = await cls.get_by_id(id, fields={"conversation_id"})
+        success = await super().delete_by_id(id)
+        if success and message:
+            await Conversation.incr_message_count(message.conversation_id, -1)
+        return success
+
+    async def delete(self) -> bool:
+        success = await super().delete()
+        if success and "conversation_id" in self.model_fields_set:
+            await Conversation.incr_message_count(self.conversation_id, -1)
+        return success
+
+    @classmethod
+    async def count_total(
+        cls, conversation: Conversation, filter_dict: Dict[str, Any]
+    ) -> Tuple[int, bool]:
+        """
+        统计会话消息总数
+
+        只按会话过滤时直接使用会话上维护的计数器；带其他条件（如时间范围）或
+        计数器尚未回填时执行 count_documents，结果缓存 count_cache_ttl 秒，
+        缓存期内返回的总数为估算值。
+
+        Args:
+            conversation: 会话，需加载 message_count 字段
+            filter_dict: 消息查询条件
+
+        Returns:
+            Tuple[int, bool]: (总数, 是否精确)
+        """
+        plain = set(filter_dict) == {"conversation_id", "is_deleted"}
+        if plain and conversation.message_count is not None:
+            return conversation.message_count, True
+
+        key = json_util.dumps(filter_dict, sort_keys=True)
+        total = _total_cache.get(key)
+        if total is not MISSING:
+            return total, False
+
+        # 回填计数器的精确计数读主节点，其他可按读偏好读从节点
+        collection = cls.collection() if plain else cls._read_collection()
+        if plain:
+            total = await Conversation.backfill_message_count(
+                conversation.id, partial(collection.count_documents, filter_dict)
+            )
+        else:
+            total = await collection.count_documents(filter_dict)
+        _total_cache.set(key, total)
+        return total, True
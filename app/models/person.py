@@ -1,10 +1,12 @@
 import uuid
-from typing import Optional
+from typing import Any, ClassVar, Dict, FrozenSet, Iterable, List, Optional
 
 from pydantic import Field
 from pydantic.v1 import validator
+from pymongo import IndexModel
 
-from app.models.base import MongoBaseModel
+from app.models.base import ACTIVE_ONLY, BulkCreateResult, MongoBaseModel
+from app.utils.auth_cache import AuthTokenCache
 from app.utils.config import get_settings
 from app.utils.logger import get_logger
 
@@ -30,6 +32,16 @@ class Person(MongoBaseModel):
     )
     description: Optional[str] = Field(None, description="描述")
 
+    cached: ClassVar[bool] = True
+    # 访问令牌不写入模型缓存，读取完整模型时直接查询数据库
+    cache_exclude: ClassVar[FrozenSet[str]] = frozenset({"access_token"})
+
+    indexes: ClassVar[List[IndexModel]] = MongoBaseModel.indexes + [
+        # 认证查询；已删除用户的 token 不参与唯一性约束
+        IndexModel("access_token", unique=True, partialFilterExpression=ACTIVE_ONLY),
+        IndexModel("role", partialFilterExpression=ACTIVE_ONLY),
+    ]
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -69,6 +81,65 @@ class Person(MongoBaseModel):
             raise ValueError("性别必须是 '男' 或 '女'")
         return value
 
+    @classmethod
+    async def get_by_access_token(cls, access_token: str) -> Optional["Person"]:
+        """
+        通过访问令牌获取人物（带认证缓存）
+
+        Args:
+            access_token: 访问令牌
+
+        Returns:
+            Optional[Person]: 人物对象,不存在则返回None
+        """
+        hit, person = await token_cache.get(access_token)
+        if hit:
+            # Redis 中的缓存值不含 token（反序列化时生成了默认值），用查询的 token 补回
+            if person is not None:
+                person.access_token = access_token
+            return person
+
+        person = await cls.get_by_single_field("access_token", access_token)
+        await token_cache.set(access_token, person.id if person else None, person)
+        return person
+
+    @classmethod
+    async def create(cls, **kwargs) -> "Person":
+        person = await super().create(**kwargs)
+        # 清除该 token 可能存在的负缓存
+        await token_cache.invalidate_token(person.access_token)
+        return person
+
+    @classmethod
+    async def create_many(
+        cls, items: Iterable[Dict[str, Any]], chunk_size: Optional[int] = None
+    ) -> BulkCreateResult["Person"]:
+        result = await super().create_many(items, chunk_size)
+        await token_cache.invalidate_tokens(p.access_token for p in result.created)
+        return result
+
+    @classmethod
+    async def update_by_id(cls, id: str, data: Dict[str, Any]) -> bool:
+        success = await super().update_by_id(id, data)
+        if success:
+            await token_cache.invalidate_person(id)
+            await token_cache.invalidate_token(data.get("access_token"))
+        return success
+
+    @classmethod
+    async def delete_by_id(cls, id: str) -> bool:
+        success = await super().delete_by_id(id)
+        if success:
+            await token_cache.invalidate_person(id)
+        return success
+
+    async def delete(self) -> bool:
+        success = await super().delete()
+        if success:
+            await token_cache.invalidate_person(self.id)
+            await token_cache.invalidate_token(self.access_token)
+        return success
+
     @classmethod
     async def setup(cls):
         admin_cfg = get_settings().admin
@@ -85,6 +156,21 @@ class Person(MongoBaseModel):
         )
 
 
+_auth_cfg = get_settings().auth
+
+# access_token -> Person 的认证缓存
+token_cache = AuthTokenCache(
+    dumps=lambda person: person.model_dump_json(exclude={"access_token"}),
+    loads=Person.model_validate_json,
+    namespace="auth",
+    local_maxsize=_auth_cfg.cache_local_maxsize,
+    local_ttl=_auth_cfg.cache_local_ttl,
+    redis_ttl=_auth_cfg.cache_redis_ttl,
+    negative_ttl=_auth_cfg.cache_negative_ttl,
+    enabled=_auth_cfg.cache_enabled,
+)
+
+
 if __name__ == "__main__":
     import asyncio
 
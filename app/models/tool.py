@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import ClassVar, Optional
 
 from pydantic import Field
 
@@ -13,6 +13,8 @@ class Tool(MongoBaseModel):
     description: Optional[str] = Field(None, description="工具描述")
     content: Optional[str] = Field(None, description="工具内容")
 
+    cached: ClassVar[bool] = True
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -0,0 +1,79 @@
+import time
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.dependencies.auth import AdminUser
+from app.utils.api_response import ResponseModel, json_response
+from app.utils.logger import get_logger
+from app.utils.loop_monitor import loop_monitor
+from app.utils.profiler import ProfilerBusyError, profile
+from app.utils.tracing import TracedRoute, ring_buffer
+
+logger = get_logger(__name__)
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.get("/traces", response_model=ResponseModel)
+async def list_traces(
+    current_user: AdminUser,
+    limit: int = Query(20, ge=1, le=200, description="返回的 trace 数量"),
+    min_duration_ms: float = Query(0, ge=0, description="最小耗时（毫秒）"),
+):
+    """获取最近导出的 trace"""
+    traces = ring_buffer.recent(limit=limit, min_duration_ms=min_duration_ms)
+    return json_response(
+        success=True,
+        data=[
+            {key: value for key, value in trace.items() if key != "spans"}
+            for trace in traces
+        ],
+        message="Traces retrieved successfully",
+    )
+
+
+@router.get("/traces/{trace_id}", response_model=ResponseModel)
+async def get_trace(trace_id: str, current_user: AdminUser):
+    """获取单个 trace 及其所有 span"""
+    trace = ring_buffer.get(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return json_response(
+        success=True, data=trace, message="Trace retrieved successfully"
+    )
+
+
+@router.get("/loop", response_model=ResponseModel)
+async def get_loop_status(current_user: AdminUser):
+    """获取事件循环延迟及最近的阻塞记录（含调用栈）"""
+    return json_response(
+        success=True,
+        data=loop_monitor.snapshot(),
+        message="Event loop status retrieved successfully",
+    )
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_process(
+    current_user: AdminUser,
+    seconds: float = Query(10, gt=0, le=120, description="采样时长（秒）"),
+    interval_ms: float = Query(5, ge=1, le=100, description="采样间隔（毫秒）"),
+    mode: Literal["cpu", "wall"] = Query("cpu", description="cpu 或 wall"),
+):
+    """对当前 worker 进行采样分析，返回折叠栈（可渲染为火焰图）"""
+    logger.info(f"User {current_user.name} requested profiling for {seconds}s")
+    try:
+        profiler = await profile(seconds, interval=interval_ms / 1000, mode=mode)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"profile-{mode}-{int(time.time())}.collapsed"
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(profiler.sample_count),
+        },
+    )
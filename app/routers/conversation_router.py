@@ -2,39 +2,58 @@ from datetime import datetime
 from typing import Literal, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel, Field
 from pydantic.v1 import validator
 
 from app.dependencies.auth import CurrentUser
+from app.dependencies.database import SecondaryReads
 from app.models.conversation import Conversation
 from app.models.message import Message
 from app.models.person import Person
-from app.utils.api_response import ResponseModel
+from app.utils.api_response import ResponseModel, json_response
+from app.utils.pagination import Page, set_cursor_headers
+from app.utils.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
+# 消息列表不返回的大字段，读取时直接不从数据库加载
+MESSAGE_LIST_EXCLUDE = {"metadata"}
 
-@router.get("", response_model=ResponseModel)
+
+@router.get("", response_model=ResponseModel, dependencies=[SecondaryReads])
 async def list_conversations(
-    current_user: CurrentUser, page: int = 1, limit: int = 100
+    current_user: CurrentUser,
+    response: Response,
+    page: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None,
 ):
-    """获取所有会话"""
-    conversations = await Conversation.list(
-        filter_dict={
-            "members": current_user.id,
-            "is_deleted": False,
-        },
-        skip=(page - 1) * limit,
-        limit=limit,
-    )
+    """获取所有会话
+
+    推荐使用 cursor 分页：下一页/上一页游标通过 X-Next-Cursor/X-Prev-Cursor
+    响应头返回；page 参数仅为兼容保留。
+    """
+    filter_dict = {"members": current_user.id, "is_deleted": False}
+    if page > 1 and not cursor:
+        conversations = await Conversation.list(
+            filter_dict=filter_dict, skip=(page - 1) * limit, limit=limit
+        )
+    else:
+        try:
+            result = await Conversation.list_page(
+                filter_dict, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        set_cursor_headers(response, result)
+        conversations = result.items
     # TODO: 这里得按最后一条消息的时间降序排列
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=[
-            conversation.model_dump(by_alias=False) for conversation in conversations
-        ],
+        data=conversations,
         message="Conversations retrieved successfully",
+        response=response,
     )
 
 
@@ -46,14 +65,19 @@ async def get_conversation(conversation_id: str):
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # 获取会话相关的消息
-    messages = await Message.list({"conversation_id": conversation_id}, limit=100)
+    messages = await Message.list(
+        {"conversation_id": conversation_id},
+        limit=100,
+        exclude_fields=MESSAGE_LIST_EXCLUDE,
+    )
 
-    return ResponseModel(
+    return json_response(
         success=True,
         data={
-            "conversation": conversation.model_dump(by_alias=False),
-            "messages": [message.model_dump(by_alias=False) for message in messages],
+            "conversation": conversation,
+            "messages": messages,
         },
+        exclude={"messages": {"__all__": MESSAGE_LIST_EXCLUDE}},
         message="Conversation retrieved successfully",
     )
 
@@ -77,16 +101,19 @@ async def create_conversation(
     """创建会话"""
     payload.members.add(current_user.id)
 
-    # 确保所有的member都存在
-    for member_id in payload.members:
-        if not await Person.get_by_id(member_id):
-            raise HTTPException(status_code=404, detail=f"Member {member_id} not found")
+    # 确保所有的member都存在（一次查询）
+    members = await Person.get_many_by_ids(payload.members, fields={"id"})
+    missing = sorted(id for id, member in members.items() if member is None)
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Member {', '.join(missing)} not found"
+        )
 
     # 创建会话
     new_conversation = await Conversation.create(**payload.model_dump())
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=new_conversation.model_dump(by_alias=False),
+        data=new_conversation,
         message="Conversation created successfully",
     )
 
@@ -106,63 +133,59 @@ async def rename_conversation(conversation_id: str, payload: RenameConversationP
     except Exception as e:
         success = False
         message = str(e)
-    return ResponseModel(success=success, data={}, message=message)
+    return json_response(success=success, data={}, message=message)
 
 
 class UpdateMembersPayload(BaseModel):
-    member_id: str = Field(..., description="成员ID")
+    member_id: Optional[str] = Field(None, description="成员ID")
+    member_ids: Optional[list[str]] = Field(None, description="批量添加的成员ID列表")
 
 
 @router.post("/{conversation_id}/members", response_model=ResponseModel)
 async def add_conversation_member(conversation_id: str, payload: UpdateMembersPayload):
     """添加会话成员"""
-    conversation = await Conversation.get_by_id(conversation_id)
-    if not conversation:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-
-    # 检查成员是否存在
-    if not await Person.get_by_id(payload.member_id):
+    member_ids = list(dict.fromkeys((payload.member_ids or []) + [payload.member_id]))
+    member_ids = [id for id in member_ids if id]
+    if not member_ids:
+        raise HTTPException(status_code=400, detail="member_id is required")
+
+    # 确保所有的member都存在（一次查询）
+    members = await Person.get_many_by_ids(member_ids, fields={"id"})
+    missing = [id for id, member in members.items() if member is None]
+    if missing:
         raise HTTPException(
-            status_code=404, detail=f"Member {payload.member_id} not found"
+            status_code=404, detail=f"Member {', '.join(missing)} not found"
         )
 
-    members = set(conversation.members)
-    members.add(payload.member_id)
-
-    success = await Conversation.update_by_id(
-        id=conversation_id, data={"members": list(members)}
-    )
-    return ResponseModel(success=success, data={}, message="Member added successfully")
+    # 一次原子写入；未修改时才读取会话区分“不存在”与“已是成员”
+    if not await Conversation.add_members(conversation_id, member_ids):
+        if not await Conversation.get_by_id(conversation_id, fields={"id"}):
+            raise HTTPException(status_code=404, detail="Conversation not found")
+    return json_response(success=True, data={}, message="Member added successfully")
 
 
 @router.delete("/{conversation_id}/members/{member_id}", response_model=ResponseModel)
 async def remove_conversation_member(conversation_id: str, member_id: str):
     """移除会话成员"""
-    conversation = await Conversation.get_by_id(conversation_id)
+    if await Conversation.remove_member(conversation_id, member_id):
+        return json_response(
+            success=True, data={}, message="Member removed successfully"
+        )
+
+    # 写入未生效时才读取会话，返回具体原因
+    conversation = await Conversation.get_by_id(conversation_id, fields={"members"})
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
-
-    members = set(conversation.members)
-    if member_id not in members:
+    if member_id not in (conversation.members or []):
         raise HTTPException(status_code=404, detail="Member not in conversation")
-
-    members.remove(member_id)
-    if len(members) < 1:
-        raise HTTPException(status_code=400, detail="Cannot remove last member")
-
-    success = await Conversation.update_by_id(
-        id=conversation_id, data={"members": list(members)}
-    )
-    return ResponseModel(
-        success=success, data={}, message="Member removed successfully"
-    )
+    raise HTTPException(status_code=400, detail="Cannot remove last member")
 
 
 @router.delete("/{conversation_id}", response_model=ResponseModel)
 async def delete_conversation(conversation_id: str):
     """删除会话"""
     success = await Conversation.delete_by_id(conversation_id)
-    return ResponseModel(
+    return json_response(
         success=success,
         data={"id": conversation_id},
         message="Conversation deleted successfully",
@@ -185,7 +208,7 @@ async def create_message(
 ):
     """向会话发送新消息"""
     # 验证会话是否存在
-    conversation = await Conversation.get_by_id(conversation_id)
+    conversation = await Conversation.get_by_id(conversation_id, fields={"members"})
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -201,7 +224,7 @@ async def create_message(
             status_code=400, detail="You cannot send message to yourself"
         )
     # 验证接收者是否存在且在会话成员中
-    if not await Person.get_by_id(payload.receiver_id):
+    if not await Person.get_by_id(payload.receiver_id, fields={"id"}):
         raise HTTPException(status_code=404, detail="Receiver not found")
     if payload.receiver_id not in conversation.members:
         raise HTTPException(
@@ -221,9 +244,9 @@ async def create_message(
 
     try:
         new_message = await Message.create(**message_data)
-        return ResponseModel(
+        return json_response(
             success=True,
-            data=new_message.model_dump(by_alias=False),
+            data=new_message,
             message="Message sent successfully",
         )
     except Exception as e:
@@ -237,7 +260,11 @@ class GetMessagesQuery(BaseModel):
     limit: int = Field(20, ge=1, le=100, description="每页消息数量")
 
 
-@router.get("/{conversation_id}/messages", response_model=ResponseModel)
+@router.get(
+    "/{conversation_id}/messages",
+    response_model=ResponseModel,
+    dependencies=[SecondaryReads],
+)
 async def list_conversation_messages(
     conversation_id: str,
     current_user: CurrentUser,
@@ -245,6 +272,8 @@ async def list_conversation_messages(
     after: Optional[datetime] = None,
     page: int = 1,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
 ):
     """获取会话消息列表
 
@@ -252,11 +281,16 @@ async def list_conversation_messages(
         conversation_id: 会话ID
         before: 获取此时间之前的消息
         after: 获取此时间之后的消息
-        page: 页码，从1开始
+        page: 页码，从1开始（兼容保留，翻页请使用 cursor）
         limit: 每页消息数量，默认20，最大100
+        cursor: 上次返回的 pagination.next_cursor 或 prev_cursor
+        include_total: 是否返回总数；为 false 时 total/pages 为空，省去计数查询。
+            返回的 total_exact 表示总数是精确值还是短时缓存的估算值
     """
     # 验证会话是否存在
-    conversation = await Conversation.get_by_id(conversation_id)
+    conversation = await Conversation.get_by_id(
+        conversation_id, fields={"members", "message_count"}
+    )
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -278,29 +312,49 @@ async def list_conversation_messages(
             filter_dict["created_at"]["$gt"] = after
 
     try:
-        # 获取消息总数
-        total = await Message.collection().count_documents(filter_dict)
-
-        # 获取分页消息列表
-        messages = await Message.list(
-            filter_dict=filter_dict, skip=(page - 1) * limit, limit=limit
-        )
+        # 获取消息总数（优先使用会话上的计数器）
+        total, total_exact = None, None
+        if include_total:
+            total, total_exact = await Message.count_total(conversation, filter_dict)
+
+        # 获取分页消息列表，指定 page 且未使用游标时保留旧的 skip 分页
+        if page > 1 and not cursor:
+            result = Page(
+                items=await Message.list(
+                    filter_dict=filter_dict,
+                    skip=(page - 1) * limit,
+                    limit=limit,
+                    exclude_fields=MESSAGE_LIST_EXCLUDE,
+                )
+            )
+        else:
+            result = await Message.list_page(
+                filter_dict,
+                limit=limit,
+                cursor=cursor,
+                exclude_fields=MESSAGE_LIST_EXCLUDE,
+            )
+        messages = result.items
 
-        return ResponseModel(
+        return json_response(
             success=True,
             data={
-                "messages": [
-                    message.model_dump(by_alias=False) for message in messages
-                ],
+                "messages": messages,
                 "pagination": {
                     "total": total,
+                    "total_exact": total_exact,
                     "page": page,
                     "limit": limit,
-                    "pages": (total + limit - 1) // limit,
+                    "pages": None if total is None else (total + limit - 1) // limit,
+                    "next_cursor": result.next_cursor,
+                    "prev_cursor": result.prev_cursor,
                 },
             },
             message="Messages retrieved successfully",
+            exclude_unset=True,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve messages: {str(e)}"
@@ -335,7 +389,7 @@ async def mark_messages_read(
     2. 通过 message_ids 参数标记指定消息为已读
     """
     # 验证会话是否存在且用户是否在会话中
-    conversation = await Conversation.get_by_id(conversation_id)
+    conversation = await Conversation.get_by_id(conversation_id, fields={"members"})
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -375,7 +429,7 @@ async def mark_messages_read(
             )
             modified_count = result.modified_count
 
-        return ResponseModel(
+        return json_response(
             success=True,
             data={"modified_count": modified_count},
             message=f"Marked {modified_count} messages as read",
@@ -1,29 +1,31 @@
 from fastapi import APIRouter, HTTPException, Path
-from openai import AsyncOpenAI
 
 from app.dependencies.auth import AdminUser
+from app.dependencies.database import SecondaryReads
+from app.infra.registry import registry
 from app.models.llm_model import LLM
-from app.utils.api_response import ResponseModel
+from app.utils.api_response import ResponseModel, json_response
 from app.utils.logger import get_logger
+from app.utils.tracing import TracedRoute, span
 
 logger = get_logger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
+# 不对外返回的字段，读取时直接不从数据库加载
+PRIVATE_FIELDS = {"api_key", "base_url"}
 
-@router.get("", response_model=ResponseModel)
+
+@router.get("", response_model=ResponseModel, dependencies=[SecondaryReads])
 async def list_llm():
     """获取所有大语言模型"""
-    all_llm = await LLM.list(skip=0, limit=100)
-    return ResponseModel(
+    all_llm = await LLM.list(
+        skip=0, limit=100, exclude_fields=PRIVATE_FIELDS | {"is_deleted"}
+    )
+    return json_response(
         success=True,
-        data=[
-            model.model_dump(
-                exclude={"api_key", "base_url", "is_deleted"},
-                by_alias=False,
-            )
-            for model in all_llm
-        ],
+        data=all_llm,
+        exclude_unset=True,
         message="LLMs retrieved successfully",
     )
 
@@ -31,15 +33,15 @@ async def list_llm():
 @router.get("/{llm_name}", response_model=ResponseModel)
 async def get_llm(llm_name: str = Path(..., description="大语言模型名称")):
     """获取单个大语言模型"""
-    llm = await LLM.get_by_single_field("model_name", llm_name)
+    llm = await LLM.get_by_single_field(
+        "model_name", llm_name, exclude_fields=PRIVATE_FIELDS
+    )
     if not llm:
         raise HTTPException(status_code=404, detail="LLM not found")
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=llm.model_dump(
-            exclude={"api_key", "base_url"},
-            by_alias=False,
-        ),
+        data=llm,
+        exclude_unset=True,
         message="LLMs retrieved successfully",
     )
 
@@ -48,10 +50,11 @@ async def get_llm(llm_name: str = Path(..., description="大语言模型名称")
 async def sync_llm_models(current_user: AdminUser):
     """同步大语言模型列表"""
     logger.info(f"User {current_user.name} starting LLM models synchronization")
-    oai_client = AsyncOpenAI()
+    oai_client = await registry.get("openai")
 
     try:
-        model_list = await oai_client.models.list()
+        with span("openai.models.list"):
+            model_list = await oai_client.models.list()
         logger.info(
             f"User {current_user.name} retrieved {len(model_list.data)} models from OpenAI"
         )
@@ -71,7 +74,7 @@ async def sync_llm_models(current_user: AdminUser):
         )
         logger.info(f"User {current_user.name} LLM models synchronization completed")
 
-        return ResponseModel(
+        return json_response(
             success=True,
             data={},
             message="LLM models synchronized successfully",
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, HTTPException, Path, Query
 
+from app.dependencies.database import SecondaryReads
 from app.models.memory import Memory
 from app.models.person import Person
-from app.utils.api_response import ResponseModel
+from app.utils.api_response import ResponseModel, json_response
+from app.utils.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
-@router.get("", response_model=ResponseModel)
+@router.get("", response_model=ResponseModel, dependencies=[SecondaryReads])
 async def list_memories(
     owner_id: str = Query(None, description="所有者ID"),
     creator_id: str = Query(None, description="创建者ID"),
@@ -15,23 +17,18 @@ async def list_memories(
     """获取所有记忆"""
     memory_filter = {}
     if owner_id:
-        owner = await Person.get_by_id(owner_id)
+        owner = await Person.get_by_id(owner_id, fields={"id"})
         assert owner, f"Owner with ID {owner_id} not found"
         memory_filter["owner_id"] = owner_id
     if creator_id:
-        creator = await Person.get_by_id(creator_id)
+        creator = await Person.get_by_id(creator_id, fields={"id"})
         assert creator, f"Creator with ID {owner_id} not found"
         memory_filter["creator_id"] = creator_id
 
     memories = await Memory.list(filter_dict=memory_filter)
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=[
-            memory.model_dump(
-                by_alias=False,
-            )
-            for memory in memories
-        ],
+        data=memories,
         message="Memories retrieved successfully",
     )
 
@@ -42,11 +39,9 @@ async def get_memory(memory_id: str = Path(..., description="记忆ID")):
     memory = await Memory.get_by_id(memory_id)
     if not memory:
         raise HTTPException(status_code=404, detail="Memory not found")
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=memory.model_dump(
-            by_alias=False,
-        ),
+        data=memory,
         message="Memory retrieved successfully",
     )
 
@@ -1,55 +1,75 @@
-from fastapi import APIRouter, HTTPException, Path
+from typing import Optional
 
+from fastapi import APIRouter, HTTPException, Path, Response
+
+from app.dependencies.database import SecondaryReads
 from app.models.memory import Memory
 from app.models.person import Person
-from app.utils.api_response import ResponseModel
+from app.utils.api_response import ResponseModel, json_response
+from app.utils.pagination import set_cursor_headers
+from app.utils.tracing import TracedRoute
+
+router = APIRouter(route_class=TracedRoute)
 
-router = APIRouter()
+# 不对外返回的字段，读取时直接不从数据库加载
+PRIVATE_FIELDS = {"access_token"}
 
 
-@router.get("", response_model=ResponseModel)
-async def list_persons(page: int = 1, limit: int = 100, role: str = None):
-    """获取所有人物"""
+@router.get("", response_model=ResponseModel, dependencies=[SecondaryReads])
+async def list_persons(
+    response: Response,
+    page: int = 1,
+    limit: int = 100,
+    role: str = None,
+    cursor: Optional[str] = None,
+):
+    """获取所有人物
+
+    推荐使用 cursor 分页：下一页/上一页游标通过 X-Next-Cursor/X-Prev-Cursor
+    响应头返回；page 参数仅为兼容保留。
+    """
     filter_dict = {}
     if role:
         filter_dict["role"] = role
-    persons = await Person.list(
-        filter_dict=filter_dict, skip=(page - 1) * limit, limit=limit
-    )
-    return ResponseModel(
-        success=True,
-        data=[
-            person.model_dump(
-                exclude={"access_token"},
-                by_alias=False,
+    if page > 1 and not cursor:
+        persons = await Person.list(
+            filter_dict=filter_dict,
+            skip=(page - 1) * limit,
+            limit=limit,
+            exclude_fields=PRIVATE_FIELDS,
+        )
+    else:
+        try:
+            result = await Person.list_page(
+                filter_dict, limit=limit, cursor=cursor, exclude_fields=PRIVATE_FIELDS
             )
-            for person in persons
-        ],
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        set_cursor_headers(response, result)
+        persons = result.items
+    return json_response(
+        success=True,
+        data=persons,
+        exclude_unset=True,
         message="Persons retrieved successfully",
+        response=response,
     )
 
 
-@router.get("/{person_id}", response_model=ResponseModel)
+@router.get("/{person_id}", response_model=ResponseModel, dependencies=[SecondaryReads])
 async def get_person(person_id: str):
     """获取单个人物"""
-    person = await Person.get_by_id(person_id)
+    person = await Person.get_by_id(person_id, exclude_fields=PRIVATE_FIELDS)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
     memories = await Memory.list({"owner_id": person_id}, limit=100)
-    return ResponseModel(
+    return json_response(
         success=True,
         data={
-            "person": person.model_dump(
-                exclude={"access_token"},
-                by_alias=False,
-            ),
-            "memories": [
-                memory.model_dump(
-                    by_alias=False,
-                )
-                for memory in memories
-            ],
+            "person": person,
+            "memories": memories,
         },
+        exclude={"person": PRIVATE_FIELDS},
         message="Person retrieved successfully",
     )
 
@@ -58,9 +78,10 @@ async def get_person(person_id: str):
 async def create_person(payload: Person):
     """创建人物"""
     new_person = await Person.create(**payload.model_dump(exclude={"access_token"}))
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=new_person.model_dump(exclude={"access_token"}, by_alias=False),
+        data=new_person,
+        exclude=PRIVATE_FIELDS,
         message="Person created successfully",
     )
 
@@ -76,13 +97,13 @@ async def update_person(person_id: str, payload: Person):
     except Exception as e:
         success = False
         message = str(e)
-    return ResponseModel(success=success, data={}, message=message)
+    return json_response(success=success, data={}, message=message)
 
 
 @router.delete("/{person_id}", response_model=ResponseModel)
 async def delete_person(person_id: str):
     """删除人物"""
     success = await Person.delete_by_id(person_id)
-    return ResponseModel(
+    return json_response(
         success=success, data={"id": person_id}, message="Person deleted successfully"
     )
@@ -1,23 +1,20 @@
 from fastapi import APIRouter, HTTPException, Path
 
+from app.dependencies.database import SecondaryReads
 from app.models.tool import Tool
-from app.utils.api_response import ResponseModel
+from app.utils.api_response import ResponseModel, json_response
+from app.utils.tracing import TracedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 
-@router.get("", response_model=ResponseModel)
+@router.get("", response_model=ResponseModel, dependencies=[SecondaryReads])
 async def list_tools():
     """获取所有工具"""
     tools = await Tool.list(skip=0, limit=100)
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=[
-            tool.model_dump(
-                by_alias=False,
-            )
-            for tool in tools
-        ],
+        data=tools,
         message="Tools retrieved successfully",
     )
 
@@ -28,11 +25,9 @@ async def get_tool(tool_id: str):
     tool = await Tool.get_by_id(tool_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
-    return ResponseModel(
+    return json_response(
         success=True,
-        data=tool.model_dump(
-            by_alias=False,
-        ),
+        data=tool,
         message="Tool retrieved successfully",
     )
 
@@ -1,7 +1,97 @@
+from typing import Any, Optional
+
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from pydantic_core import SchemaSerializer, core_schema
 
 
 class ResponseModel(BaseModel):
     success: bool
     message: str | None = None
     data: dict | list | None = None
+
+
+def _json_fallback(value: Any) -> Any:
+    """to_json 不支持的类型"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# pydantic_core.to_json 不支持 exclude_unset，用 Any 类型的序列化器代替
+_serializer = SchemaSerializer(core_schema.any_schema())
+
+
+class FastJSONResponse(JSONResponse):
+    """用 pydantic_core 直接序列化为 JSON 字节的响应
+
+    datetime、set、BaseModel 等由 pydantic_core 原生处理，ObjectId 转为字符串。
+    content 中的模型无需预先 model_dump，按 by_alias=False 与 exclude_unset、exclude 输出。
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        *args: Any,
+        exclude_unset: bool = False,
+        exclude: Optional[dict] = None,
+        **kwargs: Any,
+    ):
+        # JSONResponse.__init__ 中即调用 render
+        self.exclude_unset = exclude_unset
+        self.exclude = exclude
+        super().__init__(content, *args, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return _serializer.to_json(
+            content,
+            by_alias=False,
+            exclude_unset=self.exclude_unset,
+            exclude=self.exclude,
+            fallback=_json_fallback,
+        )
+
+
+def json_response(
+    success: bool,
+    data: Optional[dict | list] = None,
+    message: Optional[str] = None,
+    status_code: int = 200,
+    response: Optional[Response] = None,
+    exclude_unset: bool = False,
+    exclude: Optional[set | dict] = None,
+) -> FastJSONResponse:
+    """
+    构造 {success, message, data} 格式的响应
+
+    路由直接返回 Response 时 FastAPI 不会再按 response_model 校验和序列化一遍
+    （response_model=ResponseModel 仅用于生成 OpenAPI 文档）。
+
+    Args:
+        success: 是否成功
+        data: 响应数据，可直接包含模型及 datetime/ObjectId 等，无需预先转换
+        message: 提示信息
+        status_code: HTTP 状态码
+        response: 路由注入的 Response；直接返回响应时 FastAPI 不会合并其响应头，
+            需传入以保留（如分页游标响应头）
+        exclude_unset: 模型只输出已设置的字段（投影查询未读取的字段不输出）
+        exclude: data 中不输出的字段，格式同 model_dump 的 exclude
+
+    Returns:
+        FastJSONResponse: JSON 响应
+    """
+    result = FastJSONResponse(
+        {"success": success, "message": message, "data": data},
+        status_code=status_code,
+        exclude_unset=exclude_unset,
+        exclude=None if exclude is None else {"data": exclude},
+    )
+    if response is not None:
+        result.raw_headers.extend(
+            (key, value)
+            for key, value in response.raw_headers
+            if key != b"content-length"
+        )
+    return result
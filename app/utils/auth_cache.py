@@ -0,0 +1,202 @@
+import hashlib
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from app.infra.redis_sdk import get_shared_redis
+from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
+from app.utils.ttl_cache import MISSING, TTLCache
+
+logger = get_logger(__name__)
+
+AUTH_CACHE_EVENTS = REGISTRY.counter(
+    "auth_cache_events_total", "Auth token cache lookups", ["namespace", "result"]
+)
+
+# Redis 中负缓存的占位值
+_NEGATIVE = ""
+
+
+class AuthTokenCache:
+    """两级 token 认证缓存
+
+    第一级为进程内 TTL/LRU 缓存，第二级为多 worker 共享的 Redis 缓存。
+    无效 token 以负缓存的形式保存，避免反复查询数据库。
+    Redis 不可用时自动退化为仅使用进程内缓存。
+
+    其他 worker 的进程内缓存无法被主动失效，因此进程内过期时间应保持较短。
+    """
+
+    def __init__(
+        self,
+        dumps: Callable[[Any], str],
+        loads: Callable[[str], Any],
+        namespace: str = "auth",
+        local_maxsize: int = 10000,
+        local_ttl: float = 10,
+        redis_ttl: int = 300,
+        negative_ttl: int = 30,
+        enabled: bool = True,
+    ):
+        """
+        Args:
+            dumps: 将缓存值序列化为字符串（写入 Redis）
+            loads: 将字符串反序列化为缓存值（读取 Redis）
+            namespace: Redis 键前缀
+            local_maxsize: 进程内缓存最大条目数
+            local_ttl: 进程内缓存过期时间（秒）
+            redis_ttl: Redis 缓存过期时间（秒）
+            negative_ttl: 负缓存过期时间（秒）
+            enabled: 是否启用缓存
+        """
+        self.dumps = dumps
+        self.loads = loads
+        self.namespace = namespace
+        self.redis_ttl = redis_ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self._local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        # person_id -> token 的反向索引，用于按用户失效（Redis 中保存的是 token 的
+        # 缓存键，而非 token 本身）
+        self._person_tokens = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self._stats = {
+            result: AUTH_CACHE_EVENTS.labels(namespace, result)
+            for result in ("local_hits", "redis_hits", "negative_hits", "misses")
+        }
+
+    def _token_key(self, token: str) -> str:
+        # 不在 Redis 中保存明文 token
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        return f"{self.namespace}:token:{digest}"
+
+    def _person_key(self, person_id: str) -> str:
+        return f"{self.namespace}:person:{person_id}"
+
+    async def get(self, token: str) -> Tuple[bool, Any]:
+        """
+        查询缓存
+
+        Args:
+            token: 访问令牌
+
+        Returns:
+            (是否命中, 缓存值)，命中负缓存时缓存值为 None
+        """
+        if not self.enabled:
+            return False, None
+
+        value = self._local.get(token)
+        if value is not MISSING:
+            self._stats["local_hits"].inc()
+            if value is None:
+                self._stats["negative_hits"].inc()
+            return True, value
+
+        redis = await get_shared_redis()
+        if redis is not None:
+            try:
+                raw = await redis.get(self._token_key(token))
+            except Exception as e:
+                logger.warning(f"Auth cache redis get failed: {e}")
+                raw = None
+            if raw is not None:
+                self._stats["redis_hits"].inc()
+                if raw == _NEGATIVE:
+                    self._stats["negative_hits"].inc()
+                    self._local.set(token, None)
+                    return True, None
+                value = self.loads(raw)
+                self._local.set(token, value)
+                return True, value
+
+        self._stats["misses"].inc()
+        return False, None
+
+    async def set(self, token: str, person_id: Optional[str], value: Any) -> None:
+        """
+        写入缓存
+
+        Args:
+            token: 访问令牌
+            person_id: 令牌所属用户ID，无效 token 传 None
+            value: 缓存值，为 None 时写入负缓存
+        """
+        if not self.enabled:
+            return
+
+        if value is None:
+            self._local.set(token, None, ttl=min(self._local.ttl, self.negative_ttl))
+        else:
+            self._local.set(token, value)
+            if person_id:
+                self._person_tokens.set(person_id, token)
+
+        redis = await get_shared_redis()
+        if redis is None:
+            return
+        try:
+            if value is None:
+                await redis.set(self._token_key(token), _NEGATIVE, ex=self.negative_ttl)
+            else:
+                await redis.set(
+                    self._token_key(token), self.dumps(value), ex=self.redis_ttl
+                )
+                if person_id:
+                    await redis.set(
+                        self._person_key(person_id),
+                        self._token_key(token),
+                        ex=self.redis_ttl,
+                    )
+        except Exception as e:
+            logger.warning(f"Auth cache redis set failed: {e}")
+
+    async def invalidate_token(self, token: Optional[str]) -> None:
+        """使单个 token 的缓存失效（包括负缓存）"""
+        await self.invalidate_tokens([token])
+
+    async def invalidate_tokens(self, tokens: Iterable[Optional[str]]) -> None:
+        """使一批 token 的缓存失效，Redis 中的键一次删除"""
+        tokens = [token for token in tokens if token]
+        if not self.enabled or not tokens:
+            return
+
+        for token in tokens:
+            self._local.pop(token)
+        redis = await get_shared_redis()
+        if redis is None:
+            return
+        try:
+            await redis.delete([self._token_key(token) for token in tokens])
+        except Exception as e:
+            logger.warning(f"Auth cache redis delete failed: {e}")
+
+    async def invalidate_person(self, person_id: str) -> None:
+        """使某个用户当前 token 的缓存失效"""
+        if not self.enabled or not person_id:
+            return
+
+        token = self._person_tokens.pop(person_id)
+        if token:
+            self._local.pop(token)
+
+        redis = await get_shared_redis()
+        if redis is None:
+            return
+        try:
+            token_key = await redis.get(self._person_key(person_id))
+            keys = {self._person_key(person_id)}
+            if token_key:
+                keys.add(token_key)
+            if token:
+                keys.add(self._token_key(token))
+            await redis.delete(sorted(keys))
+        except Exception as e:
+            logger.warning(f"Auth cache redis invalidate failed: {e}")
+
+    def clear_local(self) -> None:
+        """清空进程内缓存"""
+        self._local.clear()
+        self._person_tokens.clear()
+
+    def stats(self) -> dict:
+        """返回命中统计"""
+        return {result: int(counter.value) for result, counter in self._stats.items()}
@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, Literal, Optional
 
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,6 +23,32 @@ class MongoDBSettings(BaseModel):
     username: Optional[str] = None
     password: Optional[str] = None
     database: str = "lingverse"
+    # 连接池：启动时预热 min_pool_size 个连接，空闲超过 max_idle_time_ms 的连接被关闭
+    max_pool_size: int = 100
+    min_pool_size: int = 10
+    max_idle_time_ms: int = 600000
+    wait_queue_timeout_ms: Optional[int] = None  # 等待可用连接的超时，为空不限制
+    connect_timeout_ms: int = 5000
+    server_selection_timeout_ms: int = 10000
+    warmup_timeout: float = 10  # 启动预热的超时（秒），超时只记录错误
+    # 线路压缩，按顺序与服务端协商；zstd 需安装 zstandard，snappy 需安装 python-snappy
+    compressors: str = "zstd,snappy,zlib"
+    slow_query_ms: float = 100  # 慢查询日志阈值（毫秒）
+    bulk_chunk_size: int = 1000  # create_many 每批 insert_many 的文档数
+    sync_indexes: bool = True  # 启动时在后台创建模型声明但缺失的索引
+    count_cache_ttl: float = 30  # 无法使用计数器时，消息总数的缓存时间（秒）
+    # 查询计划检查：off / warn / raise，仅开发/测试环境开启
+    explain_mode: Literal["off", "warn", "raise"] = "off"
+    explain_report: Optional[str] = None  # 进程退出时写入查询计划报告的路径
+    # 读写分离：需要副本集。读多写少的路由使用 read_preference 读取，primary 表示
+    # 全部读主节点；其他值同时启用请求范围的因果一致会话
+    replica_set: Optional[str] = None
+    read_preference: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "primary"
+    # 从节点最大复制延迟（秒），-1 不限制，否则不小于 90
+    max_staleness_seconds: int = 90
+    causal_window: float = 120  # 用户写入后其后续请求保持读到自己写入的时长（秒）
 
     model_config = SettingsConfigDict(env_prefix="MONGODB_")
 
@@ -34,6 +60,11 @@ class RedisSettings(BaseModel):
 
     model_config = SettingsConfigDict(env_prefix="REDIS_")
 
+    @property
+    def url(self) -> str:
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{self.host}:{self.port}/0"
+
 
 class ElasticsearchSettings(BaseModel):
     host: str = "localhost"
@@ -44,6 +75,85 @@ class ElasticsearchSettings(BaseModel):
     model_config = SettingsConfigDict(env_prefix="ELASTICSEARCH_")
 
 
+class AuthSettings(BaseModel):
+    cache_enabled: bool = True  # 是否启用 token 认证缓存
+    cache_local_maxsize: int = 10000  # 进程内缓存的最大 token 数
+    cache_local_ttl: float = 10  # 进程内缓存过期时间（秒）
+    cache_redis_ttl: int = 300  # Redis 缓存过期时间（秒）
+    cache_negative_ttl: int = 30  # 无效 token 的负缓存过期时间（秒）
+
+    model_config = SettingsConfigDict(env_prefix="AUTH_")
+
+
+class CacheSettings(BaseModel):
+    # 是否启用模型 get_by_id 的 Redis 读穿透缓存（模型需设置 cached）
+    enabled: bool = True
+    ttl: int = 300  # 缓存过期时间（秒），模型可通过 cache_ttl 单独设置
+
+    model_config = SettingsConfigDict(env_prefix="CACHE_")
+
+
+class ShardingSettings(BaseModel):
+    # 声明了 shard_key 的模型（如 Message）按一致性哈希分布到这些分片，为空不分片。
+    # 格式：名称=MongoDB URI，分号分隔；URI 未指定数据库时使用 MONGODB_DATABASE
+    shards: str = ""
+    vnodes: int = 160  # 每个分片在哈希环上的虚拟节点数
+    # 重新平衡期间开启：带分片键的读写也访问所有分片，见 scripts/rebalance_shards.py
+    migrating: bool = False
+
+    model_config = SettingsConfigDict(env_prefix="SHARDING_")
+
+
+class StartupSettings(BaseModel):
+    # 快速启动：不在启动时创建 eager 客户端（如 MongoDB 连接池预热），首次使用时再创建
+    fast: bool = False
+    # 导入 app.main 的耗时上限，scripts/import_time.py 检查
+    import_budget_ms: float = 1500
+
+    model_config = SettingsConfigDict(env_prefix="STARTUP_")
+
+
+class LogSettings(BaseModel):
+    level: str = "DEBUG"  # 日志级别
+    format: Literal["text", "json"] = "text"  # 输出格式，生产环境建议 json
+    queued: bool = False  # 是否通过有界队列 + 后台线程异步写日志
+    queue_size: int = 10000  # 队列容量，满时丢弃日志并计数
+    sample_rate: float = 10  # 高频调试日志每个调用点每秒最多记录条数，<=0 不限制
+
+    model_config = SettingsConfigDict(env_prefix="LOG_")
+
+
+class TracingSettings(BaseModel):
+    enabled: bool = True  # 是否记录 trace
+    sample_rate: float = 0.01  # 概率采样比例
+    slow_ms: float = 500  # 超过该耗时的请求总是导出（尾部采样）
+    buffer_size: int = 200  # 内存环形缓冲保存的 trace 数
+    max_spans: int = 500  # 单个 trace 最多记录的 span 数
+    file: Optional[str] = None  # NDJSON 导出文件路径，为空则不写文件
+
+    model_config = SettingsConfigDict(env_prefix="TRACING_")
+
+
+class RateLimitSettings(BaseModel):
+    enabled: bool = True  # 是否按用户限流
+    rate: float = 20  # 默认每个用户每秒允许的请求数
+    burst: int = 40  # 默认允许的突发请求数
+    lease_size: int = 5  # 每个 worker 一次从 Redis 预取的令牌数
+    # 按路由覆盖默认额度，如 {"GET /api/conversations/{conversation_id}/messages": "2/10"}
+    routes: Dict[str, str] = {}
+
+    model_config = SettingsConfigDict(env_prefix="RATELIMIT_")
+
+
+class MonitorSettings(BaseModel):
+    enabled: bool = True  # 是否启动事件循环监控
+    interval: float = 0.5  # 循环延迟测量间隔（秒）
+    block_ms: float = 100  # 事件循环被阻塞超过该时长时记录调用栈
+    log_interval: float = 60  # 输出循环延迟汇总日志的间隔（秒）
+
+    model_config = SettingsConfigDict(env_prefix="MONITOR_")
+
+
 class Settings(BaseSettings):
     """应用配置"""
 
@@ -59,10 +169,35 @@ class Settings(BaseSettings):
     # Elasticsearch 配置
     elasticsearch: ElasticsearchSettings = ElasticsearchSettings()
 
+    # 认证配置
+    auth: AuthSettings = AuthSettings()
+
+    # 模型缓存配置
+    cache: CacheSettings = CacheSettings()
+
+    # 分片配置
+    sharding: ShardingSettings = ShardingSettings()
+
+    # 启动配置
+    startup: StartupSettings = StartupSettings()
+
+    # 日志配置
+    log: LogSettings = LogSettings()
+
+    # 链路追踪配置
+    tracing: TracingSettings = TracingSettings()
+
+    # 限流配置
+    ratelimit: RateLimitSettings = RateLimitSettings()
+
+    # 事件循环监控配置
+    monitor: MonitorSettings = MonitorSettings()
+
     model_config = SettingsConfigDict(
         env_file=os.path.join(BASE_PATH, ".env"),
         env_file_encoding="utf-8",
         env_nested_delimiter="_",  # 修改分隔符为下划线
+        env_nested_max_split=1,  # 只按第一个下划线拆分，如 MONGODB_SLOW_QUERY_MS
         case_sensitive=False,
     )
 
@@ -79,3 +214,8 @@ if __name__ == "__main__":
     print(f"Redis settings: {settings.redis}")
     print(f"Elasticsearch settings: {settings.elasticsearch}")
     print(f"ADMIN settings: {settings.admin}")
+    print(f"Auth settings: {settings.auth}")
+    print(f"Log settings: {settings.log}")
+    print(f"Tracing settings: {settings.tracing}")
+    print(f"Rate limit settings: {settings.ratelimit}")
+    print(f"Monitor settings: {settings.monitor}")
@@ -0,0 +1,94 @@
+import contextvars
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+DB_OPERATION_DURATION = REGISTRY.histogram(
+    "mongodb_operation_duration_seconds",
+    "MongoDB operation latency",
+    ["collection", "operation"],
+)
+
+# 慢查询阈值（秒）
+SLOW_QUERY_THRESHOLD = get_settings().mongodb.slow_query_ms / 1000
+
+
+@dataclass
+class DBStats:
+    """单个请求内的数据库操作统计"""
+
+    count: int = 0
+    time: float = 0.0  # 累计耗时（秒）
+
+
+# 当前请求的数据库操作统计，请求外为 None
+DB_STATS = contextvars.ContextVar("db_stats", default=None)
+
+
+def start_db_stats() -> DBStats:
+    """开始统计当前请求的数据库操作"""
+    stats = DBStats()
+    DB_STATS.set(stats)
+    return stats
+
+
+def get_db_stats() -> Optional[DBStats]:
+    """获取当前请求的数据库操作统计"""
+    return DB_STATS.get()
+
+
+def reset_db_stats() -> None:
+    """结束统计"""
+    DB_STATS.set(None)
+
+
+def filter_shape(value: Any) -> Any:
+    """
+    提取查询条件的结构，去掉具体取值
+
+    例如 {"conversation_id": "abc", "created_at": {"$lt": dt}}
+    变为 {"conversation_id": "?", "created_at": {"$lt": "?"}}
+    """
+    if isinstance(value, dict):
+        return {k: filter_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or 等逻辑操作符保留子条件结构，$in 等取值列表折叠
+        if value and all(isinstance(v, dict) for v in value):
+            return [filter_shape(v) for v in value]
+        return ["?"]
+    return "?"
+
+
+def record_operation(
+    collection: str,
+    operation: str,
+    duration: float,
+    filter: Any = None,
+    count: int = 1,
+) -> None:
+    """
+    记录一次数据库操作
+
+    Args:
+        collection: 集合名
+        operation: 操作名，如 find_one/update_many
+        duration: 耗时（秒）
+        filter: 查询条件，仅用于慢查询日志
+        count: 计入的操作次数（游标的后续批次传 0，只累加耗时）
+    """
+    stats = DB_STATS.get()
+    if stats is not None:
+        stats.count += count
+        stats.time += duration
+    DB_OPERATION_DURATION.labels(collection, operation).observe(duration)
+
+    if duration >= SLOW_QUERY_THRESHOLD:
+        logger.warning(
+            f"Slow query: {collection}.{operation} "
+            f"filter={filter_shape(filter)} {duration * 1000:.2f}ms"
+        )
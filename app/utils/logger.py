@@ -1,10 +1,34 @@
+import atexit
+import json
+import queue
 import sys
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, TextIO
 
 from loguru import logger
 
+from app.utils.config import get_settings
+from app.utils.metrics import REGISTRY
 from app.utils.request_id import get_request_id
 
+log_cfg = get_settings().log
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "log_records_dropped_total", "Log records dropped because the queue was full"
+)
+LOG_RECORDS_SAMPLED_OUT = REGISTRY.counter(
+    "log_records_sampled_out_total", "High-volume log records skipped by sampling"
+)
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
+    "<blue>{level}</blue> | "
+    "<magenta>{extra[request_id]}</magenta> | "
+    "{message}"
+)
+
 # 移除默认的处理器
 logger.remove()
 
@@ -15,17 +39,166 @@ def request_id_filter(record: Dict[str, Any]) -> bool:
     return True
 
 
+def json_line(record: Dict[str, Any]) -> str:
+    """将日志记录格式化为一行 JSON"""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "name": record["extra"].get("name", record["name"]),
+        "function": record["function"],
+        "line": record["line"],
+        "request_id": record["extra"].get("request_id"),
+        "message": record["message"],
+    }
+    if record["exception"] is not None:
+        payload["exception"] = repr(record["exception"].value)
+    return json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+
+
+class QueuedSink:
+    """有界队列 + 后台线程写入的日志 sink
+
+    调用方只做一次非阻塞入队，格式化为 JSON 与 IO 都在后台线程完成；
+    队列满时直接丢弃日志并计数，不阻塞请求。
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream: TextIO,
+        maxsize: int = 10000,
+        serialize: bool = False,
+        start: bool = True,
+    ):
+        """
+        Args:
+            stream: 输出流
+            maxsize: 队列容量
+            serialize: 是否输出 JSON 行
+            start: 是否立即启动写入线程
+        """
+        self.stream = stream
+        self.serialize = serialize
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        if start:
+            self._thread.start()
+
+    def write(self, message) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def _format(self, message) -> str:
+        if self.serialize:
+            return json_line(message.record)
+        return str(message)
+
+    def _run(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is self._STOP:
+                break
+            try:
+                self.stream.write(self._format(message))
+                # 队列已空时再 flush，减少系统调用
+                if self._queue.empty():
+                    self.stream.flush()
+            except Exception as e:  # 日志线程不能退出
+                sys.stderr.write(f"Failed to write log record: {e}\n")
+
+    def drain(self) -> None:
+        """同步写出队列中剩余的日志（用于未启动线程或退出前）"""
+        while True:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if message is not self._STOP:
+                self.stream.write(self._format(message))
+        self.stream.flush()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """停止写入线程，并写出剩余日志"""
+        if self._thread.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self.drain()
+
+
+class LogSampler:
+    """按调用点限流的日志采样器（令牌桶，每个调用点每秒最多 rate 条）"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._buckets: Dict[str, list] = {}
+
+    def allow(self, key: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.rate, now]
+        tokens = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            LOG_RECORDS_SAMPLED_OUT.inc()
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+
+_sampler = LogSampler(log_cfg.sample_rate)
+_debug_enabled = logger.level(log_cfg.level.upper()).no <= logger.level("DEBUG").no
+
+
+def sampled(key: str) -> bool:
+    """
+    判断高频调试日志是否需要记录
+
+    DEBUG 级别未启用时直接返回 False，避免无用的字符串格式化。
+
+    Args:
+        key: 调用点标识，如 "mongo.create"
+
+    Returns:
+        bool: 是否记录本条日志
+    """
+    return _debug_enabled and _sampler.allow(key)
+
+
 # 添加自定义格式的处理器
-logger.add(
-    sys.stdout,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
-    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
-    "<blue>{level}</blue> | "
-    "<magenta>{extra[request_id]}</magenta> | "
-    "{message}",
-    level="DEBUG",
-    filter=request_id_filter,
-)
+if log_cfg.queued:
+    sink = QueuedSink(
+        sys.stdout, maxsize=log_cfg.queue_size, serialize=log_cfg.format == "json"
+    )
+    atexit.register(sink.stop)
+    logger.add(
+        sink.write,
+        format="{message}" if log_cfg.format == "json" else TEXT_FORMAT,
+        level=log_cfg.level.upper(),
+        filter=request_id_filter,
+        colorize=False,
+    )
+else:
+    logger.add(
+        sys.stdout,
+        format=TEXT_FORMAT,
+        level=log_cfg.level.upper(),
+        filter=request_id_filter,
+        serialize=log_cfg.format == "json",
+    )
 
 
 def get_logger(name: str):
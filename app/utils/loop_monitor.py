@@ -0,0 +1,173 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Delay between scheduling and running a callback on the event loop",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+LOOP_LAG_LAST = REGISTRY.gauge(
+    "event_loop_lag_last_seconds", "Most recent event loop lag measurement"
+)
+LOOP_BLOCKED = REGISTRY.counter(
+    "event_loop_blocked_total", "Times the event loop was blocked over the threshold"
+)
+
+
+class LoopMonitor:
+    """事件循环延迟监控与阻塞检测
+
+    后台线程按固定间隔通过 call_soon_threadsafe 向事件循环投递一个回调，
+    回调实际执行时间与投递时间之差即为循环延迟。若回调在阈值内迟迟未执行，
+    说明循环正被同步代码阻塞，此时直接抓取事件循环线程的调用栈并记录下来。
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        block_threshold: float = 0.1,
+        log_interval: float = 60,
+        history: int = 20,
+    ):
+        """
+        Args:
+            interval: 测量间隔（秒）
+            block_threshold: 判定为阻塞的阈值（秒）
+            log_interval: 输出延迟汇总日志的间隔（秒）
+            history: 保留的阻塞记录数
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.log_interval = log_interval
+        self.blocks: deque = deque(maxlen=history)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._window_max = 0.0
+        self._window_total = 0.0
+        self._window_count = 0
+        self._last_log = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._pending_since: Optional[float] = None
+        self._current_block: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """在事件循环线程中调用，启动监控线程"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="loop-monitor", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Event loop monitor started: interval={self.interval}s, "
+            f"block_threshold={self.block_threshold * 1000:.0f}ms"
+        )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        # 检查粒度需小于阻塞阈值，才能在阻塞期间抓到调用栈
+        check = min(self.interval, self.block_threshold / 2)
+        next_ping = time.monotonic()
+        while not self._stop.wait(check):
+            now = time.monotonic()
+            pending_since = self._pending_since
+            if pending_since is None:
+                if now >= next_ping:
+                    self._pending_since = now
+                    next_ping = now + self.interval
+                    try:
+                        self._loop.call_soon_threadsafe(self._pong, now)
+                    except RuntimeError:  # 事件循环已关闭
+                        return
+            elif now - pending_since >= self.block_threshold:
+                if self._current_block is None:
+                    self._capture_block()
+
+    def _capture_block(self) -> None:
+        """在监控线程中抓取事件循环线程当前的调用栈"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        self._current_block = {
+            "detected_at": time.time(),
+            "duration_ms": None,
+            "stack": "".join(stack),
+        }
+        LOOP_BLOCKED.inc()
+        logger.warning(
+            f"Event loop blocked for more than {self.block_threshold * 1000:.0f}ms:\n"
+            + "".join(stack[-10:])
+        )
+
+    def _pong(self, sent_at: float) -> None:
+        """在事件循环中执行的回调"""
+        lag = time.monotonic() - sent_at
+        self._pending_since = None
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        LOOP_LAG.observe(lag)
+        LOOP_LAG_LAST.set(lag)
+
+        block = self._current_block
+        if block is not None:
+            block["duration_ms"] = round(lag * 1000, 3)
+            self.blocks.append(block)
+            self._current_block = None
+
+        self._window_max = max(self._window_max, lag)
+        self._window_total += lag
+        self._window_count += 1
+        now = time.monotonic()
+        if now - self._last_log >= self.log_interval:
+            logger.info(
+                f"Event loop lag: avg={self._window_total / self._window_count * 1000:.2f}ms "
+                f"max={self._window_max * 1000:.2f}ms samples={self._window_count}"
+            )
+            self._window_max = self._window_total = 0.0
+            self._window_count = 0
+            self._last_log = now
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态，供管理接口使用"""
+        blocks: List[Dict[str, Any]] = list(self.blocks)
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "block_threshold_ms": self.block_threshold * 1000,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "blocked_total": int(LOOP_BLOCKED.value),
+            "recent_blocks": list(reversed(blocks)),
+        }
+
+
+_monitor_cfg = get_settings().monitor
+
+loop_monitor = LoopMonitor(
+    interval=_monitor_cfg.interval,
+    block_threshold=_monitor_cfg.block_ms / 1000,
+    log_interval=_monitor_cfg.log_interval,
+)
@@ -0,0 +1,178 @@
+from typing import Any, Dict, Optional, Tuple
+
+from bson import json_util
+
+from app.infra.redis_sdk import get_shared_redis
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+MODEL_CACHE_EVENTS = REGISTRY.counter(
+    "model_cache_events_total",
+    "Model read-through cache lookups",
+    ["model", "result"],
+)
+
+# 缓存查询结果
+CACHE_RESULTS = ("hits", "misses", "stale", "bypass")
+
+# 读取时记录的版本号：(文档版本, 模型代数)
+Versions = Tuple[str, str]
+
+
+class ModelCache:
+    """按版本号失效的模型读穿透缓存（Redis）
+
+    每个文档有一个版本号键，每个模型有一个代数键；缓存的文档记录写入时读到的
+    版本号和代数。修改文档时 INCR 其版本号，按条件批量修改时 INCR 模型代数，
+    旧的缓存值随即失效（无需删除，等待过期）。读取时用一次 MGET 同时取回文档、
+    版本号和代数。
+
+    读取缓存未命中后、写回缓存前若发生修改，写回的值带的是旧版本号，下次读取时
+    即被判为过期，因此不会缓存修改前的数据。
+
+    Redis 不可用时直接读数据库；此期间的修改无法递增版本号，恢复后最多在 ttl
+    内读到旧数据。
+    """
+
+    def __init__(self, namespace: str = "model", ttl: int = 300, enabled: bool = True):
+        """
+        Args:
+            namespace: Redis 键前缀
+            ttl: 默认过期时间（秒）
+            enabled: 是否启用缓存
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def _doc_key(self, model: str, id: str) -> str:
+        return f"{self.namespace}:{model}:doc:{id}"
+
+    def _version_key(self, model: str, id: str) -> str:
+        return f"{self.namespace}:{model}:ver:{id}"
+
+    def _generation_key(self, model: str) -> str:
+        return f"{self.namespace}:{model}:gen"
+
+    def _record(self, model: str, result: str) -> None:
+        MODEL_CACHE_EVENTS.labels(model, result).inc()
+
+    async def get(
+        self, model: str, id: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Versions]]:
+        """
+        查询缓存
+
+        Args:
+            model: 模型集合名
+            id: 文档ID
+
+        Returns:
+            (缓存的原始文档, 当前版本号)；未命中时文档为 None，版本号用于随后的
+            set，Redis 不可用时版本号为 None
+        """
+        redis = await get_shared_redis()
+        if redis is None:
+            self._record(model, "bypass")
+            return None, None
+        try:
+            raw, version, generation = await redis.mget(
+                [
+                    self._doc_key(model, id),
+                    self._version_key(model, id),
+                    self._generation_key(model),
+                ]
+            )
+        except Exception as e:
+            logger.warning(f"Model cache redis get failed: {e}")
+            self._record(model, "bypass")
+            return None, None
+
+        versions = (version or "0", generation or "0")
+        if raw is None:
+            self._record(model, "misses")
+            return None, versions
+        cached = json_util.loads(raw)
+        if (cached["v"], cached["g"]) != versions:
+            self._record(model, "stale")
+            return None, versions
+        self._record(model, "hits")
+        return cached["doc"], versions
+
+    async def set(
+        self,
+        model: str,
+        id: str,
+        doc: Dict[str, Any],
+        versions: Optional[Versions],
+        ttl: Optional[int] = None,
+    ) -> None:
+        """
+        写入缓存
+
+        Args:
+            model: 模型集合名
+            id: 文档ID
+            doc: 从数据库读取的原始文档
+            versions: 读取数据库之前 get 返回的版本号，为 None 时不写入
+            ttl: 过期时间（秒），为空时使用默认值
+        """
+        if versions is None:
+            return
+        redis = await get_shared_redis()
+        if redis is None:
+            return
+        version, generation = versions
+        try:
+            await redis.set(
+                self._doc_key(model, id),
+                json_util.dumps({"v": version, "g": generation, "doc": doc}),
+                ex=ttl or self.ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Model cache redis set failed: {e}")
+
+    async def invalidate(self, model: str, id: str, ttl: Optional[int] = None) -> None:
+        """
+        使单个文档的缓存失效
+
+        版本号键的过期时间为缓存过期时间的两倍：版本号键过期时，递增前写入的
+        缓存值一定已经过期，不会因版本号归零而重新变为有效。
+
+        Args:
+            model: 模型集合名
+            id: 文档ID
+            ttl: 该模型缓存的过期时间（秒），为空时使用默认值
+        """
+        await self._bump(self._version_key(model, id), ex=2 * (ttl or self.ttl))
+
+    async def invalidate_model(self, model: str) -> None:
+        """使某个模型所有文档的缓存失效"""
+        await self._bump(self._generation_key(model))
+
+    async def _bump(self, key: str, ex: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        redis = await get_shared_redis()
+        if redis is None:
+            return
+        try:
+            await redis.incr(key, ex=ex)
+        except Exception as e:
+            logger.warning(f"Model cache redis invalidate failed: {e}")
+
+    def stats(self, model: str) -> dict:
+        """返回某个模型的命中统计"""
+        return {
+            result: int(MODEL_CACHE_EVENTS.labels(model, result).value)
+            for result in CACHE_RESULTS
+        }
+
+
+_cache_cfg = get_settings().cache
+
+# 模型 get_by_id 的读穿透缓存
+model_cache = ModelCache(ttl=_cache_cfg.ttl, enabled=_cache_cfg.enabled)
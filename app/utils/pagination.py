@@ -0,0 +1,77 @@
+import base64
+import binascii
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generic, List, Literal, Optional, Tuple, TypeVar
+
+from bson import json_util
+from fastapi import Response
+
+T = TypeVar("T")
+
+CursorDirection = Literal["after", "before"]
+
+
+@dataclass
+class Page(Generic[T]):
+    """一页查询结果
+
+    next_cursor/prev_cursor 为空表示该方向上没有更多数据。
+    """
+
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(
+    direction: CursorDirection, sort_field: str, value: Any, id: Any
+) -> str:
+    """
+    编码分页游标
+
+    Args:
+        direction: after 取该位置之后（下一页），before 取该位置之前（上一页）
+        sort_field: 排序字段
+        value: 该位置文档的排序字段值
+        id: 该位置文档的 _id
+
+    Returns:
+        str: URL 安全的不透明游标
+    """
+    payload = {"d": direction, "k": sort_field, "v": value, "id": id}
+    raw = json_util.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort_field: str) -> Tuple[CursorDirection, Any, Any]:
+    """
+    解码分页游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+        sort_field: 当前查询的排序字段，与游标不一致时视为无效
+
+    Returns:
+        (方向, 排序字段值, _id)
+
+    Raises:
+        ValueError: 游标无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload: Dict[str, Any] = json_util.loads(raw)
+        direction, key = payload["d"], payload["k"]
+        value, id = payload["v"], payload["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if direction not in ("after", "before") or key != sort_field:
+        raise ValueError("Invalid cursor")
+    return direction, value, id
+
+
+def set_cursor_headers(response: Response, page: Page) -> None:
+    """列表形式的响应通过响应头返回前后页游标"""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.prev_cursor:
+        response.headers["X-Prev-Cursor"] = page.prev_cursor
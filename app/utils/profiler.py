@@ -0,0 +1,163 @@
+import asyncio
+import os
+import sys
+import threading
+from collections import Counter
+from types import CoroutineType, FrameType
+from typing import List, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 事件循环空闲时所在的函数（selector 等待 IO）
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "kqueue", "_poll", "control"}
+
+
+class ProfilerBusyError(RuntimeError):
+    """已有采样任务在运行"""
+
+
+def _frame_label(code) -> str:
+    # 折叠栈格式以 ; 分隔，标签中不能出现 ;
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _frame_stack(frame: Optional[FrameType]) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _coroutine_stack(coro) -> List[str]:
+    """沿 cr_await 链获取挂起协程的调用栈"""
+    stack = []
+    while coro is not None:
+        code = getattr(coro, "cr_code", None) or getattr(coro, "gi_code", None)
+        if code is None:
+            # Future 等非协程对象
+            stack.append(type(coro).__name__)
+            break
+        stack.append(_frame_label(code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+class SamplingProfiler:
+    """面向 asyncio 的采样分析器
+
+    在后台线程中按固定间隔采样事件循环线程的调用栈。运行中的协程帧通过 f_back
+    串联到等待它的协程，因此 CPU 时间会归属到具体的路由处理函数；事件循环在
+    selector 上等待时记为 <idle>。wall 模式下还会记录所有挂起任务的 await 栈，
+    用于分析请求在等待什么。
+
+    采样线程只读取帧对象，不会暂停事件循环，可以在 worker 正常处理请求时使用。
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        mode: str = "cpu",
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        thread_id: Optional[int] = None,
+    ):
+        """
+        Args:
+            interval: 采样间隔（秒）
+            mode: cpu 只采样正在执行的栈；wall 额外采样挂起任务的 await 栈
+            loop: 被采样的事件循环，默认当前运行的循环
+            thread_id: 事件循环所在线程，默认当前线程
+        """
+        if mode not in ("cpu", "wall"):
+            raise ValueError("mode must be 'cpu' or 'wall'")
+        self.interval = interval
+        self.mode = mode
+        self.loop = loop or asyncio.get_running_loop()
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:  # 采样失败不影响业务
+                logger.warning(f"Profiler sample failed: {e}")
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        self.sample_count += 1
+        stack = _frame_stack(frame)
+        if frame.f_code.co_name in IDLE_FUNCTIONS:
+            stack = ["<idle>"]
+        self.samples[";".join(stack)] += 1
+
+        if self.mode == "wall":
+            current = asyncio.current_task(self.loop)
+            for task in asyncio.all_tasks(self.loop):
+                if task is current or task.done():
+                    continue
+                coro = task.get_coro()
+                if not isinstance(coro, CoroutineType):
+                    continue
+                stack = ["<awaiting>"] + _coroutine_stack(coro)
+                self.samples[";".join(stack)] += 1
+
+    def collapsed(self) -> str:
+        """以折叠栈格式输出（可直接用 flamegraph.pl / speedscope 渲染）"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+_active_profiler: Optional[SamplingProfiler] = None
+
+
+async def profile(seconds: float, interval: float = 0.005, mode: str = "cpu"):
+    """
+    对当前进程采样指定时长
+
+    同一时间只允许一个采样任务，否则抛出 ProfilerBusyError。
+
+    Args:
+        seconds: 采样时长（秒）
+        interval: 采样间隔（秒）
+        mode: cpu 或 wall
+
+    Returns:
+        SamplingProfiler: 采样结果
+    """
+    global _active_profiler
+    # 检查与赋值之间没有 await，在事件循环内是原子的
+    if _active_profiler is not None:
+        raise ProfilerBusyError("A profiling session is already running")
+
+    profiler = SamplingProfiler(interval=interval, mode=mode)
+    _active_profiler = profiler
+    try:
+        logger.info(f"Profiling started: {seconds}s, {interval * 1000:.1f}ms, {mode}")
+        profiler.start()
+        await asyncio.sleep(seconds)
+    finally:
+        # 停止线程只需等待一个采样间隔
+        profiler.stop()
+        _active_profiler = None
+    logger.info(f"Profiling finished: {profiler.sample_count} samples")
+    return profiler
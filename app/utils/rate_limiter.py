@@ -0,0 +1,146 @@
+import math
+import time
+from typing import List, Tuple
+
+from app.infra.redis_sdk import get_shared_redis
+from app.utils.logger import get_logger
+from app.utils.ttl_cache import MISSING, TTLCache
+
+logger = get_logger(__name__)
+
+# 令牌桶：按 rate 个/秒补充，最多 burst 个；一次最多取走 requested 个令牌，
+# 返回实际取得的数量和令牌不足时需要等待的秒数（浮点数需转为字符串返回）
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+local retry_after = 0
+if granted == 0 then
+    retry_after = (1 - tokens) / rate
+end
+return {granted, tostring(retry_after)}
+"""
+
+
+class _Lease:
+    """当前 worker 持有的令牌"""
+
+    __slots__ = ("tokens", "blocked_until")
+
+    def __init__(self, tokens: int = 0, blocked_until: float = 0.0):
+        self.tokens = tokens
+        self.blocked_until = blocked_until
+
+
+class RateLimiter:
+    """多 worker 共享的令牌桶限流器
+
+    令牌桶保存在 Redis 中，由 Lua 脚本原子地补充和扣减。每个 worker 一次从
+    Redis 预取一小批令牌（租约）在本地消费，被拒绝后在本地记住需要等待的
+    时间，因此大部分请求不需要访问 Redis。租约中的令牌已从共享桶中扣除，
+    不会超发；租约过期未用完的令牌直接作废。一次预取的令牌数不超过租约
+    有效期内补充的数量（至少 1 个），低速率的键每次只取 1 个，避免一个
+    worker 取走桶中大部分令牌后过期作废。
+
+    Redis 不可用时退化为进程内令牌桶（每个 worker 各自限流）。
+    """
+
+    def __init__(
+        self,
+        namespace: str = "ratelimit",
+        lease_size: int = 5,
+        lease_ttl: float = 1.0,
+        maxsize: int = 100000,
+    ):
+        """
+        Args:
+            namespace: Redis 键前缀
+            lease_size: 每次从 Redis 预取的最大令牌数（另受 rate * lease_ttl 限制）
+            lease_ttl: 本地租约有效期（秒）
+            maxsize: 本地最多保存的限流键数量
+        """
+        self.namespace = namespace
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self._leases = TTLCache(maxsize=maxsize, ttl=lease_ttl)
+        self._fallback = TTLCache(maxsize=maxsize, ttl=60)
+
+    async def acquire(
+        self, key: str, rate: float, burst: int
+    ) -> Tuple[bool, float, str]:
+        """
+        为一次请求获取一个令牌
+
+        Args:
+            key: 限流键，如 "{person_id}:{route}"
+            rate: 每秒补充的令牌数
+            burst: 桶容量（允许的突发请求数）
+
+        Returns:
+            (是否放行, 需要等待的秒数, 判定来源 local/redis/fallback)
+        """
+        now = time.monotonic()
+        lease = self._leases.get(key, None)
+        if lease is not None:
+            if lease.blocked_until > now:
+                return False, lease.blocked_until - now, "local"
+            if lease.tokens > 0:
+                lease.tokens -= 1
+                return True, 0.0, "local"
+
+        redis = await get_shared_redis()
+        if redis is None:
+            return self._acquire_fallback(key, rate, burst, now)
+        try:
+            granted, retry_after = await redis.eval(
+                TOKEN_BUCKET_SCRIPT,
+                [f"{self.namespace}:{key}"],
+                [rate, burst, self._lease_size(rate, burst)],
+            )
+        except Exception as e:
+            logger.warning(f"Rate limiter falling back to local bucket: {e}")
+            return self._acquire_fallback(key, rate, burst, now)
+
+        granted, retry_after = int(granted), float(retry_after)
+        if granted > 0:
+            self._leases.set(key, _Lease(tokens=granted - 1))
+            return True, 0.0, "redis"
+        self._leases.set(
+            key, _Lease(blocked_until=now + retry_after), ttl=max(retry_after, 0.001)
+        )
+        return False, retry_after, "redis"
+
+    def _lease_size(self, rate: float, burst: int) -> int:
+        """本次预取的令牌数：不超过 lease_size、burst 和租约有效期内补充的令牌数"""
+        refill = max(1, math.ceil(rate * self.lease_ttl))
+        return max(1, min(self.lease_size, burst, refill))
+
+    def _acquire_fallback(
+        self, key: str, rate: float, burst: int, now: float
+    ) -> Tuple[bool, float, str]:
+        state: List[float] = self._fallback.get(key, MISSING)
+        if state is MISSING:
+            state = [float(burst), now]
+            self._fallback.set(key, state)
+        tokens = min(burst, state[0] + (now - state[1]) * rate)
+        state[1] = now
+        if tokens >= 1:
+            state[0] = tokens - 1
+            return True, 0.0, "fallback"
+        state[0] = tokens
+        return False, (1 - tokens) / rate, "fallback"
+
+    def clear_local(self) -> None:
+        """清空本地租约与退化令牌桶"""
+        self._leases.clear()
+        self._fallback.clear()
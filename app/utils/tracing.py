@@ -0,0 +1,231 @@
+import atexit
+import contextvars
+import json
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+
+from app.utils.config import get_settings
+from app.utils.logger import QueuedSink, get_logger
+from app.utils.metrics import REGISTRY
+
+logger = get_logger(__name__)
+
+tracing_cfg = get_settings().tracing
+
+TRACES_EXPORTED = REGISTRY.counter(
+    "traces_exported_total", "Exported traces by sampling reason", ["reason"]
+)
+
+
+class Span:
+    """一次操作的耗时记录"""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_time",
+        "duration",
+        "error",
+        "_start",
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        name: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes or {}
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """一个请求内收集的所有 span"""
+
+    __slots__ = ("trace_id", "sampled", "spans", "dropped")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < tracing_cfg.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+class RingBufferExporter:
+    """保存最近 N 条 trace 的内存环形缓冲"""
+
+    def __init__(self, maxlen: int = 200):
+        self._traces: deque = deque(maxlen=maxlen)
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        self._traces.append(trace)
+
+    def recent(self, limit: int = 20, min_duration_ms: float = 0) -> List[Dict]:
+        result = []
+        for trace in reversed(self._traces):
+            if trace["duration_ms"] >= min_duration_ms:
+                result.append(trace)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        for trace in reversed(self._traces):
+            if trace["trace_id"] == trace_id:
+                return trace
+        return None
+
+
+class NDJSONExporter:
+    """将 trace 以 NDJSON 形式追加写入本地文件（后台线程写入）"""
+
+    def __init__(self, path: str):
+        self._sink = QueuedSink(open(path, "a", encoding="utf-8"))
+        # 退出时写出队列中剩余的 trace
+        atexit.register(self._sink.stop)
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        self._sink.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+
+
+ring_buffer = RingBufferExporter(tracing_cfg.buffer_size)
+exporters: List[Any] = [ring_buffer]
+if tracing_cfg.file:
+    exporters.append(NDJSONExporter(tracing_cfg.file))
+
+CURRENT_TRACE = contextvars.ContextVar("current_trace", default=None)
+CURRENT_SPAN = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    记录一个子 span，不在 trace 内时不做任何事
+
+    Args:
+        name: span 名称，如 mongo.find_one
+        **attributes: span 属性
+    """
+    trace: Optional[Trace] = CURRENT_TRACE.get()
+    if trace is None:
+        yield None
+        return
+
+    parent: Optional[Span] = CURRENT_SPAN.get()
+    current = Span(trace.trace_id, name, parent.span_id if parent else None, attributes)
+    token = CURRENT_SPAN.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = repr(e)
+        raise
+    finally:
+        current.finish()
+        CURRENT_SPAN.reset(token)
+        trace.add(current)
+
+
+@contextmanager
+def start_trace(
+    name: str, trace_id: str, **attributes: Any
+) -> Iterator[Optional[Span]]:
+    """
+    开始一个请求级 trace
+
+    按 sample_rate 做概率采样；未被采样的 trace 仍会记录 span，
+    请求结束时若耗时超过 slow_ms 则补采（尾部采样），否则直接丢弃。
+
+    Args:
+        name: 根 span 名称
+        trace_id: trace ID，使用请求 ID
+        **attributes: 根 span 属性
+    """
+    if not tracing_cfg.enabled:
+        yield None
+        return
+
+    trace = Trace(trace_id, sampled=random.random() < tracing_cfg.sample_rate)
+    trace_token = CURRENT_TRACE.set(trace)
+    try:
+        with span(name, **attributes) as root:
+            yield root
+    finally:
+        CURRENT_TRACE.reset(trace_token)
+        if trace.sampled:
+            _export(trace, root, "sampled")
+        elif root.duration * 1000 >= tracing_cfg.slow_ms:
+            _export(trace, root, "slow")
+
+
+def _export(trace: Trace, root: Span, reason: str) -> None:
+    payload = {
+        "trace_id": trace.trace_id,
+        "name": root.name,
+        "start_time": root.start_time,
+        "duration_ms": round(root.duration * 1000, 3),
+        "reason": reason,
+        "dropped_spans": trace.dropped,
+        # 按开始时间排序，便于阅读
+        "spans": [s.to_dict() for s in sorted(trace.spans, key=lambda s: s._start)],
+    }
+    TRACES_EXPORTED.labels(reason).inc()
+    for exporter in exporters:
+        try:
+            exporter.export(payload)
+        except Exception as e:
+            logger.error(f"Failed to export trace {trace.trace_id}: {e}")
+
+
+class TracedRoute(APIRoute):
+    """为路由处理函数记录 span 的 APIRoute"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        name = f"handler {','.join(sorted(self.methods or ()))} {self.path}"
+
+        async def traced_handler(request):
+            with span(name):
+                return await handler(request)
+
+        return traced_handler
@@ -0,0 +1,91 @@
+"""
+检查应用的导入耗时
+
+用法：
+    # 输出导入 app.main 最耗时的模块和各顶层包的耗时
+    python -m scripts.import_time
+
+    # 总耗时超过预算（毫秒，默认 STARTUP_IMPORT_BUDGET_MS）时以状态码 1 退出，可用于 CI
+    python -m scripts.import_time --budget 1500
+
+在子进程中以 python -X importtime 导入，结果不受当前进程已导入模块的影响。
+"""
+
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from app.utils.config import get_settings
+
+# (模块名, 自身耗时微秒, 累计耗时微秒)
+ImportRecord = Tuple[str, int, int]
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """解析 -X importtime 输出"""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            # 表头行
+            continue
+        records.append((parts[2].strip(), self_us, cumulative_us))
+    return records
+
+
+def package_totals(records: List[ImportRecord]) -> Dict[str, int]:
+    """按顶层包汇总自身耗时（微秒）"""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in records:
+        totals[name.split(".")[0]] += self_us
+    return dict(totals)
+
+
+def measure(module: str) -> List[ImportRecord]:
+    """在子进程中导入模块并返回各模块耗时"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure application import time")
+    parser.add_argument("--module", default="app.main", help="module to import")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=get_settings().startup.import_budget_ms,
+        help="fail if the import takes longer (ms)",
+    )
+    parser.add_argument("--top", type=int, default=15, help="rows to print")
+    args = parser.parse_args()
+
+    records = measure(args.module)
+    total_ms = sum(self_us for _, self_us, _ in records) / 1000
+
+    print("Slowest modules (cumulative ms):")
+    for name, _, cumulative_us in sorted(records, key=lambda r: -r[2])[: args.top]:
+        print(f"  {cumulative_us / 1000:9.1f}  {name}")
+    print("Packages (self ms):")
+    totals = sorted(package_totals(records).items(), key=lambda t: -t[1])
+    for name, self_us in totals[: args.top]:
+        print(f"  {self_us / 1000:9.1f}  {name}")
+    print(f"Total: {total_ms:.1f} ms (budget {args.budget:.0f} ms)")
+
+    return 1 if total_ms > args.budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
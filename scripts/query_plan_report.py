@@ -0,0 +1,78 @@
+"""
+查询计划报告
+
+用法：
+    # 开启查询计划检查运行测试，并输出报告
+    python -m scripts.query_plan_report --run-tests
+
+    # 读取已有的报告文件（MONGODB_EXPLAIN_REPORT 指定的路径）
+    python -m scripts.query_plan_report logs/query_plans.json
+
+存在 COLLSCAN 或内存 SORT 的查询时以状态码 1 退出，可用于 CI。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+DEFAULT_REPORT = os.path.join("logs", "query_plans.json")
+
+
+def run_tests(report_path: str, pytest_args: List[str]) -> int:
+    """在 warn 模式下运行测试，退出时由 QueryPlanGuard 写出报告"""
+    env = dict(os.environ)
+    env["MONGODB_EXPLAIN_MODE"] = "warn"
+    env["MONGODB_EXPLAIN_REPORT"] = os.path.abspath(report_path)
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    return subprocess.call([sys.executable, "-m", "pytest", *pytest_args], env=env)
+
+
+def format_entry(entry: Dict[str, Any]) -> str:
+    if entry.get("error"):
+        status = "ERROR"
+        plan = entry["error"]
+    else:
+        status = "FLAG " if entry["flagged"] else "OK   "
+        plan = " <- ".join(entry["stages"] or [])
+    sort = f" sort={entry['sort']}" if entry.get("sort") else ""
+    return (
+        f"{status} {entry['collection']}.{entry['operation']} x{entry['count']}\n"
+        f"      filter={json.dumps(entry['filter'], ensure_ascii=False)}{sort}\n"
+        f"      plan={plan}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List MongoDB query shapes and plans")
+    parser.add_argument("report", nargs="?", default=DEFAULT_REPORT)
+    parser.add_argument(
+        "--run-tests", action="store_true", help="run pytest with explain enabled"
+    )
+    parser.add_argument(
+        "--no-fail", action="store_true", help="exit 0 even if scans are found"
+    )
+    args, pytest_args = parser.parse_known_args()
+
+    if args.run_tests:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        run_tests(args.report, pytest_args)
+
+    if not os.path.exists(args.report):
+        print(f"Report not found: {args.report}", file=sys.stderr)
+        return 2
+    with open(args.report, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    for entry in entries:
+        print(format_entry(entry))
+    flagged = [entry for entry in entries if entry["flagged"]]
+    print(f"\n{len(entries)} query shapes, {len(flagged)} unindexed")
+    return 1 if flagged and not args.no_fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
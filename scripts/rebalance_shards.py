@@ -0,0 +1,92 @@
+"""
+在分片之间重新平衡数据
+
+增删分片（修改 SHARDING_SHARDS）后，部分文档按新的哈希环属于其他分片，需要移动。
+
+步骤：
+    1. 修改 SHARDING_SHARDS，同时设置 SHARDING_MIGRATING=true 并重启服务，
+       使带分片键的读写在迁移期间访问所有分片，跨分片查询按 _id 去重
+       （移动中的文档短暂同时存在于两个分片，计数可能偏大）
+    2. 统计需要移动的文档数：
+           python -m scripts.rebalance_shards --dry-run
+    3. 移动文档（可重复执行，中断后重跑即可）：
+           python -m scripts.rebalance_shards
+    4. 设置 SHARDING_MIGRATING=false 并重启服务
+
+移除分片时，从 SHARDING_SHARDS 中删除它，并用 --drain 名称=URI 指定该分片，
+其中的文档全部移到其余分片。服务在迁移完成前读不到该分片上的数据，应在低峰期执行。
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import List
+
+from app.infra.sharding import ShardRouter, parse_shards
+from app.models.indexes import MODELS
+from app.utils.config import get_settings
+
+
+def build_router(drain: List[str]) -> ShardRouter:
+    """按当前配置创建路由；待清空的分片只作为数据来源，不在哈希环上"""
+    settings = get_settings()
+    cfg = settings.sharding
+    router = ShardRouter(
+        parse_shards(cfg.shards, settings.mongodb.database), vnodes=cfg.vnodes
+    )
+    for shard in parse_shards(";".join(drain), settings.mongodb.database):
+        if shard.name in router.shards:
+            raise ValueError(f"Shard to drain is still configured: {shard.name}")
+        router.shards[shard.name] = shard
+    return router
+
+
+async def run(args) -> int:
+    router = build_router(args.drain)
+    if router.ring is None:
+        print("Sharding is not configured (SHARDING_SHARDS is empty)")
+        return 1
+
+    models = [model for model in MODELS if model.shard_key]
+    if args.model:
+        models = [model for model in models if model.collection_name() == args.model]
+    total = 0
+    try:
+        for model in models:
+            moved = await router.rebalance(
+                model.collection_name(),
+                model.shard_key,
+                dry_run=args.dry_run,
+                batch_size=args.batch_size,
+            )
+            for (source, target), count in sorted(moved.items()):
+                print(f"{model.collection_name()}: {source} -> {target}: {count}")
+            total += sum(moved.values())
+    finally:
+        await router.close()
+
+    action = "to move" if args.dry_run else "moved"
+    print(f"\n{total} documents {action}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebalance sharded collections")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only count misplaced documents"
+    )
+    parser.add_argument("--model", help="only rebalance this collection")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--drain",
+        action="append",
+        default=[],
+        metavar="NAME=URI",
+        help="removed shard to move all documents out of (repeatable)",
+    )
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
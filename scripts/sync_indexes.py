@@ -0,0 +1,48 @@
+"""
+同步 MongoDB 索引
+
+用法：
+    # 创建模型中声明但数据库中缺失的索引
+    python -m scripts.sync_indexes
+
+    # 只检查不创建；存在缺失或不一致的索引时以状态码 1 退出，可用于 CI
+    python -m scripts.sync_indexes --check
+
+不会删除任何索引：定义不一致（changed）或未声明（extra）的索引只在输出中报告，
+需人工确认后处理。
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from app.models.indexes import DRIFT_STATUSES, sync_all_indexes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync declared MongoDB indexes")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="only compare, exit 1 if any index is missing or has drifted",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(sync_all_indexes(dry_run=args.check))
+    for entry in report:
+        detail = (
+            f" {json.dumps(entry['detail'], ensure_ascii=False, default=str)}"
+            if entry["detail"]
+            else ""
+        )
+        print(
+            f"{entry['status'].upper():8} {entry['collection']}.{entry['name']}{detail}"
+        )
+    drift = [entry for entry in report if entry["status"] in DRIFT_STATUSES]
+    print(f"\n{len(report)} indexes, {len(drift)} need attention")
+    return 1 if drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,22 @@ from app.main import app
 from app.models.person import Person
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark", action="store_true", help="运行标记为 benchmark 的基准测试"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """基准测试结果受机器负载影响，默认跳过"""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
     """创建事件循环"""
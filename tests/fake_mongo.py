@@ -0,0 +1,265 @@
+"""测试用的内存版 Motor 集合，只实现模型层用到的查询语法"""
+
+import copy
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from app.infra.mongo_instrument import InstrumentedCollection
+
+
+def _compare(op, actual, expected) -> bool:
+    if op == "$lt":
+        return actual is not None and actual < expected
+    if op == "$lte":
+        return actual is not None and actual <= expected
+    if op == "$gt":
+        return actual is not None and actual > expected
+    if op == "$gte":
+        return actual is not None and actual >= expected
+    if op == "$ne":
+        return actual != expected
+    if op == "$in":
+        if isinstance(actual, list):
+            return any(item in expected for item in actual)
+        return actual in expected
+    if op == "$exists":
+        return (actual is not None) == expected
+    if op == "$all":
+        return isinstance(actual, list) and all(item in actual for item in expected)
+    if op == "$not":
+        return not all(_compare(k, actual, v) for k, v in expected.items())
+    raise NotImplementedError(op)
+
+
+def _get(doc, key):
+    """按点号路径取值，支持数组下标（如 members.1）"""
+    value = doc
+    for part in key.split("."):
+        if isinstance(value, list) and part.isdigit():
+            value = value[int(part)] if int(part) < len(value) else None
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def matches(doc, filter) -> bool:
+    for key, condition in (filter or {}).items():
+        if key == "$and":
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+            continue
+        actual = _get(doc, key)
+        if (
+            isinstance(condition, dict)
+            and condition
+            and all(k.startswith("$") for k in condition)
+        ):
+            if not all(_compare(op, actual, v) for op, v in condition.items()):
+                return False
+        elif isinstance(actual, list) and not isinstance(condition, list):
+            if condition not in actual:
+                return False
+        elif actual != condition:
+            return False
+    return True
+
+
+def project(doc, projection):
+    if not projection:
+        return dict(doc)
+    included = {k for k, v in projection.items() if v}
+    if included:
+        return {k: v for k, v in doc.items() if k in included or k == "_id"}
+    return {k: v for k, v in doc.items() if k not in projection}
+
+
+class FakeCursor:
+    def __init__(self, docs, sort=None, batch_size=0):
+        self.docs = docs
+        self.sort_spec = sort
+        self.batch_size = batch_size
+        self.closed = False
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self.sort_spec = [(key, direction or 1)] if isinstance(key, str) else key
+        return self
+
+    def skip(self, n):
+        self._skip = n
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def _result(self):
+        docs = list(self.docs)
+        for key, direction in reversed(self.sort_spec or []):
+            docs.sort(key=lambda d: d.get(key), reverse=direction < 0)
+        docs = docs[self._skip :]
+        return docs[: self._limit] if self._limit else docs
+
+    async def to_list(self, length=None):
+        return self._result()
+
+    async def close(self):
+        self.closed = True
+
+    def __aiter__(self):
+        self._iter = iter(self._result())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeMongoCollection:
+    """内存集合，记录调用次数便于断言查询次数"""
+
+    def __init__(self, name="fake"):
+        self.name = name
+        self.docs = []
+        self.calls = []
+        # index_information() 的返回格式：名称 -> {"key": [(字段, 方向)], 选项...}
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    def with_options(self, **kwargs):
+        """与原集合共享数据和调用记录，调用记录中带上选项（如 read_preference）"""
+        self.calls.append(("with_options", kwargs))
+        return copy.copy(self)
+
+    def find(self, filter=None, projection=None, sort=None, batch_size=0, **kwargs):
+        self.calls.append(("find", filter))
+        self.last_cursor = FakeCursor(
+            [project(d, projection) for d in self.docs if matches(d, filter)],
+            sort=sort,
+            batch_size=batch_size,
+        )
+        return self.last_cursor
+
+    async def find_one(self, filter=None, projection=None, **kwargs):
+        self.calls.append(("find_one", filter))
+        for doc in self.docs:
+            if matches(doc, filter):
+                return project(doc, projection)
+        return None
+
+    async def count_documents(self, filter, **kwargs):
+        self.calls.append(("count_documents", filter))
+        return sum(1 for d in self.docs if matches(d, filter))
+
+    async def insert_one(self, doc, **kwargs):
+        self.calls.append(("insert_one", None))
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(dict(doc))
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs, ordered=True, **kwargs):
+        self.calls.append(("insert_many", None))
+        ids = []
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+            self.docs.append(dict(doc))
+            ids.append(doc["_id"])
+        return SimpleNamespace(inserted_ids=ids)
+
+    def _apply(self, doc, update) -> bool:
+        before = copy.deepcopy(doc)
+        for key, value in update.get("$set", {}).items():
+            doc[key] = value
+        for key, value in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + value
+        for key in update.get("$unset", {}):
+            doc.pop(key, None)
+        for key, value in update.get("$addToSet", {}).items():
+            items = doc.setdefault(key, [])
+            values = value["$each"] if isinstance(value, dict) else [value]
+            items.extend(v for v in values if v not in items)
+        for key, value in update.get("$pull", {}).items():
+            doc[key] = [item for item in doc.get(key, []) if item != value]
+        return doc != before
+
+    async def update_one(self, filter, update, **kwargs):
+        self.calls.append(("update_one", filter))
+        for doc in self.docs:
+            if matches(doc, filter):
+                modified = self._apply(doc, update)
+                return SimpleNamespace(matched_count=1, modified_count=int(modified))
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+    async def replace_one(self, filter, replacement, upsert=False, **kwargs):
+        self.calls.append(("replace_one", filter))
+        for i, doc in enumerate(self.docs):
+            if matches(doc, filter):
+                self.docs[i] = {"_id": doc["_id"], **replacement}
+                return SimpleNamespace(matched_count=1, modified_count=1)
+        if upsert:
+            self.docs.append({**filter, **replacement})
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+    async def update_many(self, filter, update, **kwargs):
+        self.calls.append(("update_many", filter))
+        matched = [doc for doc in self.docs if matches(doc, filter)]
+        modified = sum(self._apply(doc, update) for doc in matched)
+        return SimpleNamespace(matched_count=len(matched), modified_count=modified)
+
+    async def delete_one(self, filter, **kwargs):
+        self.calls.append(("delete_one", filter))
+        for i, doc in enumerate(self.docs):
+            if matches(doc, filter):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, filter, **kwargs):
+        self.calls.append(("delete_many", filter))
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if not matches(doc, filter)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def index_information(self):
+        self.calls.append(("index_information", None))
+        return copy.deepcopy(self.indexes)
+
+    async def create_indexes(self, indexes, **kwargs):
+        self.calls.append(("create_indexes", None))
+        names = []
+        for index in indexes:
+            spec = dict(index.document)
+            name = spec.pop("name")
+            spec["key"] = list(spec["key"].items())
+            self.indexes[name] = spec
+            names.append(name)
+        return names
+
+
+def fake_collection(monkeypatch, model, docs=()) -> FakeMongoCollection:
+    """
+    将模型的 collection() 替换为内存集合（外层仍包一层 InstrumentedCollection）
+
+    Args:
+        monkeypatch: pytest 的 monkeypatch
+        model: 模型类
+        docs: 集合中的初始文档
+
+    Returns:
+        FakeMongoCollection: 内存集合，可用于断言 docs 与 calls
+    """
+    collection = FakeMongoCollection(model.collection_name())
+    collection.docs.extend(docs)
+    monkeypatch.setattr(
+        model, "collection", classmethod(lambda cls: InstrumentedCollection(collection))
+    )
+    return collection
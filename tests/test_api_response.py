@@ -0,0 +1,158 @@
+import json
+import time
+
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI, Response
+
+from app.main import app
+from app.models.conversation import Conversation
+from app.models.message import Message
+from app.routers.conversation_router import MESSAGE_LIST_EXCLUDE
+from app.utils.api_response import ResponseModel, json_response
+
+
+def conversation_data(count: int = 100) -> dict:
+    """与 get_conversation 返回的 data 结构一致（未序列化的模型）"""
+    conversation = Conversation(id=str(ObjectId()), name="吃瓜群", members=["p1", "p2"])
+    messages = [
+        Message(
+            id=str(ObjectId()),
+            conversation_id=conversation.id,
+            sender_id="p1",
+            receiver_id="p2",
+            message_type="text",
+            content=f"第 {i} 条消息",
+        )
+        for i in range(count)
+    ]
+    return {"conversation": conversation, "messages": messages}
+
+
+def dumped(data: dict) -> dict:
+    """预先 model_dump 后交给 response_model 序列化的 data"""
+    return {
+        "conversation": data["conversation"].model_dump(by_alias=False),
+        "messages": [
+            message.model_dump(by_alias=False, exclude=MESSAGE_LIST_EXCLUDE)
+            for message in data["messages"]
+        ],
+    }
+
+
+def build_app(data: dict) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/legacy", response_model=ResponseModel)
+    async def legacy():
+        return ResponseModel(success=True, data=dumped(data), message="ok")
+
+    @bench_app.get("/fast", response_model=ResponseModel)
+    async def fast():
+        return json_response(
+            success=True,
+            data=data,
+            message="ok",
+            exclude={"messages": {"__all__": MESSAGE_LIST_EXCLUDE}},
+        )
+
+    @bench_app.get("/headers", response_model=ResponseModel)
+    async def headers(response: Response):
+        response.headers["X-Next-Cursor"] = "abc"
+        return json_response(success=True, data=[], response=response)
+
+    return bench_app
+
+
+async def test_fast_response_matches_response_model():
+    """测试输出与经 response_model 序列化的结果一致"""
+    transport = httpx.ASGITransport(app=build_app(conversation_data(3)))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        legacy = await c.get("/legacy")
+        fast = await c.get("/fast")
+
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == legacy.json()
+    assert fast.json()["data"]["messages"][0]["content"] == "第 0 条消息"
+
+
+def test_fast_response_encodes_object_id_and_sets():
+    """测试 ObjectId 转为字符串，set 转为数组"""
+    object_id = ObjectId()
+    response = json_response(success=True, data={"id": object_id, "tags": {"a"}})
+
+    assert json.loads(response.body) == {
+        "success": True,
+        "message": None,
+        "data": {"id": str(object_id), "tags": ["a"]},
+    }
+
+
+def test_fast_response_serializes_models():
+    """测试直接传入模型时按 exclude_unset、exclude 输出，与 model_dump 一致"""
+    message = Message(
+        conversation_id="c1",
+        sender_id="p1",
+        receiver_id="p2",
+        message_type="text",
+        metadata={"k": "v"},
+    )
+
+    unset = json.loads(json_response(True, data=[message], exclude_unset=True).body)
+    excluded = json.loads(
+        json_response(
+            True,
+            data={"messages": [message]},
+            exclude={"messages": {"__all__": {"metadata"}}},
+        ).body
+    )
+
+    assert unset["data"] == [
+        json.loads(message.model_dump_json(by_alias=False, exclude_unset=True))
+    ]
+    assert "created_at" not in unset["data"][0]
+    assert excluded["data"]["messages"] == [
+        json.loads(message.model_dump_json(by_alias=False, exclude={"metadata"}))
+    ]
+
+
+async def test_fast_response_keeps_injected_headers():
+    """测试保留路由注入的 Response 上设置的响应头"""
+    transport = httpx.ASGITransport(app=build_app({}))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        response = await c.get("/headers")
+
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.headers["content-length"] == str(len(response.content))
+
+
+def test_openapi_still_documents_envelope():
+    """测试 OpenAPI 文档中的响应结构仍为 ResponseModel"""
+    schema = app.openapi()
+    operation = schema["paths"]["/api/conversations/{conversation_id}"]["get"]
+    content = operation["responses"]["200"]["content"]["application/json"]
+
+    assert content["schema"] == {"$ref": "#/components/schemas/ResponseModel"}
+
+
+@pytest.mark.benchmark
+async def test_benchmark_get_conversation_payload():
+    """基准测试：比较 100 条消息的 get_conversation 响应经 response_model 与直接序列化的吞吐量"""
+    transport = httpx.ASGITransport(app=build_app(conversation_data(100)))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        rps = {}
+        for path in ("/legacy", "/fast"):
+            for _ in range(20):
+                await c.get(path)
+            requests = 300
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = await c.get(path)
+                assert response.status_code == 200
+            rps[path] = requests / (time.perf_counter() - start)
+
+    print(
+        f"\nget_conversation (100 messages): response_model {rps['/legacy']:.0f} req/s, "
+        f"json_response {rps['/fast']:.0f} req/s ({rps['/fast'] / rps['/legacy']:.2f}x)"
+    )
@@ -0,0 +1,146 @@
+import uuid
+
+import pytest
+
+from app.models import person as person_module
+from app.models.person import Person
+from app.utils import auth_cache as auth_cache_module
+from app.utils.auth_cache import AuthTokenCache
+from app.utils.ttl_cache import MISSING, TTLCache
+
+
+class FakeRedis:
+    """内存版 RedisSDK，仅实现认证缓存用到的方法"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False, xx=False):
+        self.data[key] = value
+
+    async def delete(self, key):
+        for k in [key] if isinstance(key, str) else key:
+            self.data.pop(k, None)
+
+
+def make_cache(**kwargs) -> AuthTokenCache:
+    return AuthTokenCache(
+        dumps=person_module.token_cache.dumps,
+        loads=Person.model_validate_json,
+        namespace=f"test-{uuid.uuid4().hex}",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+
+    async def get_shared_redis():
+        return redis
+
+    monkeypatch.setattr(auth_cache_module, "get_shared_redis", get_shared_redis)
+    return redis
+
+
+def test_ttl_cache_expire_and_evict(monkeypatch):
+    """测试 TTL 过期与 LRU 淘汰"""
+    now = [100.0]
+    monkeypatch.setattr("app.utils.ttl_cache.time.monotonic", lambda: now[0])
+
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # 淘汰最久未使用的 b
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+
+    now[0] += 11
+    assert cache.get("a") is MISSING
+
+
+@pytest.mark.asyncio
+async def test_auth_cache_local_and_redis_tiers(fake_redis: FakeRedis):
+    """测试进程内与 Redis 两级缓存命中"""
+    cache = make_cache()
+    person = Person(_id="p1", name="test_user", access_token="token-1")
+
+    assert await cache.get("token-1") == (False, None)
+    await cache.set("token-1", person.id, person)
+
+    hit, cached = await cache.get("token-1")
+    assert hit and cached is person
+
+    # 模拟另一个 worker：进程内缓存为空，从 Redis 读取
+    cache.clear_local()
+    hit, cached = await cache.get("token-1")
+    assert hit and cached.id == "p1" and cached.name == "test_user"
+    # Redis 中不保存明文 token（键和值中都没有）
+    assert not any("token-1" in key for key in fake_redis.data)
+    assert not any("token-1" in value for value in fake_redis.data.values())
+
+    assert cache.stats() == {
+        "local_hits": 1,
+        "redis_hits": 1,
+        "negative_hits": 0,
+        "misses": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_auth_cache_negative_and_invalidate(fake_redis: FakeRedis):
+    """测试负缓存与按用户失效"""
+    cache = make_cache()
+
+    await cache.set("bad-token", None, None)
+    assert await cache.get("bad-token") == (True, None)
+    assert cache.stats()["negative_hits"] == 1
+
+    person = Person(_id="p2", name="test_user", access_token="token-2")
+    await cache.set("token-2", person.id, person)
+    await cache.invalidate_person("p2")
+    assert await cache.get("token-2") == (False, None)
+    assert fake_redis.data == {cache._token_key("bad-token"): ""}
+
+
+@pytest.mark.asyncio
+async def test_auth_cache_without_redis(monkeypatch):
+    """测试 Redis 不可用时退化为进程内缓存"""
+
+    async def get_shared_redis():
+        return None
+
+    monkeypatch.setattr(auth_cache_module, "get_shared_redis", get_shared_redis)
+    cache = make_cache()
+    person = Person(_id="p3", name="test_user", access_token="token-3")
+
+    await cache.set("token-3", person.id, person)
+    assert await cache.get("token-3") == (True, person)
+    await cache.invalidate_token("token-3")
+    assert await cache.get("token-3") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_get_by_access_token_restores_token(fake_redis: FakeRedis, monkeypatch):
+    """测试从 Redis 读取的用户由查询用的 token 补回 access_token"""
+    cache = make_cache()
+    monkeypatch.setattr(person_module, "token_cache", cache)
+    lookups = []
+
+    async def get_by_single_field(field, value, **kwargs):
+        lookups.append(value)
+        return Person(_id="p4", name="test_user", access_token=value)
+
+    monkeypatch.setattr(Person, "get_by_single_field", get_by_single_field)
+
+    assert (await Person.get_by_access_token("token-4")).access_token == "token-4"
+    cache.clear_local()
+    person = await Person.get_by_access_token("token-4")
+
+    assert lookups == ["token-4"]
+    assert person.id == "p4" and person.access_token == "token-4"
+    assert not any("token-4" in value for value in fake_redis.data.values())
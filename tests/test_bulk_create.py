@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+from fake_mongo import FakeMongoCollection
+from pymongo.errors import BulkWriteError
+
+from app.models.message import Message
+
+
+class LatencyCollection(FakeMongoCollection):
+    """每次调用模拟一次网络往返；content 为 dup 的文档模拟唯一索引冲突"""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__("message")
+        self.latency = latency
+
+    async def insert_one(self, doc, **kwargs):
+        await asyncio.sleep(self.latency)
+        return await super().insert_one(doc, **kwargs)
+
+    async def insert_many(self, docs, ordered=True, **kwargs):
+        await asyncio.sleep(self.latency)
+        errors = [
+            {"index": i, "code": 11000, "errmsg": "E11000 duplicate key"}
+            for i, doc in enumerate(docs)
+            if doc["content"] == "dup"
+        ]
+        await super().insert_many(
+            [doc for doc in docs if doc["content"] != "dup"], ordered=ordered
+        )
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs)})
+
+
+def message(content: str) -> dict:
+    return {
+        "conversation_id": "c1",
+        "sender_id": "a",
+        "receiver_id": "b",
+        "message_type": "text",
+        "content": content,
+    }
+
+
+def use_collection(monkeypatch, collection):
+    monkeypatch.setattr(Message, "collection", classmethod(lambda cls: collection))
+
+
+async def test_create_many_reports_per_document_errors(monkeypatch):
+    """测试校验失败与写入失败的文档单独报告，不影响其他文档"""
+    collection = LatencyCollection()
+    use_collection(monkeypatch, collection)
+    items = [message(str(i)) for i in range(25)]
+    items[3] = {"content": "missing required fields"}
+    items[7] = message("dup")
+    items[20] = message("dup")
+
+    result = await Message.create_many(iter(items), chunk_size=10)
+
+    assert [error.index for error in result.errors] == [3, 7, 20]
+    assert "E11000" in result.errors[1].error
+    assert len(result.created) == 22
+    assert [call[0] for call in collection.calls] == ["insert_many"] * 3
+    stored = {str(doc["_id"]) for doc in collection.docs}
+    assert {m.id for m in result.created} == stored
+
+
+async def test_create_many_rejects_bad_chunk_size(monkeypatch):
+    use_collection(monkeypatch, LatencyCollection())
+    with pytest.raises(ValueError):
+        await Message.create_many([message("a")], chunk_size=0)
+
+
+async def test_benchmark_create_many_vs_create_loop(monkeypatch):
+    """基准测试：比较循环 create 与 create_many 插入 500 条消息的耗时"""
+    count = 500
+
+    collection = LatencyCollection(latency=0.001)
+    use_collection(monkeypatch, collection)
+    start = time.perf_counter()
+    for i in range(count):
+        await Message.create(**message(str(i)))
+    loop_time = time.perf_counter() - start
+
+    collection = LatencyCollection(latency=0.001)
+    use_collection(monkeypatch, collection)
+    start = time.perf_counter()
+    result = await Message.create_many(
+        (message(str(i)) for i in range(count)), chunk_size=100
+    )
+    bulk_time = time.perf_counter() - start
+
+    assert len(result.created) == count
+    print(
+        f"\ncreate x{count}: {loop_time * 1000:.1f}ms, "
+        f"create_many: {bulk_time * 1000:.1f}ms ({loop_time / bulk_time:.1f}x)"
+    )
+    assert bulk_time < loop_time
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.infra.mongo_instrument import InstrumentedCollection
+from app.main import app
+from app.utils import db_stats
+from app.utils.db_stats import filter_shape, reset_db_stats, start_db_stats
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(0.01)
+        return self.docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    """模拟 Motor 集合"""
+
+    name = "fake"
+
+    async def find_one(self, filter):
+        await asyncio.sleep(0.01)
+        return {"_id": 1}
+
+    async def count_documents(self, filter):
+        return 3
+
+    def find(self, filter=None):
+        return FakeCursor([{"_id": i} for i in range(3)])
+
+
+def test_filter_shape():
+    """测试慢查询日志中的查询结构"""
+    assert filter_shape(
+        {
+            "conversation_id": "abc",
+            "_id": {"$in": [1, 2, 3]},
+            "$or": [{"a": 1}, {"b": {"$gt": 2}}],
+        }
+    ) == {
+        "conversation_id": "?",
+        "_id": {"$in": ["?"]},
+        "$or": [{"a": "?"}, {"b": {"$gt": "?"}}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_instrumented_collection_records_stats():
+    """测试集合代理统计操作次数与耗时"""
+    collection = InstrumentedCollection(FakeCollection())
+    stats = start_db_stats()
+    try:
+        await collection.find_one({"a": 1})
+        await collection.count_documents({"a": 1})
+        docs = await collection.find({}).sort("_id", -1).limit(2).to_list(None)
+        assert len(docs) == 2
+        assert [doc async for doc in collection.find({})] == [
+            {"_id": 0},
+            {"_id": 1},
+            {"_id": 2},
+        ]
+    finally:
+        reset_db_stats()
+
+    assert stats.count == 4
+    assert stats.time >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log(monkeypatch):
+    """测试超过阈值时输出慢查询日志"""
+    messages = []
+    monkeypatch.setattr(db_stats, "SLOW_QUERY_THRESHOLD", 0.005)
+    monkeypatch.setattr(db_stats.logger, "warning", messages.append)
+
+    await InstrumentedCollection(FakeCollection()).find_one({"token": "secret"})
+
+    assert len(messages) == 1
+    assert "fake.find_one" in messages[0]
+    assert "{'token': '?'}" in messages[0]
+
+
+def test_db_headers():
+    """测试响应头中的数据库统计"""
+    response = TestClient(app).get("/")
+    assert response.headers["X-DB-Count"] == "0"
+    assert response.headers["X-DB-Time"] == "0.00ms"
@@ -0,0 +1,54 @@
+import pytest
+from fake_mongo import FakeMongoCollection, fake_collection
+from pymongo import IndexModel
+
+from app.models.message import Message
+
+
+@pytest.fixture
+def messages(monkeypatch) -> FakeMongoCollection:
+    return fake_collection(monkeypatch, Message)
+
+
+def statuses(report):
+    return {entry["name"]: entry["status"] for entry in report}
+
+
+async def test_sync_creates_missing_indexes(messages):
+    """测试缺失的索引被创建，再次执行时全部为 ok"""
+    report = await Message.sync_indexes()
+
+    declared = [index.document["name"] for index in Message.indexes]
+    assert statuses(report) == {name: "created" for name in declared}
+    partial = messages.indexes["conversation_id_1__id_-1"]
+    assert partial["partialFilterExpression"] == {"is_deleted": False}
+
+    report = await Message.sync_indexes()
+    assert set(statuses(report).values()) == {"ok"}
+
+
+async def test_sync_dry_run_does_not_create(messages):
+    """测试 dry_run 只报告缺失的索引"""
+    report = await Message.sync_indexes(dry_run=True)
+
+    assert set(statuses(report).values()) == {"missing"}
+    assert list(messages.indexes) == ["_id_"]
+
+
+async def test_sync_reports_drift_without_dropping(messages):
+    """测试定义不一致和未声明的索引只报告，不删除不修改"""
+    await messages.create_indexes(
+        [IndexModel("created_at", unique=True), IndexModel("legacy_field")]
+    )
+
+    report = await Message.sync_indexes()
+    by_name = {entry["name"]: entry for entry in report}
+
+    assert by_name["created_at_1"]["status"] == "changed"
+    assert by_name["created_at_1"]["detail"]["unique"] == {
+        "declared": None,
+        "current": True,
+    }
+    assert by_name["legacy_field_1"]["status"] == "extra"
+    assert messages.indexes["created_at_1"]["unique"] is True
+    assert "legacy_field_1" in messages.indexes
@@ -0,0 +1,55 @@
+import pytest
+from bson import ObjectId
+from fake_mongo import FakeMongoCollection, fake_collection
+
+from app.models.memory import Memory
+
+
+@pytest.fixture
+def memories(monkeypatch) -> FakeMongoCollection:
+    return fake_collection(
+        monkeypatch,
+        Memory,
+        [
+            {
+                "_id": ObjectId(),
+                "owner_id": "o1" if i % 2 else "o2",
+                "creator_id": "c1",
+                "title": f"t{i}",
+                "content": "x" * 100,
+                "is_deleted": i == 9,
+            }
+            for i in range(10)
+        ],
+    )
+
+
+async def test_iter_streams_models(memories):
+    """测试按 _id 升序逐条返回模型，并把 batch_size 传给游标"""
+    titles = [m.title async for m in Memory.iter({"owner_id": "o2"}, batch_size=2)]
+
+    assert titles == ["t0", "t2", "t4", "t6", "t8"]
+    assert memories.last_cursor.batch_size == 2
+    assert memories.last_cursor.sort_spec == [("_id", 1)]
+    assert memories.last_cursor.closed
+
+
+async def test_iter_raw_and_projection(memories):
+    """测试返回原始文档与字段投影"""
+    docs = [doc async for doc in Memory.iter(raw=True, fields={"title"})]
+    assert len(docs) == 9
+    assert isinstance(docs[0]["_id"], ObjectId)
+    assert set(docs[0]) == {"_id", "title"}
+
+
+async def test_iter_early_exit_closes_cursor(memories):
+    """测试提前退出遍历时关闭游标"""
+    stream = Memory.iter(batch_size=3)
+    async for memory in stream:
+        break
+    await stream.aclose()
+    assert memories.last_cursor.closed
+
+    with pytest.raises(ValueError):
+        async for _ in Memory.iter(batch_size=0):
+            pass
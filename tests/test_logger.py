@@ -0,0 +1,56 @@
+import io
+import json
+
+from loguru import logger
+
+from app.utils.logger import LogSampler, QueuedSink
+from app.utils.request_id import reset_request_id, set_request_id
+
+
+def test_queued_sink_drops_when_full():
+    """测试队列满时丢弃日志而不是阻塞"""
+    stream = io.StringIO()
+    sink = QueuedSink(stream, maxsize=2, start=False)
+    handler_id = logger.add(sink.write, format="{message}")
+    try:
+        for i in range(5):
+            logger.info(f"record {i}")
+    finally:
+        logger.remove(handler_id)
+
+    assert sink.dropped == 3
+    sink.drain()
+    assert stream.getvalue() == "record 0\nrecord 1\n"
+
+
+def test_queued_sink_json_lines():
+    """测试后台线程输出 JSON 行"""
+    stream = io.StringIO()
+    sink = QueuedSink(stream, serialize=True)
+    handler_id = logger.add(sink.write, format="{message}")
+    set_request_id("req-1")
+    try:
+        logger.bind(name="test").warning("hello")
+    finally:
+        logger.remove(handler_id)
+        reset_request_id()
+    sink.stop()
+
+    record = json.loads(stream.getvalue())
+    assert record["level"] == "WARNING"
+    assert record["message"] == "hello"
+    assert record["request_id"] == "req-1"
+
+
+def test_log_sampler_rate_limit(monkeypatch):
+    """测试高频日志按调用点限流"""
+    now = [0.0]
+    monkeypatch.setattr("app.utils.logger.time.monotonic", lambda: now[0])
+
+    sampler = LogSampler(rate=2)
+    assert [sampler.allow("a") for _ in range(3)] == [True, True, False]
+    assert sampler.allow("b")
+
+    now[0] += 0.5
+    assert sampler.allow("a")
+    assert not sampler.allow("a")
@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.loop_monitor import LOOP_BLOCKED, LoopMonitor
+
+
+def blocking_call(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_measures_lag():
+    """测试空闲时持续测量循环延迟"""
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    assert not monitor.running
+    assert 0 <= monitor.last_lag < 0.1
+    assert monitor._window_count > 0
+    assert not monitor.blocks
+
+
+@pytest.mark.asyncio
+async def test_detects_blocking_callback():
+    """测试检测阻塞事件循环的回调并记录其调用栈"""
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.05)
+    before = LOOP_BLOCKED.value
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        blocking_call(0.25)
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    assert LOOP_BLOCKED.value == before + 1
+    snapshot = monitor.snapshot()
+    assert snapshot["max_lag_ms"] >= 150
+    block = snapshot["recent_blocks"][0]
+    assert block["duration_ms"] >= 150
+    assert "blocking_call" in block["stack"]
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fake_mongo import fake_collection
+from fastapi import HTTPException
+
+from app.models.conversation import Conversation
+from app.models.person import Person
+from app.routers.conversation_router import (
+    UpdateMembersPayload,
+    add_conversation_member,
+    remove_conversation_member,
+)
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    monkeypatch.setattr(Conversation, "cached", False)
+    conversations = fake_collection(monkeypatch, Conversation)
+    persons = fake_collection(monkeypatch, Person)
+    return conversations, persons
+
+
+def add_conversation(conversations, members, **fields) -> str:
+    id = ObjectId()
+    conversations.docs.append(
+        {"_id": id, "name": "c", "members": list(members), "is_deleted": False} | fields
+    )
+    return str(id)
+
+
+def add_persons(persons, count):
+    ids = [ObjectId() for _ in range(count)]
+    persons.docs.extend({"_id": id, "is_deleted": False} for id in ids)
+    return [str(id) for id in ids]
+
+
+async def test_add_members_is_one_write(collections):
+    """测试添加成员只需一次写入，重复添加不修改文档"""
+    conversations, _ = collections
+    id = add_conversation(conversations, ["a"])
+
+    assert await Conversation.add_members(id, ["b", "c", "b"])
+    assert conversations.calls == [("update_one", conversations.calls[0][1])]
+    assert conversations.docs[0]["members"] == ["a", "b", "c"]
+
+    assert not await Conversation.add_members(id, ["a", "c"])
+    assert not await Conversation.add_members(str(ObjectId()), ["a"])
+    assert not await Conversation.add_members("invalid", ["a"])
+    assert [op for op, _ in conversations.calls] == ["update_one"] * 3
+
+
+async def test_concurrent_adds_do_not_lose_members(collections):
+    """测试并发添加的成员都被保留"""
+    conversations, _ = collections
+    id = add_conversation(conversations, ["a"])
+
+    await asyncio.gather(*(Conversation.add_members(id, [f"m{i}"]) for i in range(10)))
+
+    assert sorted(conversations.docs[0]["members"]) == sorted(
+        ["a"] + [f"m{i}" for i in range(10)]
+    )
+
+
+async def test_remove_member_guards(collections):
+    """测试移除成员的条件：在会话中、不是最后一个成员、会话未删除"""
+    conversations, _ = collections
+    id = add_conversation(conversations, ["a", "b"])
+    deleted = add_conversation(conversations, ["a", "b"], is_deleted=True)
+
+    assert not await Conversation.remove_member(id, "x")
+    assert await Conversation.remove_member(id, "a")
+    assert conversations.docs[0]["members"] == ["b"]
+    assert not await Conversation.remove_member(id, "b")
+    assert conversations.docs[0]["members"] == ["b"]
+    assert not await Conversation.remove_member(deleted, "a")
+
+
+async def test_add_member_route(collections):
+    """测试添加成员接口：成员存在性一次批量查询，成功时不读取会话"""
+    conversations, persons = collections
+    a, b, c = add_persons(persons, 3)
+    id = add_conversation(conversations, [a])
+
+    await add_conversation_member(id, UpdateMembersPayload(member_ids=[b, c]))
+
+    assert conversations.docs[0]["members"] == [a, b, c]
+    assert [op for op, _ in persons.calls] == ["find"]
+    assert [op for op, _ in conversations.calls] == ["update_one"]
+
+    # 已是成员：写入未生效后读取会话确认存在，仍返回成功
+    response = await add_conversation_member(id, UpdateMembersPayload(member_id=b))
+    assert response.status_code == 200
+
+    with pytest.raises(HTTPException) as exc:
+        await add_conversation_member(id, UpdateMembersPayload(member_id="missing"))
+    assert exc.value.status_code == 404
+
+    with pytest.raises(HTTPException) as exc:
+        await add_conversation_member(
+            str(ObjectId()), UpdateMembersPayload(member_id=a)
+        )
+    assert exc.value.detail == "Conversation not found"
+
+
+async def test_remove_member_route(collections):
+    """测试移除成员接口的错误原因"""
+    conversations, _ = collections
+    id = add_conversation(conversations, ["a", "b"])
+
+    await remove_conversation_member(id, "a")
+    assert [op for op, _ in conversations.calls] == ["update_one"]
+
+    with pytest.raises(HTTPException) as exc:
+        await remove_conversation_member(id, "a")
+    assert exc.value.detail == "Member not in conversation"
+
+    with pytest.raises(HTTPException) as exc:
+        await remove_conversation_member(id, "b")
+    assert exc.value.detail == "Cannot remove last member"
+
+    with pytest.raises(HTTPException) as exc:
+        await remove_conversation_member(str(ObjectId()), "a")
+    assert exc.value.detail == "Conversation not found"
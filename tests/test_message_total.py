@@ -0,0 +1,152 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from fake_mongo import fake_collection
+
+from app.models import message as message_module
+from app.models.conversation import Conversation
+from app.models.message import Message
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    message_module._total_cache.clear()
+    conversations = fake_collection(monkeypatch, Conversation)
+    messages = fake_collection(monkeypatch, Message)
+    return conversations, messages
+
+
+def message_data(conversation_id: str) -> dict:
+    return {
+        "conversation_id": conversation_id,
+        "sender_id": "p1",
+        "receiver_id": "p2",
+        "message_type": "text",
+        "content": "hi",
+    }
+
+
+async def get_count(conversation_id: str) -> int:
+    conversation = await Conversation.get_by_id(
+        conversation_id, fields={"message_count"}
+    )
+    return conversation.message_count
+
+
+async def test_counter_follows_create_and_soft_delete(collections):
+    """测试创建、批量创建和软删除消息时维护会话计数器"""
+    conversation = await Conversation.create(name="c", members=["p1", "p2"])
+    other = await Conversation.create(name="d", members=["p1", "p2"])
+    assert conversation.message_count == 0
+
+    first = await Message.create(**message_data(conversation.id))
+    await Message.create_many(
+        [message_data(conversation.id)] * 3 + [message_data(other.id)]
+    )
+    assert await get_count(conversation.id) == 4
+    assert await get_count(other.id) == 1
+
+    assert await Message.delete_by_id(first.id)
+    assert not await Message.delete_by_id(first.id)
+    assert await get_count(conversation.id) == 3
+
+
+async def test_count_total_uses_counter(collections):
+    """测试只按会话过滤时直接使用计数器，不执行 count_documents"""
+    conversations, messages = collections
+    conversation = await Conversation.create(name="c", members=["p1"])
+    for _ in range(2):
+        await Message.create(**message_data(conversation.id))
+    conversation = await Conversation.get_by_id(
+        conversation.id, fields={"message_count"}
+    )
+    messages.calls.clear()
+
+    total = await Message.count_total(
+        conversation, {"conversation_id": conversation.id, "is_deleted": False}
+    )
+
+    assert total == (2, True)
+    assert messages.calls == []
+
+
+async def test_count_total_backfills_legacy_conversation(collections):
+    """测试计数器上线前的会话精确计数一次并回填"""
+    conversations, messages = collections
+    conversation_id = ObjectId()
+    conversations.docs.append(
+        {"_id": conversation_id, "name": "old", "members": [], "is_deleted": False}
+    )
+    for _ in range(3):
+        messages.docs.append(
+            {
+                **message_data(str(conversation_id)),
+                "_id": ObjectId(),
+                "is_deleted": False,
+            }
+        )
+    conversation = await Conversation.get_by_id(
+        str(conversation_id), fields={"message_count"}
+    )
+    assert conversation.message_count is None
+
+    total = await Message.count_total(
+        conversation, {"conversation_id": str(conversation_id), "is_deleted": False}
+    )
+
+    assert total == (3, True)
+    assert await get_count(str(conversation_id)) == 3
+
+
+async def test_backfill_skipped_when_message_created_during_count(collections):
+    """测试精确计数与回填之间有消息创建时不回填，下次精确计数再回填"""
+    conversations, messages = collections
+    conversation_id = ObjectId()
+    conversations.docs.append(
+        {"_id": conversation_id, "name": "old", "members": [], "is_deleted": False}
+    )
+    messages.docs.append(
+        {**message_data(str(conversation_id)), "_id": ObjectId(), "is_deleted": False}
+    )
+    conversation = await Conversation.get_by_id(
+        str(conversation_id), fields={"message_count"}
+    )
+    filter_dict = {"conversation_id": str(conversation_id), "is_deleted": False}
+    count_documents = messages.count_documents
+
+    async def count_then_insert(filter, **kwargs):
+        # 计数完成后、回填写入前，另一个请求创建了消息
+        total = await count_documents(filter, **kwargs)
+        await Message.create(**message_data(str(conversation_id)))
+        return total
+
+    messages.count_documents = count_then_insert
+    assert await Message.count_total(conversation, filter_dict) == (1, True)
+    assert await get_count(str(conversation_id)) is None
+
+    messages.count_documents = count_documents
+    message_module._total_cache.clear()
+    assert await Message.count_total(conversation, filter_dict) == (2, True)
+    assert await get_count(str(conversation_id)) == 2
+    assert "message_count_pending" not in conversations.docs[0]
+
+    await Message.create(**message_data(str(conversation_id)))
+    assert await get_count(str(conversation_id)) == 3
+
+
+async def test_count_total_caches_filtered_counts(collections):
+    """测试带时间范围的总数在缓存期内返回估算值"""
+    conversations, messages = collections
+    conversation = await Conversation.create(name="c", members=["p1"])
+    await Message.create(**message_data(conversation.id))
+    filter_dict = {
+        "conversation_id": conversation.id,
+        "is_deleted": False,
+        "created_at": {"$gt": datetime(2000, 1, 1, tzinfo=timezone.utc)},
+    }
+
+    assert await Message.count_total(conversation, filter_dict) == (1, True)
+    await Message.create(**message_data(conversation.id))
+    assert await Message.count_total(conversation, filter_dict) == (1, False)
+    assert [c[0] for c in messages.calls].count("count_documents") == 1
@@ -0,0 +1,57 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.middlewares.request_timer import RequestTimerMiddleware
+from app.utils.metrics import MetricsRegistry
+
+
+def test_registry_render():
+    """测试文本暴露格式输出"""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs", ["kind"])
+    counter.labels("a").inc()
+    counter.labels("a").inc(2)
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+
+def test_route_template_labels():
+    """测试按路由模板（而非原始路径）记录延迟"""
+    metrics_app = FastAPI()
+
+    @metrics_app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        return {"id": item_id}
+
+    metrics_app.add_middleware(RequestTimerMiddleware)
+    client = TestClient(metrics_app)
+    client.get("/items/1")
+    client.get("/items/2")
+
+    text = TestClient(app).get("/metrics").text
+    assert (
+        'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2'
+        in text
+    )
+    assert 'route="/items/1"' not in text
+    assert "http_requests_in_flight" in text
+
+
+def test_metrics_endpoint_is_public():
+    """测试 /metrics 无需认证"""
+    client = TestClient(app)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
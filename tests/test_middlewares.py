@@ -0,0 +1,112 @@
+import time
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.main import app
+from app.middlewares.auth import PUBLIC_PATHS, AuthMiddleware
+from app.middlewares.request_id import RequestIDMiddleware
+from app.middlewares.request_timer import RequestTimerMiddleware
+from app.utils.request_id import reset_request_id, set_request_id
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """旧版基于 BaseHTTPMiddleware 的认证中间件（仅保留跳过逻辑，用于基准对比）"""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in PUBLIC_PATHS:
+            return await call_next(request)
+        raise HTTPException(status_code=401, detail="Missing access token")
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        set_request_id(request_id)
+        try:
+            response = await call_next(request)
+            response.headers["X-Request-ID"] = request_id
+            return response
+        finally:
+            reset_request_id()
+
+
+class LegacyRequestTimerMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
+        return response
+
+
+def build_app(auth, request_id, timer) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/")
+    def read_root():
+        return {"message": "Welcome to LingVerse!"}
+
+    bench_app.add_middleware(auth)
+    bench_app.add_middleware(request_id)
+    bench_app.add_middleware(timer)
+    return bench_app
+
+
+async def measure_rps(asgi_app: FastAPI, requests: int = 500) -> float:
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        # 预热
+        for _ in range(20):
+            await c.get("/")
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await c.get("/")
+            assert response.status_code == 200
+        return requests / (time.perf_counter() - start)
+
+
+def test_request_id_and_process_time_headers():
+    """测试请求ID与处理耗时响应头"""
+    client = TestClient(app)
+    response = client.get("/", headers={"X-Request-ID": "test-request-id"})
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "test-request-id"
+    assert response.headers["X-Process-Time"].endswith("ms")
+
+    response = client.get("/")
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+def test_missing_token_returns_json_error():
+    """测试缺少 token 时返回 JSON 错误"""
+    client = TestClient(app)
+    response = client.get("/api/llms")
+    assert response.status_code == 401
+    assert response.json() == {
+        "success": False,
+        "message": "Missing access token",
+        "data": None,
+    }
+    assert "X-Request-ID" in response.headers
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_benchmark_pure_asgi_vs_base_http_middleware():
+    """基准测试：比较新旧中间件栈在 GET / 上的吞吐量"""
+    legacy = build_app(
+        LegacyAuthMiddleware, LegacyRequestIDMiddleware, LegacyRequestTimerMiddleware
+    )
+    pure = build_app(AuthMiddleware, RequestIDMiddleware, RequestTimerMiddleware)
+
+    legacy_rps = await measure_rps(legacy)
+    pure_rps = await measure_rps(pure)
+    print(
+        f"\nBaseHTTPMiddleware: {legacy_rps:.0f} req/s, "
+        f"pure ASGI: {pure_rps:.0f} req/s ({pure_rps / legacy_rps:.2f}x)"
+    )
@@ -0,0 +1,147 @@
+import pytest
+from bson import ObjectId
+from fake_mongo import FakeMongoCollection, fake_collection
+
+from app.models.conversation import Conversation
+from app.models.person import Person
+from app.utils import model_cache as model_cache_module
+from app.utils.model_cache import model_cache
+
+
+class FakeRedis:
+    """内存版 RedisSDK，仅实现模型缓存用到的方法"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None, nx=False, xx=False):
+        self._check()
+        self.data[key] = value
+        self.expires[key] = ex
+
+    async def incr(self, key, ex=None):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        self.expires[key] = ex
+        return int(self.data[key])
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+
+    async def get_shared_redis():
+        return redis
+
+    monkeypatch.setattr(model_cache_module, "get_shared_redis", get_shared_redis)
+    monkeypatch.setattr(model_cache, "namespace", f"test-{ObjectId()}")
+    return redis
+
+
+@pytest.fixture
+def conversations(monkeypatch) -> FakeMongoCollection:
+    return fake_collection(monkeypatch, Conversation)
+
+
+def find_ones(collection: FakeMongoCollection) -> int:
+    return sum(1 for call in collection.calls if call[0] == "find_one")
+
+
+def hits() -> int:
+    return model_cache.stats("conversation")["hits"]
+
+
+async def test_get_by_id_reads_through_cache(fake_redis, conversations):
+    """测试第二次读取命中缓存，投影在缓存的完整文档上应用"""
+    conversation = await Conversation.create(name="c", members=["p1", "p2"])
+    before = hits()
+
+    first = await Conversation.get_by_id(conversation.id)
+    partial = await Conversation.get_by_id(conversation.id, fields={"members"})
+
+    assert first.name == "c"
+    assert partial.members == ["p1", "p2"]
+    assert partial.model_dump(exclude_unset=True) == {
+        "id": conversation.id,
+        "members": ["p1", "p2"],
+    }
+    assert find_ones(conversations) == 1
+    assert hits() == before + 1
+
+
+async def test_writes_invalidate_by_version(fake_redis, conversations):
+    """测试 update_by_id/update_by_field/delete_by_id 后不再返回旧数据"""
+    conversation = await Conversation.create(name="c", members=["p1"])
+    await Conversation.get_by_id(conversation.id)
+
+    await Conversation.update_by_id(conversation.id, {"name": "renamed"})
+    assert (await Conversation.get_by_id(conversation.id)).name == "renamed"
+
+    await Conversation.update_by_field({"name": "renamed"}, {"name": "again"})
+    assert (await Conversation.get_by_id(conversation.id)).name == "again"
+
+    await Conversation.incr_message_count(conversation.id, 1)
+    assert (await Conversation.get_by_id(conversation.id)).message_count == 1
+
+    assert await Conversation.delete_by_id(conversation.id)
+    assert await Conversation.get_by_id(conversation.id) is None
+    assert model_cache.stats("conversation")["stale"] >= 4
+    version_key = model_cache._version_key("conversation", conversation.id)
+    assert fake_redis.expires[version_key] == 2 * model_cache.ttl
+
+
+async def test_concurrent_update_does_not_cache_old_data(fake_redis, conversations):
+    """测试读库与写回缓存之间发生修改时，写回的旧数据不会被命中"""
+    conversation = await Conversation.create(name="old", members=["p1"])
+    doc, versions = await model_cache.get("conversation", conversation.id)
+    old_doc = await conversations.find_one({"_id": ObjectId(conversation.id)})
+
+    await Conversation.update_by_id(conversation.id, {"name": "new"})
+    await model_cache.set("conversation", conversation.id, old_doc, versions)
+
+    assert (await Conversation.get_by_id(conversation.id)).name == "new"
+
+
+async def test_falls_back_to_mongo_without_redis(fake_redis, conversations):
+    """测试 Redis 出错时直接读取数据库"""
+    conversation = await Conversation.create(name="c", members=["p1"])
+    fake_redis.fail = True
+    before = model_cache.stats("conversation")["bypass"]
+
+    for _ in range(2):
+        assert (await Conversation.get_by_id(conversation.id)).name == "c"
+    assert await Conversation.update_by_id(conversation.id, {"name": "d"})
+
+    assert find_ones(conversations) == 2
+    assert model_cache.stats("conversation")["bypass"] == before + 2
+
+
+async def test_cache_exclude_keeps_secrets_out_of_redis(fake_redis, monkeypatch):
+    """测试 cache_exclude 字段不写入缓存，需要这些字段时直接读取数据库"""
+    persons = fake_collection(monkeypatch, Person)
+    person = await Person.create(name="p", email="p@example.com")
+
+    for _ in range(2):
+        public = await Person.get_by_id(person.id, exclude_fields={"access_token"})
+        assert public.name == "p"
+        assert "access_token" not in public.model_dump(exclude_unset=True)
+    assert await Person.get_by_id(person.id, fields={"id"})
+    assert find_ones(persons) == 1
+    assert all(person.access_token not in value for value in fake_redis.data.values())
+
+    for _ in range(2):
+        full = await Person.get_by_id(person.id)
+        assert full.access_token == person.access_token
+    token = await Person.get_by_id(person.id, fields={"access_token"})
+    assert token.access_token == person.access_token
+    assert find_ones(persons) == 4
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.infra import mongo_db_sdk
+from app.infra.mongo_db_sdk import (
+    POOL_CONNECTIONS,
+    POOL_WAIT_SECONDS,
+    MongoDBSDK,
+    PoolMetricsListener,
+    client_options,
+)
+from app.utils.config import MongoDBSettings
+
+
+def test_client_options_from_settings(monkeypatch):
+    """测试连接池与压缩参数来自配置，未安装依赖的压缩算法被跳过"""
+    monkeypatch.setattr(
+        mongo_db_sdk.importlib.util,
+        "find_spec",
+        lambda name: None if name == "zstandard" else object(),
+    )
+    cfg = MongoDBSettings(
+        max_pool_size=50,
+        min_pool_size=5,
+        max_idle_time_ms=1000,
+        wait_queue_timeout_ms=200,
+        compressors="zstd, snappy",
+    )
+
+    options = client_options(cfg)
+
+    assert options["maxPoolSize"] == 50
+    assert options["minPoolSize"] == 5
+    assert options["maxIdleTimeMS"] == 1000
+    assert options["waitQueueTimeoutMS"] == 200
+    assert options["compressors"] == "snappy"
+    assert isinstance(options["event_listeners"][0], PoolMetricsListener)
+    assert "waitQueueTimeoutMS" not in client_options(MongoDBSettings())
+
+
+def test_pool_listener_records_wait_time():
+    """测试连接取出等待时间与连接数指标"""
+    listener = PoolMetricsListener()
+    before = POOL_WAIT_SECONDS.count
+    connections = POOL_CONNECTIONS.value
+
+    listener.connection_created(SimpleNamespace())
+    listener.connection_created(SimpleNamespace())
+    listener.connection_checked_out(SimpleNamespace(duration=0.02))
+    listener.connection_check_out_failed(
+        SimpleNamespace(duration=1.5, reason="timeout")
+    )
+    listener.connection_closed(SimpleNamespace())
+
+    assert POOL_WAIT_SECONDS.count == before + 2
+    assert POOL_CONNECTIONS.value == connections + 1
+
+
+class FakeDatabase:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+
+    async def command(self, name):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return {"ok": 1}
+
+
+class FakeClient:
+    def __init__(self, uri, **options):
+        self.options = options
+        self.database = FakeDatabase(delay=0.01)
+        self.closed = False
+
+    def __getitem__(self, name):
+        return self.database
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    monkeypatch.setattr("motor.motor_asyncio.AsyncIOMotorClient", FakeClient)
+    monkeypatch.setattr(MongoDBSDK, "client", None)
+    monkeypatch.setattr(MongoDBSDK, "db", None)
+    monkeypatch.setattr(MongoDBSDK, "cfg", MongoDBSettings(min_pool_size=4))
+    monkeypatch.setattr(MongoDBSDK, "_loop", None)
+    monkeypatch.setattr(MongoDBSDK, "_clients", {})
+    yield
+    monkeypatch.setattr(MongoDBSDK, "client", None)
+    monkeypatch.setattr(MongoDBSDK, "db", None)
+
+
+async def test_connect_warms_up_min_pool_and_close(fake_client):
+    """测试启动时并发 ping 预热 min_pool_size 个连接，关闭后重置客户端"""
+    await MongoDBSDK.connect()
+    client = MongoDBSDK.client
+
+    assert client.database.max_active == 4
+    assert client.options["minPoolSize"] == 4
+
+    await MongoDBSDK.close()
+    assert client.closed
+    assert MongoDBSDK.db is None
+
+
+async def test_client_per_event_loop(fake_client):
+    """测试在另一个事件循环（如 TestClient 的线程）中使用单独的客户端，关闭时全部关闭"""
+    MongoDBSDK.get_db()
+    client = MongoDBSDK.client
+    other = []
+
+    async def use_db():
+        MongoDBSDK.get_db()
+        other.append(MongoDBSDK.client)
+
+    thread = threading.Thread(target=asyncio.run, args=(use_db(),))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not client
+    MongoDBSDK.get_db()
+    assert MongoDBSDK.client is client
+
+    await MongoDBSDK.close()
+    assert client.closed and other[0].closed
+    assert not MongoDBSDK._clients
+
+
+async def test_connect_does_not_block_startup_on_failure(fake_client):
+    """测试预热超时只记录错误"""
+    MongoDBSDK.cfg = MongoDBSettings(min_pool_size=1, warmup_timeout=0.001)
+    MongoDBSDK.get_db().delay = 1
+
+    await MongoDBSDK.connect()
+    assert MongoDBSDK.client is not None
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fake_mongo import FakeMongoCollection, fake_collection
+
+from app.models.message import Message
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def messages(monkeypatch) -> FakeMongoCollection:
+    start = datetime(2024, 1, 1)
+    return fake_collection(
+        monkeypatch,
+        Message,
+        [
+            {
+                "_id": ObjectId(),
+                "conversation_id": "c1",
+                "sender_id": "a",
+                "receiver_id": "b",
+                "message_type": "text",
+                "content": str(i),
+                # 每两条消息时间相同，用于验证 _id 兜底排序
+                "created_at": start + timedelta(minutes=i // 2),
+                "updated_at": start,
+                "is_deleted": False,
+            }
+            for i in range(25)
+        ],
+    )
+
+
+def test_cursor_round_trip():
+    """测试游标编码与解码"""
+    oid = ObjectId()
+    created = datetime(2024, 1, 1, 12, 30)
+    cursor = encode_cursor("after", "created_at", created, oid)
+    assert decode_cursor(cursor, "created_at") == ("after", created, oid)
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "_id")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "_id")
+
+
+@pytest.mark.parametrize("sort_field", ["_id", "created_at"])
+async def test_list_page_walks_forward_and_back(messages, sort_field):
+    """测试按游标向后、向前翻页，且不使用 skip"""
+    pages = []
+    cursor = None
+    while True:
+        page = await Message.list_page(
+            {"conversation_id": "c1"}, limit=10, cursor=cursor, sort_field=sort_field
+        )
+        pages.append(page)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+
+    contents = [[m.content for m in page.items] for page in pages]
+    assert [len(items) for items in contents] == [10, 10, 5]
+    assert sum(contents, []) == [str(i) for i in range(24, -1, -1)]
+    assert pages[0].prev_cursor is None
+
+    # 从最后一页向前翻
+    previous = await Message.list_page(
+        {"conversation_id": "c1"},
+        limit=10,
+        cursor=pages[-1].prev_cursor,
+        sort_field=sort_field,
+    )
+    assert [m.content for m in previous.items] == contents[1]
+    assert previous.next_cursor and previous.prev_cursor
+
+    first = await Message.list_page(
+        {"conversation_id": "c1"},
+        limit=10,
+        cursor=previous.prev_cursor,
+        sort_field=sort_field,
+    )
+    assert [m.content for m in first.items] == contents[0]
+    assert first.prev_cursor is None
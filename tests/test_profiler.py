@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.profiler import ProfilerBusyError, profile
+
+
+def busy_handler(deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+async def slow_request():
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_profile_attributes_cpu_time():
+    """测试 CPU 时间归属到具体函数"""
+
+    async def burn():
+        await asyncio.sleep(0.05)
+        busy_handler(time.perf_counter() + 0.2)
+
+    task = asyncio.create_task(burn())
+    profiler = await profile(0.3, interval=0.005)
+    await task
+
+    assert profiler.sample_count > 0
+    output = profiler.collapsed()
+    assert "busy_handler (test_profiler.py" in output
+    assert "burn (test_profiler.py" in output
+    for line in output.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+
+@pytest.mark.asyncio
+async def test_profile_wall_mode_records_awaiting_tasks():
+    """测试 wall 模式记录挂起任务的 await 栈"""
+    task = asyncio.create_task(slow_request())
+    try:
+        profiler = await profile(0.05, interval=0.005, mode="wall")
+    finally:
+        task.cancel()
+
+    assert "<awaiting>;slow_request (test_profiler.py" in profiler.collapsed()
+
+
+@pytest.mark.asyncio
+async def test_only_one_session():
+    """测试同一时间只允许一个采样任务"""
+    first = asyncio.create_task(profile(0.1))
+    await asyncio.sleep(0.01)
+    with pytest.raises(ProfilerBusyError):
+        await profile(0.1)
+    await first
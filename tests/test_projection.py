@@ -0,0 +1,143 @@
+import time
+
+import pytest
+from bson import ObjectId
+from fake_mongo import FakeMongoCollection, fake_collection, project
+
+from app.models.message import Message
+from app.models.person import Person
+
+
+@pytest.fixture
+def persons(monkeypatch) -> FakeMongoCollection:
+    return fake_collection(
+        monkeypatch,
+        Person,
+        [
+            Person(name=f"p{i}", email=f"p{i}@example.com").model_dump(exclude={"id"})
+            | {"_id": ObjectId()}
+            for i in range(3)
+        ],
+    )
+
+
+def test_projection_spec():
+    """测试字段名转换为 Mongo 投影"""
+    assert Person._projection() is None
+    assert Person._projection(fields={"id", "name"}) == {"_id": 1, "name": 1}
+    assert Person._projection(exclude_fields={"access_token"}) == {"access_token": 0}
+    with pytest.raises(ValueError):
+        Person._projection(fields={"password"})
+    with pytest.raises(ValueError):
+        Person._projection(fields={"name"}, exclude_fields={"email"})
+
+
+async def test_partial_models_only_dump_loaded_fields(persons):
+    """测试部分模型只包含读取的字段"""
+    person_id = str(persons.docs[0]["_id"])
+
+    person = await Person.get_by_id(person_id, fields={"name"})
+    assert person.model_dump(by_alias=False, exclude_unset=True) == {
+        "id": person_id,
+        "name": "p0",
+    }
+
+    person = await Person.get_by_id(person_id, exclude_fields={"access_token"})
+    data = person.model_dump(by_alias=False, exclude_unset=True)
+    assert "access_token" not in data
+    assert data["email"] == "p0@example.com"
+
+    # 未指定投影时仍返回完整且经过校验的模型
+    person = await Person.get_by_id(person_id)
+    assert person.access_token == persons.docs[0]["access_token"]
+
+
+async def test_list_with_projection(persons):
+    """测试列表查询的字段投影"""
+    people = await Person.list(fields={"name"})
+    names = [p.model_dump(exclude_unset=True)["name"] for p in people]
+    assert names == ["p2", "p1", "p0"]
+
+    page = await Person.list_page(limit=2, exclude_fields={"access_token", "email"})
+    assert len(page.items) == 2 and page.next_cursor
+    for person in page.items:
+        assert {"access_token", "email"}.isdisjoint(
+            person.model_dump(exclude_unset=True)
+        )
+
+
+async def test_get_many_by_ids(persons):
+    """测试批量获取只发出一次查询，并明确返回缺失的ID"""
+    ids = [str(doc["_id"]) for doc in persons.docs]
+    missing = str(ObjectId())
+    persons.calls.clear()
+
+    result = await Person.get_many_by_ids([ids[2], missing, ids[0], "bad-id"])
+
+    assert list(result) == [ids[2], missing, ids[0], "bad-id"]
+    assert result[ids[2]].name == "p2"
+    assert result[ids[0]].name == "p0"
+    assert result[missing] is None and result["bad-id"] is None
+    assert [call[0] for call in persons.calls] == ["find"]
+
+
+@pytest.mark.parametrize(
+    "projection",
+    [{"_id": 1, "name": 1}, {"_id": 1, "created_at": 1}, {"access_token": 0}],
+)
+def test_partial_model_matches_model_construct(persons, projection):
+    """测试按投影缓存的构造结果与 model_construct 一致"""
+    doc = project(persons.docs[0], projection)
+    loaded = Person._partial_plan(projection).fields_set
+    expected = Person.model_construct(
+        _fields_set=set(loaded), **{**doc, "_id": str(doc["_id"])}
+    )
+
+    person = Person._from_doc(dict(doc), projection)
+
+    assert person.model_fields_set == expected.model_fields_set
+    assert person.model_dump(exclude_unset=True) == expected.model_dump(
+        exclude_unset=True
+    )
+    assert person.role == "human" and person.is_deleted is False
+    # 每个模型的 model_fields_set 相互独立
+    other = Person._from_doc(dict(doc), projection)
+    assert other.model_fields_set is not person.model_fields_set
+
+
+def test_partial_model_omits_unloaded_required_fields():
+    """测试未读取的必填字段与 model_construct 一样不设置"""
+    projection = {"_id": 1, "content": 1}
+    message = Message._from_doc({"_id": ObjectId(), "content": "hi"}, projection)
+
+    assert message.model_dump(exclude_unset=True)["content"] == "hi"
+    assert "conversation_id" not in message.__dict__
+    assert message.is_read is False
+
+
+@pytest.mark.benchmark
+def test_benchmark_partial_model_construction():
+    """基准测试：比较按投影缓存构造与 model_construct 构造 10000 个部分模型"""
+    projection = {"_id": 1, "name": 1}
+    docs = [{"_id": str(ObjectId()), "name": f"p{i}"} for i in range(10000)]
+    loaded = Person._partial_plan(projection).fields_set
+
+    def best(build) -> float:
+        times = []
+        for _ in range(3):
+            copies = [dict(doc) for doc in docs]
+            start = time.perf_counter()
+            for doc in copies:
+                build(doc)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    planned = best(lambda doc: Person._from_doc(doc, projection))
+    constructed = best(
+        lambda doc: Person.model_construct(_fields_set=set(loaded), **doc)
+    )
+    print(
+        f"\nPerson x10000 partial: cached plan {10000 / planned:.0f} docs/s, "
+        f"model_construct {10000 / constructed:.0f} docs/s "
+        f"({constructed / planned:.2f}x)"
+    )
@@ -0,0 +1,116 @@
+import pytest
+
+from app.infra.mongo_instrument import InstrumentedCollection
+from app.infra.query_plan import (
+    QueryPlanError,
+    QueryPlanGuard,
+    plan_stages,
+    query_plan_guard,
+    sort_shape,
+)
+
+INDEXED = {"_id", "conversation_id"}
+
+
+class FakeCursor:
+    def __init__(self, filter):
+        self.filter = filter
+        self.sort_spec = None
+
+    def sort(self, *args):
+        self.sort_spec = args
+        return self
+
+    async def to_list(self, length=None):
+        return []
+
+    async def explain(self):
+        if set(self.filter) - {"is_deleted"} <= INDEXED and self.filter:
+            plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+        else:
+            plan = {"stage": "COLLSCAN"}
+        if self.sort_spec and self.sort_spec[0][0][0] == "created_at":
+            plan = {"stage": "SORT", "inputStage": plan}
+        return {"queryPlanner": {"winningPlan": plan}}
+
+
+class FakeCollection:
+    """模拟 Motor 集合"""
+
+    name = "fake"
+
+    def __init__(self):
+        self.explained = 0
+
+    def find(self, filter=None):
+        self.explained += 1
+        return FakeCursor(filter or {})
+
+    async def find_one(self, filter):
+        return None
+
+
+def test_plan_helpers():
+    """测试执行计划解析"""
+    plan = {
+        "stage": "SORT",
+        "inputStage": {
+            "stage": "OR",
+            "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}],
+        },
+    }
+    assert plan_stages(plan) == ["SORT", "OR", "IXSCAN", "COLLSCAN"]
+    assert sort_shape(("_id", -1)) == [("_id", -1)]
+    assert sort_shape([("a", 1), ("b", -1)]) == [("a", 1), ("b", -1)]
+    assert sort_shape(None) is None
+
+
+@pytest.mark.asyncio
+async def test_guard_explains_each_shape_once():
+    """测试相同查询结构只 explain 一次，并标记全表扫描"""
+    guard = QueryPlanGuard(mode="warn")
+    collection = FakeCollection()
+
+    await guard.check(collection, "find_one", {"conversation_id": "a"})
+    await guard.check(collection, "find_one", {"conversation_id": "b"})
+    await guard.check(collection, "find_one", {"members": "x", "is_deleted": False})
+    await guard.check(
+        collection, "find", {"conversation_id": "a"}, sort=[("created_at", -1)]
+    )
+
+    assert collection.explained == 3
+    report = guard.report()
+    assert [e["flagged"] for e in report] == [["SORT"], ["COLLSCAN"], []]
+    assert report[1]["filter"] == {"members": "?", "is_deleted": "?"}
+    assert report[2]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_guard_raise_mode():
+    """测试 raise 模式下未命中索引的查询抛出异常"""
+    guard = QueryPlanGuard(mode="raise")
+    collection = FakeCollection()
+
+    await guard.check(collection, "find_one", {"_id": 1})
+    for _ in range(2):
+        with pytest.raises(QueryPlanError, match="COLLSCAN"):
+            await guard.check(collection, "update_one", {"owner_id": "x"})
+    assert collection.explained == 2
+
+
+@pytest.mark.asyncio
+async def test_instrumented_collection_checks_plans(monkeypatch, tmp_path):
+    """测试通过集合代理发出的查询会被检查，并可写出报告"""
+    monkeypatch.setattr(query_plan_guard, "mode", "warn")
+    monkeypatch.setattr(query_plan_guard, "entries", {})
+    collection = InstrumentedCollection(FakeCollection())
+
+    await collection.find_one({"owner_id": "x"})
+    await collection.find({"conversation_id": "a"}).sort("created_at", -1).to_list()
+
+    flagged = {e["operation"]: e["flagged"] for e in query_plan_guard.report()}
+    assert flagged == {"find_one": ["COLLSCAN"], "find": ["SORT"]}
+
+    path = tmp_path / "plans.json"
+    query_plan_guard.write_report(str(path))
+    assert "COLLSCAN" in path.read_text()
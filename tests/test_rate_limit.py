@@ -0,0 +1,146 @@
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middlewares.rate_limit import RATE_LIMIT_DECISIONS, RateLimitMiddleware
+from app.models.person import Person
+from app.utils import rate_limiter as rate_limiter_module
+from app.utils.rate_limiter import RateLimiter
+
+
+class FakeRedis:
+    """内存版 RedisSDK，用 Python 实现令牌桶脚本"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.calls = 0
+
+    async def eval(self, script, keys, args):
+        self.calls += 1
+        rate, burst, requested = args
+        now = time.monotonic()
+        tokens, ts = self.buckets.get(keys[0], (burst, now))
+        tokens = min(burst, tokens + (now - ts) * rate)
+        granted = min(requested, int(tokens))
+        tokens -= granted
+        self.buckets[keys[0]] = (tokens, now)
+        retry_after = (1 - tokens) / rate if granted == 0 else 0
+        return [granted, str(retry_after)]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+
+    async def get_shared_redis():
+        return redis
+
+    monkeypatch.setattr(rate_limiter_module, "get_shared_redis", get_shared_redis)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_local_lease_avoids_redis(fake_redis):
+    """测试预取的令牌在本地消费，拒绝结果在本地缓存"""
+    limiter = RateLimiter(namespace=f"test-{uuid.uuid4().hex}", lease_size=5)
+
+    results = [await limiter.acquire("p1:default", 5, 10) for _ in range(10)]
+    assert all(allowed for allowed, _, _ in results)
+    assert [source for _, _, source in results].count("redis") == 2
+    assert fake_redis.calls == 2
+
+    allowed, retry_after, source = await limiter.acquire("p1:default", 5, 10)
+    assert (allowed, source) == (False, "redis")
+    assert retry_after > 0
+
+    allowed, _, source = await limiter.acquire("p1:default", 5, 10)
+    assert (allowed, source) == (False, "local")
+    assert fake_redis.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_lease_limited_by_rate(fake_redis):
+    """测试低速率的键每次只预取 1 个令牌，其余 worker 仍可使用桶中的令牌"""
+    namespace = f"test-{uuid.uuid4().hex}"
+    workers = [RateLimiter(namespace=namespace, lease_size=5) for _ in range(3)]
+
+    results = [await worker.acquire("p1:default", 0.01, 3) for worker in workers]
+    assert [allowed for allowed, _, _ in results] == [True, True, True]
+    assert {source for _, _, source in results} == {"redis"}
+
+    allowed, _, _ = await workers[0].acquire("p1:default", 0.01, 3)
+    assert not allowed
+    assert fake_redis.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_fallback_without_redis(monkeypatch):
+    """测试 Redis 不可用时退化为进程内令牌桶"""
+
+    async def get_shared_redis():
+        return None
+
+    monkeypatch.setattr(rate_limiter_module, "get_shared_redis", get_shared_redis)
+    limiter = RateLimiter()
+
+    results = [await limiter.acquire("p1:default", 0.01, 3) for _ in range(4)]
+    assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+    assert {source for _, _, source in results} == {"fallback"}
+
+
+def build_app(limiter: RateLimiter) -> FastAPI:
+    limited_app = FastAPI()
+
+    @limited_app.get("/messages/{conversation_id}")
+    async def messages(conversation_id: str):
+        return {"ok": True}
+
+    @limited_app.get("/public")
+    async def public():
+        return {"ok": True}
+
+    limited_app.add_middleware(
+        RateLimitMiddleware,
+        limiter=limiter,
+        routes={"GET /messages/{conversation_id}": "0.01/2"},
+        rate=100,
+        burst=100,
+    )
+
+    async def fake_auth(scope, receive, send):
+        # 模拟 AuthMiddleware：带 Authorization 头的请求视为已登录
+        if scope["type"] == "http" and any(
+            k == b"authorization" for k, _ in scope["headers"]
+        ):
+            scope.setdefault("state", {})["person"] = Person(_id="p1", name="tester")
+        await app(scope, receive, send)
+
+    app = limited_app.build_middleware_stack()
+    return fake_auth
+
+
+def test_middleware_returns_429(fake_redis):
+    """测试超出额度返回 429 与 Retry-After，并按规则记录指标"""
+    limiter = RateLimiter(namespace=f"test-{uuid.uuid4().hex}", lease_size=1)
+    client = TestClient(build_app(limiter))
+    headers = {"Authorization": "token"}
+    rejected = RATE_LIMIT_DECISIONS.labels(
+        "GET /messages/{conversation_id}", "rejected", "redis"
+    )
+    before = rejected.value
+
+    assert client.get("/messages/a", headers=headers).status_code == 200
+    assert client.get("/messages/b", headers=headers).status_code == 200
+    response = client.get("/messages/a", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["success"] is False
+    assert rejected.value == before + 1
+
+    # 其他路由使用默认额度，未认证的请求不限流
+    assert client.get("/public", headers=headers).status_code == 200
+    for _ in range(5):
+        assert client.get("/messages/a").status_code == 200
@@ -0,0 +1,165 @@
+import pytest
+from bson import ObjectId
+from fake_mongo import FakeMongoCollection, fake_collection
+from pymongo.read_preferences import SecondaryPreferred
+
+from app.dependencies import database as database_module
+from app.infra import mongo_session
+from app.infra.mongo_session import (
+    causal_session,
+    current_read_preference,
+    read_from,
+    read_preference_for,
+)
+from app.models.conversation import Conversation
+from app.utils.config import MongoDBSettings
+
+
+@pytest.fixture
+def conversations(monkeypatch) -> FakeMongoCollection:
+    monkeypatch.setattr(Conversation, "cached", False)
+    return fake_collection(monkeypatch, Conversation)
+
+
+class FakeSession:
+    def __init__(self):
+        self.cluster_time = None
+        self.operation_time = None
+        self.advanced = []
+
+    def advance_cluster_time(self, cluster_time):
+        self.advanced.append(("cluster", cluster_time))
+        self.cluster_time = cluster_time
+
+    def advance_operation_time(self, operation_time):
+        self.advanced.append(("operation", operation_time))
+        self.operation_time = operation_time
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeClient:
+    def __init__(self):
+        self.sessions = []
+
+    async def start_session(self, causal_consistency=False):
+        assert causal_consistency
+        session = FakeSession()
+        self.sessions.append(session)
+        return session
+
+
+def test_read_preference_for():
+    """测试读偏好名称映射，带最大复制延迟；primary 不设置读偏好"""
+    preference = read_preference_for("secondaryPreferred")
+
+    assert isinstance(preference, SecondaryPreferred)
+    assert preference.max_staleness == 90
+    assert read_preference_for("primary") is None
+    with pytest.raises(ValueError):
+        read_preference_for("anywhere")
+
+
+async def test_reads_follow_context_writes_stay_on_primary(conversations):
+    """测试读偏好只作用于读操作，写操作始终使用主节点集合"""
+    id = ObjectId()
+    conversations.docs.append(
+        {"_id": id, "name": "c", "members": ["a"], "is_deleted": False}
+    )
+
+    await Conversation.list()
+    assert [op for op, _ in conversations.calls] == ["find"]
+
+    with read_from("secondaryPreferred"):
+        await Conversation.list()
+        await Conversation.get_by_id(str(id))
+        await Conversation.update_by_id(str(id), {"name": "d"})
+    assert current_read_preference() is None
+
+    ops = conversations.calls[1:]
+    assert ops[0] == (
+        "with_options",
+        {"read_preference": read_preference_for("secondaryPreferred")},
+    )
+    assert [op for op, _ in ops] == [
+        "with_options",
+        "find",
+        "with_options",
+        "find_one",
+        "update_one",
+    ]
+
+
+async def test_cached_reads_use_primary(conversations, monkeypatch):
+    """测试写回模型缓存的数据从主节点读取"""
+    monkeypatch.setattr(Conversation, "cached", True)
+    id = ObjectId()
+    conversations.docs.append({"_id": id, "name": "c", "is_deleted": False})
+
+    with read_from("secondary"):
+        assert await Conversation.get_by_id(str(id))
+
+    assert [op for op, _ in conversations.calls] == ["find_one"]
+
+
+async def test_causal_session_read_your_writes(conversations, monkeypatch):
+    """测试请求内操作使用会话，写入后同一用户的下一个请求从写入的时间点开始"""
+    monkeypatch.setattr(mongo_session, "_causal_times", mongo_session.TTLCache())
+    client = FakeClient()
+    seen = []
+    original = conversations.update_one
+
+    async def update_one(filter, update, **kwargs):
+        seen.append(kwargs.get("session"))
+        return await original(filter, update, **kwargs)
+
+    conversations.update_one = update_one
+    id = str(ObjectId())
+
+    async with causal_session(client, "user-1") as session:
+        await Conversation.update_by_id(id, {"name": "d"})
+        session.cluster_time, session.operation_time = "ct1", "op1"
+    assert seen == [session]
+
+    # 只有读取的请求不更新时间点
+    async with causal_session(client, "user-1") as session:
+        assert session.advanced == [("cluster", "ct1"), ("operation", "op1")]
+        session.cluster_time, session.operation_time = "ct2", "op2"
+        await Conversation.list()
+
+    async with causal_session(client, "user-1") as session:
+        assert session.advanced == [("cluster", "ct1"), ("operation", "op1")]
+
+    async with causal_session(client, "user-2") as session:
+        assert session.advanced == []
+
+    assert mongo_session.current_session() is None
+
+
+async def test_mongo_session_dependency(monkeypatch):
+    """测试只有启用读写分离时才为请求创建会话并设置读偏好"""
+    client = FakeClient()
+    monkeypatch.setattr(database_module.MongoDBSDK, "client", client)
+    monkeypatch.setattr(database_module.MongoDBSDK, "db", object())
+    monkeypatch.setattr(database_module.MongoDBSDK, "_loop", None)
+    monkeypatch.setattr(database_module.MongoDBSDK, "_clients", {})
+    settings = database_module.get_settings()
+    request = type("Request", (), {"state": type("State", (), {})()})()
+
+    monkeypatch.setattr(settings, "mongodb", MongoDBSettings())
+    async for _ in database_module.mongo_session(request):
+        await database_module.use_secondary_reads()
+        assert mongo_session.current_session() is None
+        assert current_read_preference() is None
+    assert client.sessions == []
+
+    monkeypatch.setattr(settings, "mongodb", MongoDBSettings(read_preference="nearest"))
+    async for _ in database_module.mongo_session(request):
+        await database_module.use_secondary_reads()
+        assert mongo_session.current_session() is client.sessions[0]
+        assert current_read_preference() == read_preference_for("nearest")
+    mongo_session.set_read_preference(None)
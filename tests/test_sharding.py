@@ -0,0 +1,285 @@
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from bson import ObjectId
+from fake_mongo import FakeMongoCollection, fake_collection
+
+from app.infra.mongo_session import read_from
+from app.infra.sharding import HashRing, ShardRouter, parse_shards
+from app.models import base as base_module
+from app.models.conversation import Conversation
+from app.models.message import Message
+
+
+def make_router(names, collections):
+    """分片数据保存在 collections[分片名] 中的路由"""
+    router = ShardRouter(
+        parse_shards(";".join(f"{n}=mongodb://{n}" for n in names), "db")
+    )
+    router.get_db = lambda name: {
+        "message": collections.setdefault(name, FakeMongoCollection(name))
+    }
+    return router
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    collections = {}
+    router = make_router(["s0", "s1", "s2"], collections)
+    monkeypatch.setattr(base_module, "shard_router", router)
+    fake_collection(monkeypatch, Conversation)
+    return router, collections
+
+
+def message(conversation_id, **fields):
+    return {
+        "conversation_id": conversation_id,
+        "sender_id": "a",
+        "receiver_id": "b",
+        "message_type": "text",
+        **fields,
+    }
+
+
+def reset_calls(collections):
+    for collection in collections.values():
+        collection.calls.clear()
+
+
+def touched(collections):
+    return sorted(name for name, c in collections.items() if c.calls)
+
+
+def test_hash_ring_moves_few_keys():
+    """测试键均匀分布，增加一个节点时只有约 1/N 的键改变归属"""
+    keys = [str(ObjectId()) for _ in range(4000)]
+    ring = HashRing(["s0", "s1", "s2"])
+    before = {key: ring.node_for(key) for key in keys}
+
+    counts = Counter(before.values())
+    assert min(counts.values()) > 4000 / 3 * 0.7
+
+    grown = HashRing(["s0", "s1", "s2", "s3"])
+    moved = [key for key in keys if grown.node_for(key) != before[key]]
+    assert 0.15 < len(moved) / len(keys) < 0.35
+    assert all(grown.node_for(key) == "s3" for key in moved)
+
+
+def test_parse_shards():
+    """测试分号分隔、多主机 URI 与默认数据库"""
+    shards = parse_shards(
+        "s0=mongodb://a:27017/msg; s1=mongodb://b1:27017,b2:27017", "lingverse"
+    )
+
+    assert [(s.name, s.database) for s in shards] == [
+        ("s0", "msg"),
+        ("s1", "lingverse"),
+    ]
+    assert parse_shards("", "lingverse") == []
+    with pytest.raises(ValueError):
+        parse_shards("s0=mongodb://a;s0=mongodb://b", "lingverse")
+    with pytest.raises(ValueError):
+        parse_shards("mongodb://a", "lingverse")
+
+
+async def test_writes_and_keyed_reads_hit_one_shard(shards):
+    """测试按分片键写入，带会话ID的查询、计数、批量更新只访问一个分片"""
+    router, collections = shards
+    conversation_id = str(ObjectId())
+    owner = router.shard_for(conversation_id)
+
+    created = await Message.create(**message(conversation_id))
+    result = await Message.create_many([message(conversation_id) for _ in range(3)])
+    assert len(result.created) == 3
+    assert len(collections[owner].docs) == 4
+
+    reset_calls(collections)
+    page = await Message.list_page(
+        filter_dict={"conversation_id": conversation_id}, limit=2
+    )
+    total = await Message.collection().count_documents(
+        {"conversation_id": conversation_id}
+    )
+    updated = await Message.collection().update_many(
+        {"conversation_id": conversation_id}, {"$set": {"is_read": True}}
+    )
+
+    assert len(page.items) == 2
+    assert total == 4
+    assert updated.modified_count == 4
+    assert touched(collections) == [owner]
+
+    # 按 ID 读取和删除不带分片键，访问所有分片
+    reset_calls(collections)
+    assert (await Message.get_by_id(created.id)).conversation_id == conversation_id
+    assert await Message.delete_by_id(created.id)
+    assert touched(collections) == ["s0", "s1", "s2"]
+
+
+async def test_sharded_reads_ignore_secondary_preference(shards):
+    """测试分片模型不按读偏好读从节点（因果一致会话不适用于分片客户端）"""
+    router, collections = shards
+    conversation_id = str(ObjectId())
+    await Message.create(**message(conversation_id))
+    reset_calls(collections)
+
+    with read_from("secondaryPreferred"):
+        page = await Message.list_page(filter_dict={"conversation_id": conversation_id})
+
+    assert len(page.items) == 1
+    calls = collections[router.shard_for(conversation_id)].calls
+    assert [op for op, _ in calls] == ["find"]
+
+
+async def test_scatter_gather_merges_sorted_results(shards):
+    """测试不带分片键的查询合并各分片结果并保持排序、skip、limit"""
+    router, collections = shards
+    ids = []
+    for i in range(12):
+        msg = await Message.create(**message(str(ObjectId()), content=str(i)))
+        ids.append(msg.id)
+    assert len({name for name, c in collections.items() if c.docs}) > 1
+
+    listed = await Message.list(skip=2, limit=5, fields={"content"})
+    assert [m.id for m in listed] == ids[::-1][2:7]
+
+    descending = await Message.list_page(limit=4, descending=True)
+    assert [m.id for m in descending.items] == ids[::-1][:4]
+
+    streamed = [m.id async for m in Message.iter(batch_size=3)]
+    assert streamed == ids
+
+    total = await Message.collection().count_documents({"is_deleted": False})
+    assert total == 12
+
+
+async def test_sorted_find_one_across_shards(shards):
+    """测试跨分片的 find_one 按 sort 返回全局第一条"""
+    router, collections = shards
+    ids = [(await Message.create(**message(str(ObjectId())))).id for _ in range(12)]
+
+    newest = await Message.collection().find_one(
+        {"is_deleted": False}, sort=[("_id", -1)]
+    )
+    oldest = await Message.collection().find_one(
+        {"is_deleted": False}, {"content": 1}, sort=[("_id", 1)]
+    )
+
+    assert str(newest["_id"]) == ids[-1]
+    assert str(oldest["_id"]) == ids[0]
+    assert "sender_id" not in oldest
+
+
+async def test_scatter_cursor_closes_shard_cursors_on_early_exit(shards):
+    """测试跨分片遍历提前退出后 close 结束归并并关闭各分片游标"""
+    router, collections = shards
+    for _ in range(12):
+        await Message.create(**message(str(ObjectId())))
+
+    cursor = Message.collection().find({"is_deleted": False}, sort=[("_id", 1)])
+    async for _ in cursor:
+        break
+    merge = cursor._iterator
+    assert not any(c.last_cursor.closed for c in collections.values())
+
+    await cursor.close()
+    assert merge.ag_frame is None
+    assert all(c.last_cursor.closed for c in collections.values())
+
+
+async def test_index_sync_on_all_shards(shards):
+    """测试索引在所有分片创建，只在部分分片存在的索引视为缺失"""
+    router, collections = shards
+    await Message.collection().count_documents({})
+
+    report = await Message.sync_indexes()
+
+    assert {entry["status"] for entry in report} == {"created"}
+    assert collections["s0"].indexes == collections["s2"].indexes
+    del collections["s1"].indexes["created_at_1"]
+    report = await Message.sync_indexes(dry_run=True)
+    statuses = {entry["name"]: entry["status"] for entry in report}
+    assert statuses["created_at_1"] == "missing"
+    assert statuses["updated_at_1"] == "ok"
+
+
+async def test_rebalance_moves_misplaced_documents(shards):
+    """测试增加分片后只移动改变归属的文档，重复执行不再移动"""
+    router, collections = shards
+    conversation_ids = [str(ObjectId()) for _ in range(60)]
+    for conversation_id in conversation_ids:
+        await Message.create(**message(conversation_id))
+
+    grown = make_router(["s0", "s1", "s2", "s3"], collections)
+    planned = await grown.rebalance("message", "conversation_id", dry_run=True)
+    assert planned and all(target == "s3" for _, target in planned)
+    assert not collections["s3"].docs
+
+    moved = await grown.rebalance("message", "conversation_id", batch_size=7)
+    assert moved == planned
+    assert await grown.rebalance("message", "conversation_id") == {}
+
+    for name, collection in collections.items():
+        for doc in collection.docs:
+            assert grown.shard_for(doc["conversation_id"]) == name
+    assert sum(len(c.docs) for c in collections.values()) == 60
+
+
+async def test_rebalance_keeps_updates_made_during_move(shards):
+    """测试移动期间源文档被修改时重新复制，目标分片残留的旧副本被覆盖"""
+    router, collections = shards
+    for _ in range(60):
+        await Message.create(**message(str(ObjectId())))
+    grown = make_router(["s0", "s1", "s2", "s3"], collections)
+    moving = [
+        (name, doc)
+        for name, collection in collections.items()
+        for doc in collection.docs
+        if grown.shard_for(doc["conversation_id"]) == "s3"
+    ]
+    (source, edited), (_, stale) = moving[:2]
+    target = grown.get_db("s3")["message"]
+    # 上次中断残留的旧副本
+    target.docs.append({**stale, "content": "stale"})
+    replace_one = target.replace_one
+
+    async def replace_then_edit(filter, replacement, **kwargs):
+        # 复制到目标分片之后、从源分片删除之前，另一个请求修改了源文档
+        result = await replace_one(filter, replacement, **kwargs)
+        if filter["_id"] == edited["_id"] and replacement.get("content") is None:
+            updated_at = replacement["updated_at"] + timedelta(seconds=1)
+            await collections[source].update_one(
+                {"_id": edited["_id"]},
+                {"$set": {"content": "edited", "updated_at": updated_at}},
+            )
+        return result
+
+    target.replace_one = replace_then_edit
+    await grown.rebalance("message", "conversation_id")
+
+    copies = {doc["_id"]: doc for doc in target.docs}
+    assert copies[edited["_id"]]["content"] == "edited"
+    assert copies[stale["_id"]].get("content") is None
+    assert len(copies) == len(target.docs) == len(moving)
+    assert sum(len(c.docs) for c in collections.values()) == 60
+
+
+async def test_scatter_reads_dedupe_moving_documents_while_migrating(shards):
+    """测试迁移期间移动中的文档同时存在于两个分片时，跨分片查询只返回一次"""
+    router, collections = shards
+    ids = [(await Message.create(**message(str(ObjectId())))).id for _ in range(6)]
+    # 已复制到目标分片、尚未从源分片删除
+    source = next(name for name, c in collections.items() if c.docs)
+    target = next(name for name in collections if name != source)
+    collections[target].docs.append(dict(collections[source].docs[0]))
+    router.migrating = True
+
+    listed = await Message.list(limit=5, fields={"content"})
+    streamed = [m.id async for m in Message.iter(batch_size=2)]
+    projected = await Message.collection().find({}, {"content": 1, "_id": 0}).to_list()
+
+    assert [m.id for m in listed] == ids[::-1][:5]
+    assert streamed == ids
+    assert len(projected) == 6
+    assert all("_id" not in doc for doc in projected)
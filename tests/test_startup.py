@@ -0,0 +1,150 @@
+import asyncio
+import subprocess
+import sys
+
+from app.infra import mongo_db_sdk
+from app.infra import registry as registry_module
+from app.infra.mongo_db_sdk import MongoDBSDK
+from app.infra.registry import InfraRegistry
+from scripts.import_time import package_totals, parse_importtime
+
+
+def make_registry(events):
+    registry = InfraRegistry()
+
+    def factory(name, delay=0):
+        async def create():
+            events.append(f"create:{name}")
+            await asyncio.sleep(delay)
+            return {"name": name}
+
+        return create
+
+    async def close(client):
+        events.append(f"close:{client['name']}")
+
+    registry.register("db", factory("db"), close, eager=True)
+    registry.register("cache", factory("cache", delay=0.01), close)
+    registry.register("llm", factory("llm"))
+    return registry
+
+
+async def test_registry_creates_lazily_once():
+    """测试客户端首次 get 时才创建，并发的首次调用只创建一次"""
+    events = []
+    registry = make_registry(events)
+    assert registry.peek("cache") is None
+
+    clients = await asyncio.gather(*(registry.get("cache") for _ in range(5)))
+
+    assert events == ["create:cache"]
+    assert all(client is clients[0] for client in clients)
+    assert registry.peek("cache") is clients[0]
+    assert registry.status() == {"db": False, "cache": True, "llm": False}
+
+
+async def test_registry_startup_and_shutdown_order():
+    """测试启动时只创建 eager 客户端，关闭时按创建的逆序关闭"""
+    events = []
+    registry = make_registry(events)
+
+    await registry.startup()
+    assert events == ["create:db"]
+
+    await registry.get("cache")
+    await registry.get("llm")
+    await registry.shutdown()
+
+    # llm 没有 close，跳过
+    assert events[-2:] == ["close:cache", "close:db"]
+    assert registry.status() == {"db": False, "cache": False, "llm": False}
+
+
+async def test_registry_retries_after_failed_create():
+    """测试创建失败时抛出异常，下次调用重试"""
+    registry = InfraRegistry()
+    attempts = []
+
+    async def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("down")
+        return "client"
+
+    registry.register("flaky", create)
+
+    try:
+        await registry.get("flaky")
+    except ConnectionError:
+        pass
+    assert await registry.get("flaky") == "client"
+    assert len(attempts) == 2
+
+
+async def test_registry_closes_adopted_clients():
+    """测试在注册表之外创建并登记的客户端在关闭时关闭，已创建的不重复登记"""
+    events = []
+    registry = make_registry(events)
+
+    registry.adopt("db", {"name": "db"})
+    await registry.startup()
+    registry.adopt("db", {"name": "other"})
+    await registry.shutdown()
+
+    assert events == ["close:db"]
+
+
+async def test_lazy_mongo_client_closed_on_shutdown(monkeypatch):
+    """测试未经启动连接、由 get_db 按需创建的 Mongo 客户端在关闭时关闭"""
+    registry = InfraRegistry()
+    registry.register(
+        "mongo", registry_module._connect_mongo, registry_module._close_mongo
+    )
+    monkeypatch.setattr(mongo_db_sdk, "registry", registry)
+    monkeypatch.setattr(MongoDBSDK, "client", None)
+    monkeypatch.setattr(MongoDBSDK, "db", None)
+    monkeypatch.setattr(MongoDBSDK, "_loop", None)
+    monkeypatch.setattr(MongoDBSDK, "_clients", {})
+
+    MongoDBSDK.get_db()
+    assert registry.status() == {"mongo": True}
+
+    await registry.shutdown()
+    assert MongoDBSDK.client is None
+    assert registry.status() == {"mongo": False}
+
+
+def test_import_app_does_not_load_heavy_clients():
+    """测试导入应用时不导入 openai、motor 等只在运行时用到的库"""
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('openai', 'motor.motor_asyncio') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_parse_importtime():
+    """测试解析 -X importtime 输出并按顶层包汇总"""
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   fastapi.params",
+            "import time:        80 |        200 | fastapi",
+            "import time:        50 |         50 | app.main",
+            "unrelated line",
+        ]
+    )
+
+    records = parse_importtime(output)
+
+    assert records == [
+        ("fastapi.params", 120, 120),
+        ("fastapi", 80, 200),
+        ("app.main", 50, 50),
+    ]
+    assert package_totals(records) == {"fastapi": 200, "app": 50}
@@ -0,0 +1,101 @@
+import asyncio
+import atexit
+import json
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.middlewares.request_id import RequestIDMiddleware
+from app.utils import tracing
+from app.utils.tracing import (
+    NDJSONExporter,
+    RingBufferExporter,
+    TracedRoute,
+    span,
+    start_trace,
+)
+
+
+@pytest.fixture
+def exporter(monkeypatch) -> RingBufferExporter:
+    buffer = RingBufferExporter(maxlen=10)
+    monkeypatch.setattr(tracing, "exporters", [buffer])
+    return buffer
+
+
+@pytest.mark.asyncio
+async def test_nested_spans(exporter: RingBufferExporter, monkeypatch):
+    """测试嵌套 span 的父子关系"""
+    monkeypatch.setattr(tracing.tracing_cfg, "sample_rate", 1.0)
+
+    with start_trace("http.request", "trace-1") as root:
+        with span("handler") as handler:
+            with span("mongo.find_one", collection="person"):
+                await asyncio.sleep(0)
+
+    trace = exporter.get("trace-1")
+    assert trace["reason"] == "sampled"
+    spans = {s["name"]: s for s in trace["spans"]}
+    assert spans["http.request"]["parent_id"] is None
+    assert spans["handler"]["parent_id"] == root.span_id
+    assert spans["mongo.find_one"]["parent_id"] == handler.span_id
+    assert spans["mongo.find_one"]["attributes"] == {"collection": "person"}
+
+
+@pytest.mark.asyncio
+async def test_tail_sampling(exporter: RingBufferExporter, monkeypatch):
+    """测试未被概率采样的慢请求仍会被导出"""
+    monkeypatch.setattr(tracing.tracing_cfg, "sample_rate", 0.0)
+    monkeypatch.setattr(tracing.tracing_cfg, "slow_ms", 20)
+
+    with start_trace("http.request", "fast"):
+        pass
+    with start_trace("http.request", "slow"):
+        await asyncio.sleep(0.03)
+
+    assert exporter.get("fast") is None
+    assert exporter.get("slow")["reason"] == "slow"
+
+
+def test_span_outside_trace_is_noop():
+    """测试请求外调用 span 不做任何事"""
+    with span("noop") as current:
+        assert current is None
+
+
+def test_request_trace_with_handler_span(exporter: RingBufferExporter, monkeypatch):
+    """测试请求 ID 作为 trace ID，且包含路由处理函数的 span"""
+    monkeypatch.setattr(tracing.tracing_cfg, "sample_rate", 1.0)
+    router = APIRouter(route_class=TracedRoute)
+
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    traced_app = FastAPI()
+    traced_app.include_router(router, prefix="/api")
+    traced_app.add_middleware(RequestIDMiddleware)
+
+    TestClient(traced_app).get("/api/items/1", headers={"X-Request-ID": "req-42"})
+
+    trace = exporter.get("req-42")
+    names = [s["name"] for s in trace["spans"]]
+    assert names == ["http.request", "handler GET /api/items/{item_id}"]
+    assert trace["spans"][0]["attributes"]["status"] == 200
+
+
+def test_ndjson_exporter_flushes_on_exit(tmp_path, monkeypatch):
+    """测试文件导出器在进程退出时写出队列中剩余的 trace"""
+    hooks = []
+    monkeypatch.setattr(atexit, "register", hooks.append)
+    path = tmp_path / "traces.ndjson"
+    exporter = NDJSONExporter(str(path))
+
+    for i in range(3):
+        exporter.export({"trace_id": f"t{i}", "duration_ms": i})
+    for hook in hooks:
+        hook()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["trace_id"] for line in lines] == ["t0", "t1", "t2"]